@@ -10,6 +10,7 @@ PROJECT_ROOT = "."
 RAW_DATA_PATH = "data/raw/"
 RAW_DATA_FILE = "online_retail_II_2010_2011.csv"
 PROCESSED_DATA_PATH = "data/processed/"
+RAW_CACHE_PATH = "data/cache/"
 RESULTS_PATH = "results/"
 LOGS_PATH = "logs/"
 
@@ -22,6 +23,7 @@ CLEAN_DATA_PATH = "data/processed/clean_transactions.parquet"
 
 # Phase 3
 SELECTED_PRODUCTS_PATH = "data/processed/selected_products.parquet"
+PRODUCT_DAY_INDEX_PATH = "data/processed/product_day_index.parquet"
 
 # Phase 4
 DAILY_AGG_DATA_PATH = "data/processed/daily_product_data.parquet"
@@ -47,6 +49,7 @@ PHASE4_LOG_FILE = "phase4.log"
 PHASE5_LOG_FILE = "phase5.log"
 PHASE6_LOG_FILE = "phase6.log"
 PHASE7_LOG_FILE = "phase7.log"
+PHASE13_LOG_FILE = "phase13.log"
 EXPERIMENT_LOG_FILE = "experiment.log"
 
 
@@ -108,6 +111,21 @@ RULE_PRICE_DECREASE = 0.02        # -2% adjustment for rule strategy
 # Phase 1 constants
 # -----------------------------
 RAW_INSPECTION_PERCENTILES = [0.01, 0.05, 0.5, 0.95, 0.99]
+PHASE1_INSPECTION_MODES = ("exact", "stream")
+PHASE1_INSPECTION_MODE = "exact"      # "stream" builds the report in one pass over CSV batches with sketched quantiles
+PHASE1_QUANTILE_SKETCH_K = 8192       # sketch buffer size; quantiles are exact until a column exceeds it
+PHASE1_WORKERS = 1                    # stream mode: processes summarising CSV batches (1 = in-process)
+RAW_CSV_BLOCK_BYTES = 16 * 1024 * 1024  # raw CSV bytes per streamed batch; peak memory scales with it
+# pandas.read_csv default NA markers, so streamed batches see the same nulls as the in-memory read.
+RAW_CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+RAW_CACHE_ENABLED = False             # Phases 1-2 read a parquet copy of the raw CSV keyed by its SHA-256
+RAW_CACHE_PARSED_DATE_COLUMN = "InvoiceDateParsed"  # cached format="mixed" parse of the raw invoice date
+# Cached as float64 (malformed values -> NaN) instead of text; the footer records each batch's read_csv dtype.
+RAW_CACHE_NUMERIC_COLUMNS = [RAW_COL_QUANTITY, RAW_COL_PRICE, RAW_COL_CUSTOMER_ID]
+DATE_FORMAT_SAMPLE_SIZE = 100         # distinct date strings sampled to detect a column's formats
 
 
 # -----------------------------
@@ -120,6 +138,9 @@ INVOICE_CANCELLATION_PREFIX = "C"
 EXCLUDED_STOCK_CODES = ["DOS", "DOT", "POST", "M", "AMAZONFEE", "B"]
 PHASE2_STRING_COLUMNS = [COL_INVOICE, COL_STOCK_CODE, COL_DESCRIPTION, COL_COUNTRY]
 PHASE2_PRICE_DESCRIBE_PERCENTILES = [0.5, 0.9, 0.95, 0.99, 0.995, 0.999]
+PHASE2_PRICE_SKETCH_K = 8192          # stream mode: sketch size for the price percentile log; exact until exceeded
+PHASE2_INGESTION_MODES = ("memory", "stream")
+PHASE2_INGESTION_MODE = "memory"      # "stream" cleans the raw CSV in pyarrow batches and writes parquet row groups
 PHASE2_RAW_REQUIRED_COLUMNS = [
     RAW_COL_INVOICE,
     RAW_COL_STOCK_CODE,
@@ -149,12 +170,19 @@ MIN_ACTIVE_DAYS = 150
 SELECTED_PRODUCT_COUNT = 5
 MIN_PRICE_STD = 0.0
 PHASE3_FROZEN_COLUMNS = [COL_STOCK_CODE, COL_DESCRIPTION, "revenue", "price_std", "active_days"]
+PHASE3_INDEX_FROZEN_COLUMNS = [COL_STOCK_CODE, "active_days", "day_bitmap"]
+PHASE3_SELECTION_MODES = ("top", "catalog")
+PHASE3_SELECTION_MODE = "top"         # "catalog" keeps every eligible product instead of SELECTED_PRODUCT_COUNT
+PHASE3_CATALOG_MAX_PRODUCTS = None    # catalog mode: keep only the top-K eligible products by revenue (None = all)
 
 
 # -----------------------------
 # Phase 4 constants
 # -----------------------------
 PHASE4_FROZEN_COLUMNS = [COL_STOCK_CODE, "invoice_day", "daily_units", "avg_daily_price", "daily_revenue"]
+# Layout of the product-level datasets from Phase 4 on (daily aggregates, Phase 5 features, Phase 7 outputs).
+DATASET_LAYOUTS = ("file", "partitioned")
+DATASET_LAYOUT = "file"               # "partitioned" writes <path>/stock_code=<code>/part-*.parquet, days sorted per product
 
 
 # -----------------------------
@@ -233,6 +261,35 @@ PHASE6_TARGET_COLUMN = "daily_units"
 # -----------------------------
 PHASE7_STRATEGIES = ("rule", "ml", "hybrid")
 PHASE7_GRID_POINTS = 5
+PHASE7_SELECTION_ENGINES = ("batch", "row")
+PHASE7_SELECTION_ENGINE = "batch"     # "row" replays choose_price per row as the reference path
+PHASE7_VALIDATION_POLICIES = ("full", "final-only", "sampled")
+PHASE7_VALIDATION_POLICY = "full"     # per-row contract checks in the row engine; final output checks always run
+PHASE7_VALIDATION_SAMPLE_EVERY = 100  # "sampled" checks every Nth row's candidate block and context
+PHASE7_LINEAR_FAST_PATH = True        # score linear models from base prediction + price coefficient
+PHASE7_PRICE_SEARCH_MODES = ("grid", "solver")
+PHASE7_PRICE_SEARCH = "grid"          # "solver" adds the revenue-optimal price within the grid bounds
+PHASE7_SOLVER_ITERATIONS = 40         # golden-section iterations for non-linear demand models
+PHASE7_WORKERS = 1                    # >1 simulates product chunks on a process pool
+PHASE7_CHUNKS_PER_WORKER = 4          # product chunks queued per worker for load balancing
+PHASE7_OUTPUT_MODES = ("memory", "stream")
+PHASE7_OUTPUT_MODE = "memory"         # "stream" writes outputs in row groups as product chunks finish
+PHASE7_STREAM_CHUNK_ROWS = 50_000     # upper bound on test rows per streamed chunk (whole products only)
+PHASE7_PREDICTION_CACHE_MODES = ("off", "memory", "disk")
+PHASE7_PREDICTION_CACHE = "off"       # "memory" memoizes model.predict per feature vector; "disk" also persists it
+PHASE7_PREDICTION_CACHE_MAX_ENTRIES = 1_000_000  # in-memory LRU bound, in feature vectors
+PHASE7_PREDICTION_CACHE_PATH = "results/cache/demand_predictions.sqlite"
+PHASE7_DEMAND_FEEDBACK_MODES = ("open-loop", "closed-loop")
+PHASE7_DEMAND_FEEDBACK = "open-loop"  # "closed-loop" rebuilds lag features from each strategy's simulated demand
+PHASE7_RUN_MODES = ("full", "incremental")
+PHASE7_RUN_MODE = "full"              # "incremental" simulates only days after the saved per-product state and appends
+PHASE7_CHECKPOINTS = False            # save completed product chunks so --resume can skip them (--resume turns it on)
+PHASE7_CHECKPOINT_ROWS = 50_000       # upper bound on test rows per checkpointed chunk (whole products only)
+PHASE7_CHECKPOINT_PATH = "results/simulation/checkpoints/"
+PHASE7_MC_DRAWS = 1_000               # Monte Carlo demand scenarios per row
+PHASE7_MC_SEED = 42
+PHASE7_MC_MEMORY_BUDGET_MB = 256      # bound on the (rows x grid x draws) scenario arrays held at once
+PHASE7_MC_BLOCK_ROWS = 256            # rows per RNG block, so draws do not depend on the memory budget
 SIMULATION_OUTPUT_PATH = "results/simulation/"
 SIMULATION_CANDIDATE_PATHS = {
     "rule": "results/simulation/rule_candidates.parquet",
@@ -244,6 +301,13 @@ SIMULATION_RESULTS_PATHS = {
     "ml": "results/simulation/ml_results.parquet",
     "hybrid": "results/simulation/hybrid_results.parquet",
 }
+SIMULATION_STATE_PATHS = {
+    "rule": "results/simulation/rule_state.parquet",
+    "ml": "results/simulation/ml_state.parquet",
+    "hybrid": "results/simulation/hybrid_state.parquet",
+}
+SIMULATION_MONTE_CARLO_PATH = "results/simulation/monte_carlo_revenue.parquet"
+SIMULATION_MONTE_CARLO_SUMMARY_PATH = "results/simulation/monte_carlo_summary.json"
 PHASE7_CANDIDATE_FROZEN_COLUMNS = [
     "invoice_day",
     COL_STOCK_CODE,
@@ -264,3 +328,59 @@ PHASE7_RESULT_FROZEN_COLUMNS = [
     "predicted_revenue",
     "strategy_name",
 ]
+PHASE7_MONTE_CARLO_FROZEN_COLUMNS = ["strategy_name", "draw", "total_revenue"]
+PHASE7_STATE_FROZEN_COLUMNS = [COL_STOCK_CODE, "last_invoice_day", "last_chosen_price"]
+
+# Local pricing service (Phase 7 strategies served from a long-running process)
+PRICING_SERVICE_HOST = "127.0.0.1"
+PRICING_SERVICE_PORT = 8765
+PRICING_SERVICE_SOCKET_PATH = None    # e.g. "results/service/pricing.sock" to serve on a Unix socket instead of TCP
+PRICING_SERVICE_MAX_BATCH = 1024      # requests coalesced into one predict call
+PRICING_SERVICE_BATCH_WINDOW_MS = 0.0 # extra wait for stragglers; 0 batches whatever queued during the last batch
+
+
+# -----------------------------
+# Phase 13 constants
+# -----------------------------
+ROBUSTNESS_OUTPUT_PATH = "results/robustness/"
+ROBUSTNESS_RESULTS_PATH = "results/robustness/robustness_results.parquet"
+ROBUSTNESS_SUMMARY_PATH = "results/robustness/robustness_summary.json"
+PHASE13_WORKERS = 1                   # >1 runs price-grid groups of the sweep on a process pool
+PHASE13_CHECKPOINTS = False           # save completed price-grid groups so --resume can skip them (--resume turns it on)
+PHASE13_CHECKPOINT_PATH = "results/robustness/checkpoints/"
+PHASE13_SWEEP_PARAMETERS = [
+    "PRICE_GRID_PERCENTAGE",
+    "PHASE7_GRID_POINTS",
+    "MAX_DAILY_CHANGE",
+    "HYBRID_SMOOTHING_ALPHA",
+    "RULE_PRICE_INCREASE",
+    "RULE_PRICE_DECREASE",
+]
+PHASE13_DEFAULT_PARAMETER_GRID = {
+    "MAX_DAILY_CHANGE": [0.01, 0.03, 0.05],
+    "HYBRID_SMOOTHING_ALPHA": [0.3, 0.5, 0.7],
+    "PRICE_GRID_PERCENTAGE": [0.05, 0.10, 0.15],
+}
+PHASE13_METRIC_COLUMNS = [
+    "result_rows",
+    "total_predicted_revenue",
+    "mean_daily_revenue",
+    "mean_absolute_change",
+    "price_std",
+    "max_price_jump",
+    "change_frequency",
+]
+PHASE13_FROZEN_COLUMNS = [
+    "config_id",
+    *[parameter.lower() for parameter in PHASE13_SWEEP_PARAMETERS],
+    "strategy_name",
+    *PHASE13_METRIC_COLUMNS,
+]
+
+
+# -----------------------------
+# Catalog-scale benchmark
+# -----------------------------
+CATALOG_BENCHMARK_PRODUCT_COUNTS = [250, 500, 1000, 2000]  # catalog-mode top-K sizes timed through Phases 4-7
+CATALOG_BENCHMARK_BASELINE_PRODUCTS = 1  # always timed too; its per-phase seconds are the fixed cost subtracted
+CATALOG_BENCHMARK_REPORT_FILE = "catalog_benchmark_report.json"
@@ -2,8 +2,12 @@ import argparse
 import logging
 
 from config import PHASE7_STRATEGIES
+from pipeline.catalog_benchmark import run_catalog_benchmark
 from pipeline.runner import available_phases, run_phase, run_workflow
-from simulation.simulator import run_phase7
+from simulation.monte_carlo import run_phase7_monte_carlo
+from simulation.parameter_sweep import run_phase13
+from simulation.pricing_service import run_pricing_service
+from simulation.simulator import run_phase7, run_phase7_strategies
 from utils.logging_config import configure_logging
 
 
@@ -15,27 +19,115 @@ def parse_args() -> argparse.Namespace:
         default="full",
         help="Workflow mode (default: full)",
     )
-    parser.add_argument(
+    # Each of these selects what the run does, so at most one may be given.
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument(
         "--phase",
         type=int,
         choices=available_phases(),
         help="Optional specific phase to run (for debugging/development)",
     )
-    parser.add_argument(
+    modes.add_argument(
         "--simulate",
         choices=[*PHASE7_STRATEGIES, "all"],
         help="Run Phase 7 simulation for one strategy (rule|ml|hybrid) or all strategies (all)",
     )
-    return parser.parse_args()
+    modes.add_argument(
+        "--monte-carlo",
+        choices=[*PHASE7_STRATEGIES, "all"],
+        help="Run the Phase 7 Monte Carlo demand-uncertainty simulation for one strategy or all strategies",
+    )
+    modes.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the long-running local pricing service (newline-delimited JSON over TCP or a Unix socket)",
+    )
+    modes.add_argument(
+        "--sweep",
+        nargs="?",
+        const="",
+        metavar="GRID_JSON",
+        help=(
+            "Run the Phase 13 parameter sweep over all strategies. Optionally pass a JSON file mapping "
+            "config parameter names to value lists (default: PHASE13_DEFAULT_PARAMETER_GRID)"
+        ),
+    )
+    modes.add_argument(
+        "--benchmark-catalog",
+        nargs="*",
+        type=int,
+        metavar="PRODUCT_COUNT",
+        help=(
+            "Time Phases 4-7 in catalog mode for each product count (top-K eligible products by revenue) "
+            "in scratch copies of the project (default: CATALOG_BENCHMARK_PRODUCT_COUNTS)"
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="With --simulate or --sweep, resume from the last checkpoint and skip work that already completed",
+    )
+    args = parser.parse_args()
+    if args.resume and args.simulate is None and args.sweep is None:
+        parser.error("--resume requires --simulate or --sweep")
+    return args
 
 
 def main() -> None:
     args = parse_args()
+    if args.sweep is not None:
+        configure_logging(phases=[13])
+        logging.info("Dynamic Pricing Study runner initialised for the Phase 13 parameter sweep.")
+        try:
+            run_phase13(args.sweep or None, resume=args.resume)
+        except Exception:
+            logging.exception("Phase 13 parameter sweep failed.")
+            raise
+        logging.info("Phase 13 parameter sweep completed successfully.")
+        print("Phase 13 parameter sweep completed successfully.")
+        return
+
+    if args.benchmark_catalog is not None:
+        configure_logging()
+        logging.info("Dynamic Pricing Study runner initialised for the catalog benchmark.")
+        try:
+            run_catalog_benchmark(args.benchmark_catalog or None)
+        except Exception:
+            logging.exception("Catalog benchmark failed.")
+            raise
+        logging.info("Catalog benchmark completed successfully.")
+        print("Catalog benchmark completed successfully.")
+        return
+
+    if args.serve:
+        configure_logging(phases=[7])
+        logging.info("Dynamic Pricing Study runner initialised for the pricing service.")
+        try:
+            run_pricing_service()
+        except Exception:
+            logging.exception("Pricing service failed.")
+            raise
+        logging.info("Pricing service stopped.")
+        return
+
+    if args.monte_carlo is not None:
+        strategy_names = list(PHASE7_STRATEGIES) if args.monte_carlo == "all" else [args.monte_carlo]
+        configure_logging(phases=[7])
+        logging.info("Dynamic Pricing Study runner initialised for Monte Carlo simulation: %s.", args.monte_carlo)
+        try:
+            run_phase7_monte_carlo(strategy_names)
+        except Exception:
+            logging.exception("Monte Carlo simulation failed for %s.", args.monte_carlo)
+            raise
+        logging.info("Monte Carlo simulation completed successfully for %s.", args.monte_carlo)
+        print(f"Monte Carlo simulation for '{args.monte_carlo}' completed successfully.")
+        return
+
     if args.simulate is not None and args.simulate != "all":
         configure_logging(phases=[7])
         logging.info("Dynamic Pricing Study runner initialised for simulation strategy %s.", args.simulate)
         try:
-            run_phase7(strategy_name=args.simulate)
+            run_phase7(strategy_name=args.simulate, resume=args.resume)
         except Exception:
             logging.exception("Simulation failed for strategy %s.", args.simulate)
             raise
@@ -46,12 +138,11 @@ def main() -> None:
     if args.simulate == "all":
         configure_logging(phases=[7])
         logging.info("Dynamic Pricing Study runner initialised for all simulation strategies.")
-        for strategy in PHASE7_STRATEGIES:
-            try:
-                run_phase7(strategy_name=strategy)
-            except Exception:
-                logging.exception("Simulation failed for strategy %s.", strategy)
-                raise
+        try:
+            run_phase7_strategies(PHASE7_STRATEGIES, resume=args.resume)
+        except Exception:
+            logging.exception("Simulation failed for strategies %s.", ", ".join(PHASE7_STRATEGIES))
+            raise
         logging.info("Simulation completed successfully for all strategies.")
         print("Simulation for all strategies completed successfully.")
         return
@@ -23,7 +23,7 @@ from config import (
     PHASE6_TARGET_COLUMN,
     PROJECT_ROOT,
 )
-from preprocessing.common import configured_root, ensure_required_columns
+from preprocessing.common import configured_root, ensure_required_columns, read_dataset
 from utils.data_contracts import validate_phase5_features
 
 logger = logging.getLogger(__name__)
@@ -55,8 +55,8 @@ def run_phase6() -> None:
     if not TEST_INPUT_PATH.exists():
         raise FileNotFoundError(f"Phase 6 testing dataset not found: {TEST_INPUT_PATH}")
 
-    train_df = pd.read_parquet(TRAIN_INPUT_PATH)
-    test_df = pd.read_parquet(TEST_INPUT_PATH)
+    train_df = read_dataset(TRAIN_INPUT_PATH)
+    test_df = read_dataset(TEST_INPUT_PATH)
     _validate_phase6_input(train_df, "train")
     _validate_phase6_input(test_df, "test")
 
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Ensure project-root imports work when executing this file directly.
+PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT_PATH) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT_PATH))
+
+import numpy as np
+
+from config import (
+    CATALOG_BENCHMARK_BASELINE_PRODUCTS,
+    CATALOG_BENCHMARK_PRODUCT_COUNTS,
+    CATALOG_BENCHMARK_REPORT_FILE,
+    CLEAN_DATA_PATH,
+    PHASE7_STRATEGIES,
+    PROJECT_ROOT,
+    REPORTS_PATH,
+)
+from preprocessing.common import configured_root, read_dataset
+
+logger = logging.getLogger(__name__)
+
+CONFIGURED_ROOT_PATH = configured_root(PROJECT_ROOT)
+INPUT_PATH = CONFIGURED_ROOT_PATH / CLEAN_DATA_PATH
+REPORT_PATH = CONFIGURED_ROOT_PATH / REPORTS_PATH / CATALOG_BENCHMARK_REPORT_FILE
+
+BENCHMARKED_PHASES = ["phase4", "phase5", "phase6", "phase7"]
+
+
+def _time_catalog_run(product_count: int) -> dict[str, object]:
+    # Runs in a fresh interpreter whose working directory is a scratch project root, so the phase modules resolve
+    # their paths there and every output stays out of the real project.
+    import pandas as pd
+
+    from models.demand_model import TEST_INPUT_PATH, run_phase6
+    from preprocessing.aggregate_daily import OUTPUT_PATH as DAILY_OUTPUT_PATH, run_phase4
+    from preprocessing.feature_engineering import run_phase5
+    from preprocessing.select_products import SELECTED_PRODUCTS_OUTPUT_PATH, run_phase3
+    from simulation.simulator import run_phase7_strategies
+
+    run_phase3(selection_mode="catalog", catalog_max_products=product_count)
+    phase_runs = {
+        "phase4": lambda: run_phase4(selection_mode="catalog", catalog_max_products=product_count),
+        "phase5": run_phase5,
+        "phase6": run_phase6,
+        "phase7": lambda: run_phase7_strategies(PHASE7_STRATEGIES),
+    }
+    seconds = {}
+    for phase, run in phase_runs.items():
+        started = time.perf_counter()
+        run()
+        seconds[phase] = time.perf_counter() - started
+    return {
+        "requested_products": product_count,
+        "products": len(pd.read_parquet(SELECTED_PRODUCTS_OUTPUT_PATH)),
+        "daily_rows": len(read_dataset(DAILY_OUTPUT_PATH)),
+        "test_rows": len(read_dataset(TEST_INPUT_PATH)),
+        "seconds": seconds,
+        "total_seconds": sum(seconds.values()),
+    }
+
+
+def _run_in_scratch_project(product_count: int) -> dict[str, object]:
+    with tempfile.TemporaryDirectory(prefix="catalog_benchmark_") as scratch:
+        scratch_input_path = Path(scratch) / CLEAN_DATA_PATH
+        scratch_input_path.parent.mkdir(parents=True)
+        try:
+            os.symlink(INPUT_PATH, scratch_input_path)
+        except OSError:
+            shutil.copy(INPUT_PATH, scratch_input_path)
+        completed = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--worker", str(product_count)],
+            cwd=scratch,
+            capture_output=True,
+            text=True,
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Catalog benchmark run for {product_count} products failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def _phase_scaling(baseline: dict[str, object], runs: list[dict[str, object]], key) -> dict[str, object]:
+    # The baseline catalog's time is the fixed cost (file handling, model loading, pool start-up). What the larger
+    # catalogs add on top of it is fitted two ways: a least-squares line (seconds per extra product) and a log-log
+    # slope (1.0 = linear, above 1.0 = superlinear). Runs that add no measurable time are left out of the slope.
+    fixed_seconds = key(baseline)
+    extra_products = np.array([run["products"] - baseline["products"] for run in runs], dtype=float)
+    extra_seconds = np.array([key(run) - fixed_seconds for run in runs], dtype=float)
+    scaling = {"fixed_seconds": fixed_seconds, "seconds_per_product": None, "scaling_exponent": None}
+    if len(runs) >= 2:
+        scaling["seconds_per_product"] = float(np.polyfit(extra_products, extra_seconds, 1)[0])
+    measurable = extra_seconds > 0
+    if measurable.sum() >= 2:
+        slope = np.polyfit(np.log(extra_products[measurable]), np.log(extra_seconds[measurable]), 1)[0]
+        scaling["scaling_exponent"] = float(slope)
+    return scaling
+
+
+def _build_report_payload(baseline: dict[str, object], runs: list[dict[str, object]]) -> dict[str, object]:
+    scaling = {
+        phase: _phase_scaling(baseline, runs, lambda run: run["seconds"][phase]) for phase in BENCHMARKED_PHASES
+    }
+    scaling["total"] = _phase_scaling(baseline, runs, lambda run: run["total_seconds"])
+    return {
+        "name": "catalog_benchmark",
+        "input_file": str(INPUT_PATH),
+        "phases": BENCHMARKED_PHASES,
+        "baseline_run": baseline,
+        "runs": runs,
+        "scaling": scaling,
+    }
+
+
+def run_catalog_benchmark(product_counts: list[int] | None = None) -> dict[str, object]:
+    product_counts = sorted(set(product_counts or CATALOG_BENCHMARK_PRODUCT_COUNTS))
+    if any(count < 1 for count in product_counts) or CATALOG_BENCHMARK_BASELINE_PRODUCTS < 1:
+        raise ValueError(f"Catalog benchmark product counts must be positive integers, got {product_counts}.")
+    if product_counts[0] <= CATALOG_BENCHMARK_BASELINE_PRODUCTS:
+        raise ValueError(
+            "Catalog benchmark product counts must exceed CATALOG_BENCHMARK_BASELINE_PRODUCTS "
+            f"({CATALOG_BENCHMARK_BASELINE_PRODUCTS}), got {product_counts}."
+        )
+    if not INPUT_PATH.exists():
+        raise FileNotFoundError(f"Catalog benchmark requires the Phase 2 clean dataset: {INPUT_PATH}")
+
+    logger.info(
+        "Catalog benchmark started | baseline products: %s | product counts: %s | input: %s",
+        CATALOG_BENCHMARK_BASELINE_PRODUCTS,
+        product_counts,
+        INPUT_PATH,
+    )
+    runs = []
+    for product_count in [CATALOG_BENCHMARK_BASELINE_PRODUCTS, *product_counts]:
+        run = _run_in_scratch_project(product_count)
+        logger.info(
+            "Catalog benchmark | products: %s (requested %s) | test rows: %s | seconds: %s",
+            run["products"],
+            product_count,
+            run["test_rows"],
+            {phase: round(seconds, 3) for phase, seconds in run["seconds"].items()},
+        )
+        runs.append(run)
+    # Requests beyond the eligible catalog select the same products; keep one run per catalog size.
+    baseline, *runs = list({run["products"]: run for run in runs}.values())
+    if not runs:
+        raise ValueError("Catalog benchmark needs at least one catalog larger than the baseline; none are eligible.")
+    if runs[-1]["total_seconds"] < 2 * baseline["total_seconds"]:
+        logger.warning(
+            "Catalog benchmark | the largest catalog (%s products) takes under twice the baseline's fixed cost; "
+            "use larger product counts for a reliable per-product slope.",
+            runs[-1]["products"],
+        )
+
+    payload = _build_report_payload(baseline, runs)
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    logger.info(
+        "Catalog benchmark scaling exponents of the time beyond fixed cost (1.0 = linear): %s",
+        {phase: scaling["scaling_exponent"] for phase, scaling in payload["scaling"].items()},
+    )
+    logger.info("Catalog benchmark completed. Saved report to %s", REPORT_PATH)
+    return payload
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        print(json.dumps(_time_catalog_run(int(sys.argv[2]))))
+    else:
+        run_catalog_benchmark([int(value) for value in sys.argv[1:]] or None)
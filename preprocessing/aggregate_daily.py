@@ -3,6 +3,7 @@ from pathlib import Path
 import sys
 
 import pandas as pd
+import pyarrow.parquet as pq
 
 # Ensure project-root imports work when executing this file directly.
 PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
@@ -16,10 +17,12 @@ from config import (
     COL_QUANTITY,
     COL_STOCK_CODE,
     DAILY_AGG_DATA_PATH,
+    PHASE3_CATALOG_MAX_PRODUCTS,
+    PHASE3_SELECTION_MODE,
     PROJECT_ROOT,
     SELECTED_PRODUCTS_PATH,
 )
-from preprocessing.common import configured_root, ensure_required_columns
+from preprocessing.common import configured_root, parse_dates, read_parquet_columns, write_product_dataset
 from utils.data_contracts import validate_daily_aggregation, validate_selected_products
 
 logger = logging.getLogger(__name__)
@@ -30,7 +33,10 @@ SELECTED_PRODUCTS_INPUT_PATH = CONFIGURED_ROOT_PATH / SELECTED_PRODUCTS_PATH
 OUTPUT_PATH = CONFIGURED_ROOT_PATH / DAILY_AGG_DATA_PATH
 
 
-def run_phase4() -> None:
+def run_phase4(
+    selection_mode: str = PHASE3_SELECTION_MODE, catalog_max_products: int | None = PHASE3_CATALOG_MAX_PRODUCTS
+) -> None:
+    # selection_mode and catalog_max_products must match the Phase 3 run that wrote the selected products.
     logger.info("Phase 4 daily aggregation started.")
     logger.info("Input cleaned dataset: %s", INPUT_PATH)
     logger.info("Input selected products dataset: %s", SELECTED_PRODUCTS_INPUT_PATH)
@@ -42,7 +48,7 @@ def run_phase4() -> None:
         raise FileNotFoundError(f"Selected products dataset not found: {SELECTED_PRODUCTS_INPUT_PATH}")
 
     selected_products = pd.read_parquet(SELECTED_PRODUCTS_INPUT_PATH)
-    validate_selected_products(selected_products)
+    validate_selected_products(selected_products, selection_mode, catalog_max_products)
     selected_codes = (
         selected_products[COL_STOCK_CODE]
         .astype("string")
@@ -53,21 +59,22 @@ def run_phase4() -> None:
     )
     selected_codes = list(dict.fromkeys(selected_codes))
 
-    df = pd.read_parquet(INPUT_PATH)
-    ensure_required_columns(
-        df,
+    # Phase 2 writes upper-cased, stripped stock codes, so only the selected products' rows are decoded.
+    df = read_parquet_columns(
+        INPUT_PATH,
         [COL_STOCK_CODE, COL_INVOICE_DATE, COL_QUANTITY, COL_PRICE],
         "Phase 4 aggregation",
+        filters=[(COL_STOCK_CODE, "in", selected_codes)],
     )
 
-    input_rows = len(df)
+    input_rows = pq.read_metadata(INPUT_PATH).num_rows
     df[COL_STOCK_CODE] = df[COL_STOCK_CODE].astype("string").str.upper().str.strip()
     filtered = df[df[COL_STOCK_CODE].isin(selected_codes)].copy()
     filtered_rows = len(filtered)
     if filtered.empty:
         raise ValueError("No rows found for selected products in cleaned dataset.")
 
-    filtered[COL_INVOICE_DATE] = pd.to_datetime(filtered[COL_INVOICE_DATE], errors="coerce", format="mixed")
+    filtered[COL_INVOICE_DATE], _ = parse_dates(filtered[COL_INVOICE_DATE])
     filtered = filtered[filtered[COL_INVOICE_DATE].notna()].copy()
     if filtered.empty:
         raise ValueError("All filtered rows have invalid invoice_date values.")
@@ -91,7 +98,7 @@ def run_phase4() -> None:
     validate_daily_aggregation(daily)
 
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    daily.to_parquet(OUTPUT_PATH, index=False)
+    write_product_dataset(daily, OUTPUT_PATH)
 
     min_date = daily["invoice_day"].min()
     max_date = daily["invoice_day"].max()
@@ -1,8 +1,13 @@
+from collections import Counter
 import logging
 from pathlib import Path
 import sys
+from typing import Callable, Iterator
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # Ensure project-root imports work when executing this file directly.
 PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
@@ -21,19 +26,35 @@ from config import (
     COL_STOCK_CODE,
     EXCLUDED_STOCK_CODES,
     INVOICE_CANCELLATION_PREFIX,
+    PHASE2_FROZEN_COLUMNS,
+    PHASE2_INGESTION_MODE,
+    PHASE2_INGESTION_MODES,
     PHASE2_PRICE_DESCRIBE_PERCENTILES,
+    PHASE2_PRICE_SKETCH_K,
     PHASE2_RAW_REQUIRED_COLUMNS,
     PHASE2_STRING_COLUMNS,
     PRICE_OUTLIER_REVIEW_TOP_N,
     PRICE_OUTLIER_THRESHOLD,
     PROJECT_ROOT,
+    RAW_CACHE_ENABLED,
+    RAW_CACHE_PARSED_DATE_COLUMN,
+    RAW_CSV_BLOCK_BYTES,
+    RAW_CSV_NULL_VALUES,
     RAW_DATA_FILE,
     RAW_DATA_PATH,
     RAW_TO_CANONICAL_COLUMNS,
     TARGET_COUNTRY,
 )
-from preprocessing.common import configured_root, ensure_required_columns
+from preprocessing.common import (
+    configured_root,
+    ensure_required_columns,
+    iter_text_csv_batches,
+    parse_dates,
+    read_csv_header,
+)
+from preprocessing.raw_cache import iter_raw_cache_batches, read_raw_cache
 from utils.data_contracts import validate_clean_transactions
+from utils.quantile_sketch import QuantileSketch
 
 CONFIGURED_ROOT_PATH = configured_root(PROJECT_ROOT)
 CSV_PATH = CONFIGURED_ROOT_PATH / RAW_DATA_PATH / RAW_DATA_FILE
@@ -41,88 +62,166 @@ OUTPUT_PATH = CONFIGURED_ROOT_PATH / CLEAN_DATA_PATH
 
 logger = logging.getLogger(__name__)
 
+PRICE_REVIEW_COLUMNS = [COL_INVOICE, COL_STOCK_CODE, COL_DESCRIPTION, COL_QUANTITY, COL_PRICE, COL_INVOICE_DATE]
+
+# (counter key, log message) in cleaning order; each message takes the removed and remaining row counts.
+REMOVAL_LOG_LINES = [
+    ("non_uk", "Removed non-UK rows: %s | Remaining: %s"),
+    ("cancelled", "Removed cancelled invoice rows: %s | Remaining: %s"),
+    ("negative_quantity", "Removed negative-quantity rows: %s | Remaining: %s"),
+    ("non_positive_price", "Removed non-positive-price rows: %s | Remaining: %s"),
+    ("excluded_codes", "Removed non-product service-code rows: %s | Remaining: %s"),
+]
+
 
 def _validate_columns(df: pd.DataFrame) -> None:
     ensure_required_columns(df, PHASE2_RAW_REQUIRED_COLUMNS, "Phase 2 cleaning")
 
 
-def _standardize_strings(df: pd.DataFrame) -> pd.DataFrame:
-    for col in PHASE2_STRING_COLUMNS:
-        df[col] = df[col].astype("string").str.strip()
-    df[COL_INVOICE] = df[COL_INVOICE].str.upper()
-    df[COL_STOCK_CODE] = df[COL_STOCK_CODE].str.upper()
-    df[COL_DESCRIPTION] = df[COL_DESCRIPTION].str.replace(r"\s+", " ", regex=True).str.strip()
-    return df
+def _normalize_distinct(values: pd.Series, normalize: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    # Dictionary-encodes the column and normalizes each distinct value once; codes of -1 map back to <NA>.
+    codes, uniques = pd.factorize(values.astype("string"))
+    normalized = normalize(pd.Series(uniques, dtype="string")).array
+    return pd.Series(normalized.take(codes, allow_fill=True), index=values.index, name=values.name)
+
+
+def _strip(values: pd.Series) -> pd.Series:
+    return values.str.strip()
+
+
+def _strip_upper(values: pd.Series) -> pd.Series:
+    return values.str.strip().str.upper()
 
 
-def _coerce_and_validate_types(df: pd.DataFrame) -> pd.DataFrame:
-    quantity_numeric = pd.to_numeric(df[COL_QUANTITY], errors="coerce")
-    invalid_quantity_rows = int(quantity_numeric.isna().sum())
-    if invalid_quantity_rows:
-        logger.info("Dropping rows with non-numeric quantities: %s", invalid_quantity_rows)
-    df = df[quantity_numeric.notna()].copy()
-    df[COL_QUANTITY] = quantity_numeric[quantity_numeric.notna()]
+def _strip_collapse_whitespace(values: pd.Series) -> pd.Series:
+    return values.str.strip().str.replace(r"\s+", " ", regex=True).str.strip()
 
-    price_numeric = pd.to_numeric(df[COL_PRICE], errors="coerce")
-    invalid_price_rows = int(price_numeric.isna().sum())
-    if invalid_price_rows:
-        logger.info("Dropping rows with non-numeric prices: %s", invalid_price_rows)
-    df = df[price_numeric.notna()].copy()
-    df[COL_PRICE] = price_numeric[price_numeric.notna()]
 
-    invoice_datetime = pd.to_datetime(df[COL_INVOICE_DATE], errors="coerce", format="mixed")
-    invalid_date_rows = int(invoice_datetime.isna().sum())
-    if invalid_date_rows:
-        logger.info("Dropping rows with unparseable invoice dates: %s", invalid_date_rows)
-    df = df[invoice_datetime.notna()].copy()
-    df[COL_INVOICE_DATE] = invoice_datetime[invoice_datetime.notna()]
+STRING_NORMALIZERS = {
+    COL_INVOICE: _strip_upper,
+    COL_STOCK_CODE: _strip_upper,
+    COL_DESCRIPTION: _strip_collapse_whitespace,
+}
 
-    customer_numeric = pd.to_numeric(df[COL_CUSTOMER_ID], errors="coerce")
-    df[COL_CUSTOMER_ID] = customer_numeric.astype("Int64")
 
+def _standardize_strings(df: pd.DataFrame) -> pd.DataFrame:
+    for col in PHASE2_STRING_COLUMNS:
+        df[col] = _normalize_distinct(df[col], STRING_NORMALIZERS.get(col, _strip))
     return df
 
 
-def _log_price_distribution(df: pd.DataFrame) -> None:
-    positive_prices = df[df[COL_PRICE] > 0][COL_PRICE]
-    if positive_prices.empty:
+def _valid_typed_rows(df: pd.DataFrame, counts: Counter) -> tuple[np.ndarray, pd.Series, pd.Series, pd.Series]:
+    # Positions of rows with a numeric quantity, then a numeric price, then a parseable date, with those values.
+    # Price and date are coerced only on the rows still valid, so dtypes and counts match filtering step by step.
+    cached_dates = df.pop(RAW_CACHE_PARSED_DATE_COLUMN) if RAW_CACHE_PARSED_DATE_COLUMN in df.columns else None
+
+    quantity = pd.to_numeric(df[COL_QUANTITY], errors="coerce")
+    rows = np.flatnonzero(quantity.notna().to_numpy())
+    counts["invalid_quantity"] += len(df) - len(rows)
+
+    price = pd.to_numeric(df[COL_PRICE].iloc[rows], errors="coerce")
+    valid = price.notna().to_numpy()
+    counts["invalid_price"] += int((~valid).sum())
+    rows, price = rows[valid], price[valid]
+
+    if cached_dates is not None:
+        invoice_datetime = cached_dates.iloc[rows]
+    else:
+        invoice_datetime, unmatched_dates = parse_dates(df[COL_INVOICE_DATE].iloc[rows])
+        counts["unmatched_date_format"] += unmatched_dates
+    valid = invoice_datetime.notna().to_numpy()
+    counts["invalid_date"] += int((~valid).sum())
+    rows, price, invoice_datetime = rows[valid], price[valid], invoice_datetime[valid]
+
+    return rows, quantity.iloc[rows], price, invoice_datetime
+
+
+def _materialize_rows(
+    df: pd.DataFrame, rows: np.ndarray, quantity: np.ndarray, price: np.ndarray, invoice_datetime: np.ndarray
+) -> pd.DataFrame:
+    out = df.take(rows)
+    out[COL_QUANTITY] = quantity.astype("int64")
+    out[COL_PRICE] = price
+    out[COL_INVOICE_DATE] = invoice_datetime
+    out[COL_CUSTOMER_ID] = pd.to_numeric(out[COL_CUSTOMER_ID], errors="coerce").astype("Int64")
+    return out
+
+
+class _PriceReview:
+    """Positive prices and the highest-priced rows seen before outlier removal, collected across batches.
+
+    With ``sketch_k`` (stream mode) the prices go into a quantile sketch, so the review stays bounded however long
+    the file is; without it (memory mode, which holds every row anyway) they are kept for exact percentiles. Either
+    way only the top ``PRICE_OUTLIER_REVIEW_TOP_N`` unique prices and rows are kept.
+    """
+
+    def __init__(self, sketch_k: int | None = None) -> None:
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.prices: list[np.ndarray] = []
+        self.sketch = QuantileSketch(sketch_k) if sketch_k is not None else None
+        self.top_prices = np.empty(0)
+        self.top_rows: pd.DataFrame | None = None
+
+    def add(self, prices: np.ndarray, top_rows: pd.DataFrame) -> None:
+        prices = prices.astype(float)
+        if len(prices):
+            self.count += len(prices)
+            self.minimum = min(self.minimum, float(prices.min()))
+            self.maximum = max(self.maximum, float(prices.max()))
+        if self.sketch is None:
+            self.prices.append(prices)
+        else:
+            self.sketch.update(prices)
+        self.top_prices = np.unique(np.concatenate([self.top_prices, prices]))[-PRICE_OUTLIER_REVIEW_TOP_N:]
+        # Kept rows come from earlier batches, so the stable sort still breaks ties by file order.
+        top_rows = top_rows[PRICE_REVIEW_COLUMNS]
+        if self.top_rows is not None:
+            top_rows = pd.concat([self.top_rows, top_rows], ignore_index=True)
+        self.top_rows = (
+            top_rows.sort_values(COL_PRICE, ascending=False, kind="mergesort")
+            .head(PRICE_OUTLIER_REVIEW_TOP_N)
+            .reset_index(drop=True)
+        )
+
+    def percentiles(self) -> dict[float, float]:
+        if self.sketch is None:
+            values = pd.Series(np.concatenate(self.prices)).quantile(PHASE2_PRICE_DESCRIBE_PERCENTILES).to_numpy()
+        else:
+            values = self.sketch.quantiles(PHASE2_PRICE_DESCRIBE_PERCENTILES)
+        return dict(zip(PHASE2_PRICE_DESCRIBE_PERCENTILES, values))
+
+
+def _log_price_distribution(review: _PriceReview) -> None:
+    if not review.count:
         logger.warning("No positive prices available for outlier inspection.")
         return
 
-    summary = positive_prices.describe(percentiles=PHASE2_PRICE_DESCRIBE_PERCENTILES)
+    percentiles = review.percentiles()
     logger.info(
         (
             "Positive price distribution | min: %.4f, median: %.4f, p95: %.4f, "
             "p99: %.4f, max: %.4f"
         ),
-        float(summary.get("min", 0.0)),
-        float(summary.get("50%", 0.0)),
-        float(summary.get("95%", 0.0)),
-        float(summary.get("99%", 0.0)),
-        float(summary.get("max", 0.0)),
+        review.minimum,
+        float(percentiles.get(0.5, 0.0)),
+        float(percentiles.get(0.95, 0.0)),
+        float(percentiles.get(0.99, 0.0)),
+        review.maximum,
     )
+    if review.sketch is not None and review.sketch.rank_error:
+        logger.info("Positive price percentiles are sketched: within %s rows of exact.", review.sketch.rank_error)
 
-    top_prices = (
-        positive_prices.sort_values(ascending=False)
-        .drop_duplicates()
-        .head(PRICE_OUTLIER_REVIEW_TOP_N)
-    )
     logger.debug(
         "Top %s unique positive prices (descending):\n%s",
         PRICE_OUTLIER_REVIEW_TOP_N,
-        top_prices.to_string(index=False),
-    )
-
-    highest_rows = (
-        df[df[COL_PRICE] > 0]
-        .sort_values(COL_PRICE, ascending=False)
-        [[COL_INVOICE, COL_STOCK_CODE, COL_DESCRIPTION, COL_QUANTITY, COL_PRICE, COL_INVOICE_DATE]]
-        .head(PRICE_OUTLIER_REVIEW_TOP_N)
+        pd.Series(review.top_prices[::-1]).to_string(index=False),
     )
     logger.debug(
         "Top %s rows by positive price:\n%s",
         PRICE_OUTLIER_REVIEW_TOP_N,
-        highest_rows.to_string(index=False),
+        review.top_rows.to_string(index=False),
     )
 
 
@@ -153,74 +252,146 @@ def _run_quality_checks(df: pd.DataFrame) -> None:
         raise ValueError(f"Non-null quality check failed: {violating}")
 
 
-def run_phase2() -> None:
-    logger.info("Phase 2 data cleaning started.")
-    logger.info("Input dataset: %s", CSV_PATH)
-    logger.info("Output dataset: %s", OUTPUT_PATH)
-
-    if not CSV_PATH.exists():
-        logger.error("Dataset missing at %s", CSV_PATH)
-        raise FileNotFoundError(f"Dataset not found: {CSV_PATH}")
-
-    raw_df = pd.read_csv(CSV_PATH)
+def _clean_batch(raw_df: pd.DataFrame, counts: Counter, review: _PriceReview) -> pd.DataFrame:
+    # Every rule is row-local, so a batch cleans exactly like the same rows inside the whole file. Rules are
+    # boolean masks over the typed rows, applied in order so each rule counts only rows that survived the earlier
+    # ones; the cleaned frame is materialized once instead of copying the table after every rule.
     _validate_columns(raw_df)
 
-    df = raw_df.rename(columns=RAW_TO_CANONICAL_COLUMNS).copy()
-    df = _standardize_strings(df)
-    df = _coerce_and_validate_types(df)
-    logger.info("Initial row count: %s", len(df))
-
-    country_mask = (
-        df[COL_COUNTRY].astype("string").str.strip().str.lower()
-        == TARGET_COUNTRY.lower()
+    df = _standardize_strings(raw_df.rename(columns=RAW_TO_CANONICAL_COLUMNS))
+    rows, quantity, price, invoice_datetime = _valid_typed_rows(df, counts)
+    counts["initial"] += len(rows)
+    quantity = quantity.to_numpy()
+    price = price.to_numpy()
+    invoice_datetime = invoice_datetime.to_numpy()
+
+    # Country is already stripped; lower-casing per distinct value keeps the <NA> of missing countries.
+    country_match = _normalize_distinct(df[COL_COUNTRY].iloc[rows], lambda values: values.str.lower())
+    country_match = country_match == TARGET_COUNTRY.lower()
+    # Missing countries are dropped without being counted as non-UK removals.
+    counts["removed_non_uk"] += int((~country_match).sum())
+    alive = country_match.fillna(False).to_numpy(dtype=bool)
+    counts["remaining_non_uk"] += int(alive.sum())
+
+    drop_masks = {
+        "cancelled": df[COL_INVOICE].iloc[rows].astype(str).str.startswith(INVOICE_CANCELLATION_PREFIX, na=False),
+        "negative_quantity": quantity < 0,
+        "non_positive_price": price <= 0,
+        "excluded_codes": df[COL_STOCK_CODE].iloc[rows].isin(EXCLUDED_STOCK_CODES),
+    }
+    for rule, drop in drop_masks.items():
+        drop = np.asarray(drop, dtype=bool)
+        counts[f"removed_{rule}"] += int((drop & alive).sum())
+        alive &= ~drop
+        counts[f"remaining_{rule}"] += int(alive.sum())
+
+    # The price review sees every surviving price but only materializes the batch's top rows.
+    reviewed = np.flatnonzero(alive & (price > 0))
+    top = reviewed[pd.Series(price[reviewed]).nlargest(PRICE_OUTLIER_REVIEW_TOP_N).index]
+    review.add(
+        price[reviewed],
+        _materialize_rows(df, rows[top], quantity[top], price[top], invoice_datetime[top]),
     )
-    removed_non_uk = int((~country_mask).sum())
-    df = df[country_mask].copy()
-    df[COL_COUNTRY] = df[COL_COUNTRY].astype("string")
-    logger.info("Removed non-UK rows: %s | Remaining: %s", removed_non_uk, len(df))
-
-    cancelled_mask = df[COL_INVOICE].astype(str).str.startswith(INVOICE_CANCELLATION_PREFIX, na=False)
-    removed_cancelled = int(cancelled_mask.sum())
-    df = df[~cancelled_mask].copy()
-    logger.info("Removed cancelled invoice rows: %s | Remaining: %s", removed_cancelled, len(df))
-
-    negative_qty_mask = df[COL_QUANTITY] < 0
-    removed_negative_qty = int(negative_qty_mask.sum())
-    df = df[~negative_qty_mask].copy()
-    logger.info("Removed negative-quantity rows: %s | Remaining: %s", removed_negative_qty, len(df))
-    df[COL_QUANTITY] = df[COL_QUANTITY].astype("int64")
-
-    non_positive_price_mask = df[COL_PRICE] <= 0
-    removed_non_positive_price = int(non_positive_price_mask.sum())
-    df = df[~non_positive_price_mask].copy()
-    logger.info("Removed non-positive-price rows: %s | Remaining: %s", removed_non_positive_price, len(df))
-
-    excluded_code_mask = df[COL_STOCK_CODE].isin(EXCLUDED_STOCK_CODES)
-    removed_excluded_codes = int(excluded_code_mask.sum())
-    df = df[~excluded_code_mask].copy()
-    logger.info(
-        "Removed non-product service-code rows: %s | Remaining: %s",
-        removed_excluded_codes,
-        len(df),
-    )
-
-    _log_price_distribution(df)
 
-    outlier_mask = df[COL_PRICE] > PRICE_OUTLIER_THRESHOLD
-    removed_outliers = int(outlier_mask.sum())
-    df = df[~outlier_mask].copy()
+    drop = price > PRICE_OUTLIER_THRESHOLD
+    counts["removed_outliers"] += int((drop & alive).sum())
+    alive &= ~drop
+    counts["remaining_outliers"] += int(alive.sum())
+
+    return _materialize_rows(df, rows[alive], quantity[alive], price[alive], invoice_datetime[alive])
+
+
+def _log_cleaning_summary(counts: Counter, review: _PriceReview) -> None:
+    # Counters are summed over batches, so the log lines match a single whole-file pass.
+    if counts["invalid_quantity"]:
+        logger.info("Dropping rows with non-numeric quantities: %s", counts["invalid_quantity"])
+    if counts["invalid_price"]:
+        logger.info("Dropping rows with non-numeric prices: %s", counts["invalid_price"])
+    if counts["unmatched_date_format"]:
+        logger.info("Invoice dates matching no detected format (parsed individually): %s", counts["unmatched_date_format"])
+    if counts["invalid_date"]:
+        logger.info("Dropping rows with unparseable invoice dates: %s", counts["invalid_date"])
+    logger.info("Initial row count: %s", counts["initial"])
+    for rule, message in REMOVAL_LOG_LINES:
+        logger.info(message, counts[f"removed_{rule}"], counts[f"remaining_{rule}"])
+
+    _log_price_distribution(review)
     logger.info(
         "Removed economically implausible outlier rows (price > %.2f): %s | Remaining: %s",
         PRICE_OUTLIER_THRESHOLD,
-        removed_outliers,
-        len(df),
+        counts["removed_outliers"],
+        counts["remaining_outliers"],
     )
 
-    _run_quality_checks(df)
-    validate_clean_transactions(df)
+
+def _iter_raw_batches() -> Iterator[pd.DataFrame]:
+    _validate_columns(pd.DataFrame(columns=read_csv_header(CSV_PATH)))
+    # Numeric columns arrive as text (or, from the cache, already coerced with malformed values as NaN) and are
+    # coerced per batch exactly as for the in-memory read, so malformed values are counted and dropped instead
+    # of failing the reader.
+    if RAW_CACHE_ENABLED:
+        for batch, _ in iter_raw_cache_batches(CSV_PATH):
+            yield batch.to_pandas()
+        return
+    for batch in iter_text_csv_batches(CSV_PATH, RAW_CSV_BLOCK_BYTES, RAW_CSV_NULL_VALUES):
+        yield batch.to_pandas()
+
+
+def _stream_clean_transactions() -> None:
+    # Each cleaned batch is appended as a row group; the file replaces the output only once every batch succeeded.
+    staging_path = OUTPUT_PATH.with_name(f"{OUTPUT_PATH.name}.partial")
+    counts: Counter = Counter()
+    review = _PriceReview(PHASE2_PRICE_SKETCH_K)
+    writer: pq.ParquetWriter | None = None
+    row_count = 0
+    try:
+        for raw_df in _iter_raw_batches():
+            df = _clean_batch(raw_df, counts, review)
+            if df.empty:
+                continue
+            _run_quality_checks(df)
+            validate_clean_transactions(df)
+            if writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                writer = pq.ParquetWriter(staging_path, table.schema)
+            else:
+                table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            row_count += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    _log_cleaning_summary(counts, review)
+    if row_count == 0:
+        staging_path.unlink(missing_ok=True)
+        validate_clean_transactions(pd.DataFrame(columns=PHASE2_FROZEN_COLUMNS))
+    staging_path.replace(OUTPUT_PATH)
+
+
+def run_phase2() -> None:
+    logger.info("Phase 2 data cleaning started.")
+    logger.info("Input dataset: %s", CSV_PATH)
+    logger.info("Output dataset: %s", OUTPUT_PATH)
+
+    if not CSV_PATH.exists():
+        logger.error("Dataset missing at %s", CSV_PATH)
+        raise FileNotFoundError(f"Dataset not found: {CSV_PATH}")
+    if PHASE2_INGESTION_MODE not in PHASE2_INGESTION_MODES:
+        raise ValueError(f"Unsupported Phase 2 ingestion mode: {PHASE2_INGESTION_MODE}")
 
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(OUTPUT_PATH, index=False)
+    if PHASE2_INGESTION_MODE == "stream":
+        _stream_clean_transactions()
+    else:
+        counts: Counter = Counter()
+        review = _PriceReview()
+        raw_df = read_raw_cache(CSV_PATH) if RAW_CACHE_ENABLED else pd.read_csv(CSV_PATH)
+        df = _clean_batch(raw_df, counts, review)
+        _log_cleaning_summary(counts, review)
+        _run_quality_checks(df)
+        validate_clean_transactions(df)
+        df.to_parquet(OUTPUT_PATH, index=False)
     logger.info("Phase 2 data cleaning completed. Saved cleaned data to %s", OUTPUT_PATH)
 
 
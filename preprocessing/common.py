@@ -1,14 +1,243 @@
+from collections import Counter
+import csv
+import hashlib
 from pathlib import Path
-from typing import Iterable
+import shutil
+from typing import Iterable, Iterator
+import warnings
 
+import numpy as np
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config import COL_STOCK_CODE, DATASET_LAYOUT, DATASET_LAYOUTS, DATE_FORMAT_SAMPLE_SIZE
+
+PRODUCT_DATASET_ORDER = [COL_STOCK_CODE, "invoice_day"]
+# Widening order of the dtypes pandas.read_csv infers for a column, used to combine per-batch inferences.
+DTYPE_WIDENING = ("int64", "float64", "object")
 
 
 def configured_root(project_root: str) -> Path:
     return Path(project_root).resolve()
 
 
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 def ensure_required_columns(df: pd.DataFrame, required_columns: Iterable[str], context: str) -> None:
     missing = [col for col in required_columns if col not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns for {context}: {missing}")
+
+
+def _product_partitioning() -> ds.Partitioning:
+    # Partition values are URI-encoded in directory names ("A/B" -> stock_code=A%2FB) and decoded on read.
+    return ds.HivePartitioning(pa.schema([(COL_STOCK_CODE, pa.string())]), segment_encoding="uri")
+
+
+def _validate_dataset_layout() -> None:
+    if DATASET_LAYOUT not in DATASET_LAYOUTS:
+        raise ValueError(f"Unsupported dataset layout: {DATASET_LAYOUT}")
+
+
+def dataset_exists(path: Path) -> bool:
+    # Only a dataset in the configured layout counts, so switching layouts never extends outputs of the other one.
+    _validate_dataset_layout()
+    return path.is_dir() if DATASET_LAYOUT == "partitioned" else path.is_file()
+
+
+def read_dataset(
+    path: Path, columns: list[str] | None = None, filters: list[tuple[str, str, object]] | None = None
+) -> pd.DataFrame:
+    # Reads a single parquet file or a stock_code-partitioned directory, whichever is on disk. Filters on stock_code
+    # prune whole partitions; a partitioned dataset comes back in the written column order, sorted by product and day.
+    if not path.is_dir():
+        return pd.read_parquet(path, columns=columns, filters=filters)
+    df = pd.read_parquet(path, columns=columns, filters=filters, partitioning=_product_partitioning())
+    if columns is None:
+        pandas_metadata = ds.dataset(path, format="parquet", partitioning=_product_partitioning()).schema.pandas_metadata
+        written_order = [column["name"] for column in (pandas_metadata or {}).get("columns", [])]
+        df = df[[column for column in written_order if column in df.columns]]
+    sort_columns = [column for column in PRODUCT_DATASET_ORDER if column in df.columns]
+    if sort_columns:
+        df = df.sort_values(sort_columns, kind="mergesort")
+    return df.reset_index(drop=True)
+
+
+def read_parquet_columns(
+    path: Path,
+    columns: Iterable[str],
+    context: str,
+    filters: list[tuple[str, str, object]] | None = None,
+) -> pd.DataFrame:
+    # Decodes only the columns a phase declares, and hands its row filters to pyarrow so rows are dropped (and row
+    # groups whose statistics rule them out are skipped) before anything is converted to pandas.
+    columns = list(dict.fromkeys(columns))
+    if path.is_dir():
+        available_columns = ds.dataset(path, format="parquet", partitioning=_product_partitioning()).schema.names
+    else:
+        available_columns = pq.read_schema(path).names
+    missing = [col for col in columns if col not in available_columns]
+    if missing:
+        raise ValueError(f"Missing required columns for {context}: {missing}")
+    return read_dataset(path, columns=columns, filters=filters)
+
+
+def remove_dataset(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def replace_dataset(staging_path: Path, path: Path) -> None:
+    if path.is_dir() or staging_path.is_dir():
+        remove_dataset(path)
+    staging_path.replace(path)
+
+
+def copy_dataset(source_path: Path, path: Path) -> None:
+    remove_dataset(path)
+    if source_path.is_dir():
+        shutil.copytree(source_path, path)
+    else:
+        shutil.copyfile(source_path, path)
+
+
+def write_dataset_part(df: pd.DataFrame, directory: Path, part_name: str) -> None:
+    # Adds the rows as new part files under directory/stock_code=<code>/, each product's rows sorted by day.
+    stock_codes = df[COL_STOCK_CODE]
+    if stock_codes.isna().any() or (stock_codes.astype(str).str.len() == 0).any():
+        raise ValueError("Partitioned datasets require a non-empty stock_code on every row.")
+    sort_columns = [column for column in PRODUCT_DATASET_ORDER if column in df.columns]
+    table = pa.Table.from_pandas(df.sort_values(sort_columns, kind="mergesort"), preserve_index=False)
+    pq.write_to_dataset(
+        table,
+        directory,
+        partitioning=_product_partitioning(),
+        basename_template=f"{part_name}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def merge_dataset_parts(staging_path: Path, path: Path) -> None:
+    # Appending to a partitioned dataset only moves the new part files in; existing partitions are never rewritten.
+    for part_path in sorted(staging_path.rglob("*.parquet")):
+        target_path = path / part_path.relative_to(staging_path)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path.replace(target_path)
+    shutil.rmtree(staging_path)
+
+
+def write_product_dataset(df: pd.DataFrame, path: Path) -> None:
+    # DATASET_LAYOUT "file" writes one parquet file; "partitioned" stages a stock_code-partitioned directory and
+    # swaps it in once complete.
+    _validate_dataset_layout()
+    if DATASET_LAYOUT == "file":
+        if path.is_dir():
+            remove_dataset(path)
+        df.to_parquet(path, index=False)
+        return
+    staging_path = path.with_name(f"{path.name}.partial")
+    remove_dataset(staging_path)
+    write_dataset_part(df, staging_path, "part")
+    replace_dataset(staging_path, path)
+
+
+def read_csv_header(path: Path) -> list[str]:
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        return next(csv.reader(handle), [])
+
+
+def iter_text_csv_batches(path: Path, block_bytes: int, null_values: list[str]) -> Iterator[pa.RecordBatch]:
+    # Every column is read as text so callers can coerce it the way pandas.read_csv would, instead of the
+    # reader failing on the first malformed value or inferring types from the first block only.
+    header = read_csv_header(path)
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=block_bytes),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={column: pa.string() for column in header},
+            null_values=null_values,
+            strings_can_be_null=True,
+        ),
+    )
+    yield from reader
+
+
+def inferred_csv_dtype(values: pd.Series) -> str:
+    # The dtype pandas.read_csv would give this batch of text values.
+    present = values.dropna()
+    if present.empty:
+        return "float64"
+    try:
+        numeric = pd.to_numeric(present)
+    except (ValueError, TypeError):
+        return "object"
+    if numeric.dtype.kind in "iu":
+        return "int64" if len(present) == len(values) else "float64"
+    return "float64" if numeric.dtype.kind == "f" else "object"
+
+
+def widest_dtype(dtypes: Iterable[str]) -> str:
+    return max(dtypes, key=DTYPE_WIDENING.index, default="float64")
+
+
+def _detected_date_formats(unique_text: pd.Series) -> list[str]:
+    # Formats guessed for the leading distinct values, most common first.
+    sample = unique_text[unique_text.map(lambda value: isinstance(value, str))].head(DATE_FORMAT_SAMPLE_SIZE)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        guesses = Counter(guess_datetime_format(value) for value in sample)
+    guesses.pop(None, None)
+
+    # Keep only formats that read strings the way format="mixed" does: dateutil puts the month first in ambiguous
+    # numeric dates and picks a different century than strptime for two-digit years, and a guess must also agree
+    # with the per-element parse on every sampled value it matches.
+    reference = pd.to_datetime(sample, errors="coerce", format="mixed")
+    date_formats = []
+    for date_format, _ in guesses.most_common():
+        if "%y" in date_format:
+            continue
+        if "%d" in date_format and "%m" in date_format and date_format.index("%d") < date_format.index("%m"):
+            continue
+        candidate = pd.to_datetime(sample, errors="coerce", format=date_format)
+        matched = candidate.notna()
+        if (candidate[matched] == reference[matched]).all():
+            date_formats.append(date_format)
+    return date_formats
+
+
+def parse_dates(values: pd.Series) -> tuple[pd.Series, int]:
+    # Same result as pd.to_datetime(values, errors="coerce", format="mixed"), but each distinct string is parsed
+    # once, with the detected formats tried in turn and per-element format="mixed" parsing only for the rest.
+    # Also returns how many non-null rows matched no detected format; the unparseable ones among them are NaT.
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, 0
+
+    codes, unique_values = pd.factorize(values)
+    unique_text = pd.Series(unique_values, dtype=object)
+    parsed = pd.Series(pd.NaT, index=unique_text.index, dtype="datetime64[ns]")
+    unmatched = np.ones(len(unique_text), dtype=bool)
+    for date_format in _detected_date_formats(unique_text):
+        parsed[unmatched] = pd.to_datetime(unique_text[unmatched], errors="coerce", format=date_format)
+        unmatched = parsed.isna().to_numpy()
+        if not unmatched.any():
+            break
+    if unmatched.any():
+        parsed[unmatched] = pd.to_datetime(unique_text[unmatched], errors="coerce", format="mixed")
+
+    present = codes >= 0
+    result = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    result[present] = parsed.to_numpy()[codes[present]]
+    return pd.Series(result, index=values.index, name=values.name), int(unmatched[codes[present]].sum())
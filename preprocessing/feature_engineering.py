@@ -19,7 +19,7 @@ from config import (
     PROJECT_ROOT,
     TRAIN_SPLIT_RATIO,
 )
-from preprocessing.common import configured_root, ensure_required_columns
+from preprocessing.common import configured_root, parse_dates, read_parquet_columns, write_product_dataset
 from utils.data_contracts import validate_phase5_features
 
 logger = logging.getLogger(__name__)
@@ -63,22 +63,24 @@ def _add_seasonality_features(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def _split_train_test(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
-    train_parts: list[pd.DataFrame] = []
-    test_parts: list[pd.DataFrame] = []
-
-    for stock_code, product_df in df.groupby(COL_STOCK_CODE, sort=False):
-        product_df = product_df.sort_values("invoice_day", kind="mergesort").reset_index(drop=True)
-        split_idx = int(len(product_df) * TRAIN_SPLIT_RATIO)
-        if split_idx <= 0 or split_idx >= len(product_df):
-            raise ValueError(
-                "Phase 5 split failed for product "
-                f"{stock_code}: train/test split would be empty with TRAIN_SPLIT_RATIO={TRAIN_SPLIT_RATIO}."
-            )
-        train_parts.append(product_df.iloc[:split_idx].copy())
-        test_parts.append(product_df.iloc[split_idx:].copy())
-
-    train_df = pd.concat(train_parts, ignore_index=True)
-    test_df = pd.concat(test_parts, ignore_index=True)
+    # Each product's first TRAIN_SPLIT_RATIO of days (by date) go to train, computed for all products at once.
+    df = df.sort_values([COL_STOCK_CODE, "invoice_day"], kind="mergesort").reset_index(drop=True)
+    grouped = df.groupby(COL_STOCK_CODE, sort=False)
+    position = grouped.cumcount().to_numpy()
+    product_rows = grouped[COL_STOCK_CODE].transform("size").to_numpy()
+    split_idx = (product_rows * TRAIN_SPLIT_RATIO).astype(int)
+
+    empty_split = (split_idx <= 0) | (split_idx >= product_rows)
+    if empty_split.any():
+        stock_code = df[COL_STOCK_CODE].iloc[int(empty_split.argmax())]
+        raise ValueError(
+            "Phase 5 split failed for product "
+            f"{stock_code}: train/test split would be empty with TRAIN_SPLIT_RATIO={TRAIN_SPLIT_RATIO}."
+        )
+
+    is_train = position < split_idx
+    train_df = df[is_train].reset_index(drop=True)
+    test_df = df[~is_train].reset_index(drop=True)
     return train_df, test_df
 
 
@@ -91,14 +93,13 @@ def run_phase5() -> None:
     if not INPUT_PATH.exists():
         raise FileNotFoundError(f"Daily aggregated dataset not found: {INPUT_PATH}")
 
-    df = pd.read_parquet(INPUT_PATH)
-    ensure_required_columns(
-        df,
+    df = read_parquet_columns(
+        INPUT_PATH,
         [COL_STOCK_CODE, "invoice_day", "daily_units", "avg_daily_price", "daily_revenue"],
         "Phase 5 feature engineering",
     )
 
-    df["invoice_day"] = pd.to_datetime(df["invoice_day"], errors="coerce", format="mixed")
+    df["invoice_day"], _ = parse_dates(df["invoice_day"])
     df = df[df["invoice_day"].notna()].copy()
     if df.empty:
         raise ValueError("Phase 5 feature engineering failed: no valid rows after invoice_day parsing.")
@@ -121,8 +122,8 @@ def run_phase5() -> None:
 
     TRAIN_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     TEST_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    train_df.to_parquet(TRAIN_OUTPUT_PATH, index=False)
-    test_df.to_parquet(TEST_OUTPUT_PATH, index=False)
+    write_product_dataset(train_df, TRAIN_OUTPUT_PATH)
+    write_product_dataset(test_df, TEST_OUTPUT_PATH)
 
     logger.info(
         (
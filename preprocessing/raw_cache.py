@@ -0,0 +1,162 @@
+import json
+import logging
+from pathlib import Path
+import sys
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Ensure project-root imports work when executing this file directly.
+PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT_PATH) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT_PATH))
+
+from config import (
+    PROJECT_ROOT,
+    RAW_CACHE_NUMERIC_COLUMNS,
+    RAW_CACHE_PARSED_DATE_COLUMN,
+    RAW_CACHE_PATH,
+    RAW_COL_INVOICE_DATE,
+    RAW_CSV_BLOCK_BYTES,
+    RAW_CSV_NULL_VALUES,
+)
+from preprocessing.common import (
+    configured_root,
+    file_sha256,
+    inferred_csv_dtype,
+    iter_text_csv_batches,
+    parse_dates,
+    read_csv_header,
+    widest_dtype,
+)
+
+CONFIGURED_ROOT_PATH = configured_root(PROJECT_ROOT)
+CACHE_DIRECTORY_PATH = CONFIGURED_ROOT_PATH / RAW_CACHE_PATH
+METADATA_KEY = b"raw_cache"
+BATCHES_METADATA_KEY = b"raw_cache_batches"
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_metadata(source_sha256: str) -> dict[str, object]:
+    # Anything that changes the cached values or date parse invalidates the cache along with the file contents.
+    return {
+        "source_sha256": source_sha256,
+        "null_values": list(RAW_CSV_NULL_VALUES),
+        "parsed_date_column": RAW_CACHE_PARSED_DATE_COLUMN,
+        "numeric_columns": list(RAW_CACHE_NUMERIC_COLUMNS),
+    }
+
+
+def _stored_metadata(cache_path: Path) -> dict | None:
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+        return json.loads(metadata[METADATA_KEY])
+    except (OSError, KeyError, ValueError, pa.ArrowException):
+        return None
+
+
+def _typed_batch(batch: pa.RecordBatch) -> tuple[pa.RecordBatch, dict[str, dict]]:
+    # Numeric columns are stored coerced to float64 (malformed values become NaN, as Phase 2 counts them);
+    # what only their text could tell, the read_csv dtype and the null count, is kept per batch.
+    columns = []
+    info: dict[str, dict] = {"dtypes": {}, "null_counts": {}}
+    for name, column in zip(batch.schema.names, batch.columns):
+        text = column.to_pandas()
+        info["dtypes"][name] = inferred_csv_dtype(text)
+        info["null_counts"][name] = column.null_count
+        if name in RAW_CACHE_NUMERIC_COLUMNS:
+            column = pa.array(pd.to_numeric(text, errors="coerce").to_numpy(dtype=float), type=pa.float64())
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names), info
+
+
+def _with_parsed_dates(batch: pa.RecordBatch) -> tuple[pa.RecordBatch, int]:
+    if RAW_COL_INVOICE_DATE not in batch.schema.names:
+        return batch, 0
+    parsed_dates, unmatched_dates = parse_dates(batch.column(RAW_COL_INVOICE_DATE).to_pandas())
+    parsed_column = pa.array(parsed_dates.astype("datetime64[ns]"), type=pa.timestamp("ns"))
+    return batch.append_column(RAW_CACHE_PARSED_DATE_COLUMN, parsed_column), unmatched_dates
+
+
+def _build_cache(csv_path: Path, cache_path: Path, metadata: dict[str, object]) -> None:
+    # Streamed batch by batch and staged as *.partial, so building never holds the whole file in memory
+    # and an interrupted build never leaves a cache that looks valid.
+    staging_path = cache_path.with_name(f"{cache_path.name}.partial")
+    writer: pq.ParquetWriter | None = None
+    batch_info: list[dict[str, dict]] = []
+    total_unmatched_dates = 0
+    try:
+        for batch in iter_text_csv_batches(csv_path, RAW_CSV_BLOCK_BYTES, RAW_CSV_NULL_VALUES):
+            if batch.num_rows == 0:
+                continue
+            batch, unmatched_dates = _with_parsed_dates(batch)
+            total_unmatched_dates += unmatched_dates
+            batch, info = _typed_batch(batch)
+            if writer is None:
+                schema = batch.schema.with_metadata({METADATA_KEY: json.dumps(metadata).encode("utf-8")})
+                writer = pq.ParquetWriter(staging_path, schema)
+            # Exactly one row group per batch, so the footer's batch list lines up with the row groups.
+            writer.write_batch(batch, row_group_size=batch.num_rows)
+            batch_info.append(info)
+        if writer is None:
+            header = read_csv_header(csv_path)
+            schema = pa.schema(
+                [(column, pa.float64() if column in RAW_CACHE_NUMERIC_COLUMNS else pa.string()) for column in header]
+            )
+            if RAW_COL_INVOICE_DATE in header:
+                schema = schema.append(pa.field(RAW_CACHE_PARSED_DATE_COLUMN, pa.timestamp("ns")))
+            writer = pq.ParquetWriter(
+                staging_path, schema.with_metadata({METADATA_KEY: json.dumps(metadata).encode("utf-8")})
+            )
+        writer.add_key_value_metadata({BATCHES_METADATA_KEY: json.dumps(batch_info).encode("utf-8")})
+    finally:
+        if writer is not None:
+            writer.close()
+    if total_unmatched_dates:
+        logger.info("Invoice dates matching no detected format (parsed individually): %s", total_unmatched_dates)
+    staging_path.replace(cache_path)
+
+
+def ensure_raw_cache(csv_path: Path) -> Path:
+    source_sha256 = file_sha256(csv_path)
+    cache_path = CACHE_DIRECTORY_PATH / f"{csv_path.stem}.{source_sha256[:16]}.parquet"
+    metadata = _cache_metadata(source_sha256)
+    if cache_path.exists() and _stored_metadata(cache_path) == metadata:
+        logger.info("Raw CSV cache hit: %s", cache_path)
+        return cache_path
+
+    logger.info("Building raw CSV cache %s from %s", cache_path, csv_path)
+    CACHE_DIRECTORY_PATH.mkdir(parents=True, exist_ok=True)
+    _build_cache(csv_path, cache_path, metadata)
+    # Caches of earlier versions of the same file can never be hit again.
+    for stale_path in CACHE_DIRECTORY_PATH.glob(f"{csv_path.stem}.*.parquet"):
+        if stale_path != cache_path:
+            stale_path.unlink(missing_ok=True)
+    return cache_path
+
+
+def _batch_info(parquet_file: pq.ParquetFile) -> list[dict[str, dict]]:
+    return json.loads(parquet_file.metadata.metadata[BATCHES_METADATA_KEY])
+
+
+def raw_cache_dtypes(cache_path: Path) -> dict[str, str]:
+    # The dtype pandas.read_csv would infer for each raw column of the whole file.
+    batch_info = _batch_info(pq.ParquetFile(cache_path))
+    columns = [name for name in pq.read_schema(cache_path).names if name != RAW_CACHE_PARSED_DATE_COLUMN]
+    return {column: widest_dtype(info["dtypes"][column] for info in batch_info) for column in columns}
+
+
+def iter_raw_cache_batches(csv_path: Path) -> Iterator[tuple[pa.RecordBatch, dict[str, dict]]]:
+    # One batch per cached row group, i.e. per RAW_CSV_BLOCK_BYTES block of the source CSV at build time,
+    # with that block's text dtypes and null counts.
+    parquet_file = pq.ParquetFile(ensure_raw_cache(csv_path))
+    for row_group, info in enumerate(_batch_info(parquet_file)):
+        for batch in parquet_file.read_row_group(row_group).combine_chunks().to_batches():
+            yield batch, info
+
+
+def read_raw_cache(csv_path: Path) -> pd.DataFrame:
+    return pd.read_parquet(ensure_raw_cache(csv_path))
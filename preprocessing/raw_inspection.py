@@ -1,9 +1,14 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 import json
 import logging
 from pathlib import Path
 import sys
+from typing import Iterator
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
 # Ensure project-root imports work when executing this file directly.
 PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
@@ -12,18 +17,36 @@ if str(PROJECT_ROOT_PATH) not in sys.path:
 
 from config import (
     INVOICE_CANCELLATION_PREFIX,
+    PHASE1_INSPECTION_MODE,
+    PHASE1_INSPECTION_MODES,
+    PHASE1_QUANTILE_SKETCH_K,
     PHASE1_REPORT_FILE,
+    PHASE1_WORKERS,
     PROJECT_ROOT,
+    RAW_CACHE_ENABLED,
+    RAW_CACHE_NUMERIC_COLUMNS,
+    RAW_CACHE_PARSED_DATE_COLUMN,
     RAW_COL_COUNTRY,
     RAW_COL_INVOICE,
     RAW_COL_INVOICE_DATE,
     RAW_COL_PRICE,
     RAW_COL_QUANTITY,
+    RAW_CSV_BLOCK_BYTES,
+    RAW_CSV_NULL_VALUES,
     RAW_DATA_FILE,
     RAW_INSPECTION_PERCENTILES,
     RAW_DATA_PATH,
     REPORTS_PATH,
 )
+from preprocessing.common import (
+    inferred_csv_dtype,
+    iter_text_csv_batches,
+    parse_dates,
+    read_csv_header,
+    widest_dtype,
+)
+from preprocessing.raw_cache import ensure_raw_cache, iter_raw_cache_batches, raw_cache_dtypes
+from utils.quantile_sketch import QuantileSketch
 
 CONFIGURED_ROOT_PATH = Path(PROJECT_ROOT).resolve()
 CSV_PATH = CONFIGURED_ROOT_PATH / RAW_DATA_PATH / RAW_DATA_FILE
@@ -36,9 +59,81 @@ def _records(df: pd.DataFrame, max_rows: int | None = None) -> list[dict[str, ob
     return view.to_dict(orient="records")
 
 
-def build_report_payload(df: pd.DataFrame) -> dict[str, object]:
-    shape_rows, shape_cols = df.shape
+def _null_summary(columns: list[str], null_counts: pd.Series, row_count: int) -> pd.DataFrame:
+    null_percent = (null_counts / row_count) * 100
+    return pd.DataFrame(
+        {
+            "column": columns,
+            "null_count": [int(null_counts[col]) for col in columns],
+            "null_percent": [round(float(null_percent[col]), 4) for col in columns],
+        }
+    ).sort_values(["null_count", "null_percent"], ascending=False)
+
+
+def _quality_flags(name: str, negative_rows: int, zero_rows: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {"metric": f"negative_{name}_rows", "value": negative_rows},
+            {"metric": f"zero_{name}_rows", "value": zero_rows},
+        ]
+    )
+
+
+def _date_range_text(min_date: pd.Timestamp, max_date: pd.Timestamp, missing_dates: int) -> str:
+    if pd.notna(min_date) and pd.notna(max_date):
+        return (
+            f"Min date: {min_date.strftime('%Y-%m-%d %H:%M:%S')}, "
+            f"Max date: {max_date.strftime('%Y-%m-%d %H:%M:%S')}, "
+            f"Unparseable rows: {missing_dates:,}"
+        )
+    return f"Unable to parse valid dates. Unparseable rows: {missing_dates:,}"
 
+
+def _assemble_payload(
+    shape: tuple[int, int],
+    column_types: pd.DataFrame,
+    null_summary: pd.DataFrame,
+    cancellations: int,
+    cancellation_pct: float,
+    quantity_stats: pd.DataFrame,
+    quantity_quality: pd.DataFrame,
+    price_stats: pd.DataFrame,
+    price_quality: pd.DataFrame,
+    country_distribution: pd.DataFrame,
+    revenue_country: pd.DataFrame,
+    date_range_text: str,
+) -> dict[str, object]:
+    shape_rows, shape_cols = shape
+    return {
+        "phase": 1,
+        "name": "raw_data_inspection",
+        "source_file": str(CSV_PATH),
+        "dataset_shape": {"rows": int(shape_rows), "columns": int(shape_cols)},
+        "column_types": _records(column_types),
+        "null_summary": _records(null_summary),
+        "cancellation_summary": {
+            "invoice_prefix": INVOICE_CANCELLATION_PREFIX,
+            "cancellation_rows": int(cancellations),
+            "cancellation_percent": round(float(cancellation_pct), 4),
+        },
+        "quantity_distribution": _records(quantity_stats),
+        "quantity_quality_flags": _records(quantity_quality),
+        "price_distribution": _records(price_stats),
+        "price_quality_flags": _records(price_quality),
+        "country_distribution_top20": _records(country_distribution, max_rows=20),
+        "revenue_by_country_top20": _records(revenue_country, max_rows=20),
+        "date_range_validation": date_range_text,
+        "frozen_decisions_for_next_phase": [
+            "Keep UK only",
+            "Remove cancelled invoices",
+            "Remove negative quantities",
+            "Remove zero or negative prices",
+            "Temporal boundary already fixed at source (2010-2011 only)",
+        ],
+    }
+
+
+def build_report_payload(df: pd.DataFrame, parsed_dates: pd.Series | None = None) -> dict[str, object]:
     column_types = pd.DataFrame(
         {
             "column": df.columns,
@@ -46,15 +141,7 @@ def build_report_payload(df: pd.DataFrame) -> dict[str, object]:
         }
     )
 
-    null_counts = df.isna().sum()
-    null_percent = (null_counts / len(df)) * 100
-    null_summary = pd.DataFrame(
-        {
-            "column": df.columns,
-            "null_count": [int(null_counts[col]) for col in df.columns],
-            "null_percent": [round(float(null_percent[col]), 4) for col in df.columns],
-        }
-    ).sort_values(["null_count", "null_percent"], ascending=False)
+    null_summary = _null_summary(list(df.columns), df.isna().sum(), len(df))
 
     cancellations = 0
     cancellation_pct = 0.0
@@ -74,18 +161,15 @@ def build_report_payload(df: pd.DataFrame) -> dict[str, object]:
         else pd.DataFrame(columns=["index", RAW_COL_PRICE])
     )
 
-    quantity_quality = pd.DataFrame(
-        [
-            {"metric": "negative_quantity_rows", "value": int((df[RAW_COL_QUANTITY] < 0).sum()) if RAW_COL_QUANTITY in df.columns else 0},
-            {"metric": "zero_quantity_rows", "value": int((df[RAW_COL_QUANTITY] == 0).sum()) if RAW_COL_QUANTITY in df.columns else 0},
-        ]
+    quantity_quality = _quality_flags(
+        "quantity",
+        int((df[RAW_COL_QUANTITY] < 0).sum()) if RAW_COL_QUANTITY in df.columns else 0,
+        int((df[RAW_COL_QUANTITY] == 0).sum()) if RAW_COL_QUANTITY in df.columns else 0,
     )
-
-    price_quality = pd.DataFrame(
-        [
-            {"metric": "negative_price_rows", "value": int((df[RAW_COL_PRICE] < 0).sum()) if RAW_COL_PRICE in df.columns else 0},
-            {"metric": "zero_price_rows", "value": int((df[RAW_COL_PRICE] == 0).sum()) if RAW_COL_PRICE in df.columns else 0},
-        ]
+    price_quality = _quality_flags(
+        "price",
+        int((df[RAW_COL_PRICE] < 0).sum()) if RAW_COL_PRICE in df.columns else 0,
+        int((df[RAW_COL_PRICE] == 0).sum()) if RAW_COL_PRICE in df.columns else 0,
     )
 
     country_distribution = (
@@ -109,58 +193,322 @@ def build_report_payload(df: pd.DataFrame) -> dict[str, object]:
 
     date_range_text = f"{RAW_COL_INVOICE_DATE} column not found."
     if RAW_COL_INVOICE_DATE in df.columns:
-        parsed_dates = pd.to_datetime(df[RAW_COL_INVOICE_DATE], errors="coerce", format="mixed")
-        min_date = parsed_dates.min()
-        max_date = parsed_dates.max()
-        missing_dates = int(parsed_dates.isna().sum())
-        if pd.notna(min_date) and pd.notna(max_date):
-            date_range_text = (
-                f"Min date: {min_date.strftime('%Y-%m-%d %H:%M:%S')}, "
-                f"Max date: {max_date.strftime('%Y-%m-%d %H:%M:%S')}, "
-                f"Unparseable rows: {missing_dates:,}"
-            )
-        else:
-            date_range_text = f"Unable to parse valid dates. Unparseable rows: {missing_dates:,}"
+        if parsed_dates is None:
+            parsed_dates, _ = parse_dates(df[RAW_COL_INVOICE_DATE])
+        date_range_text = _date_range_text(parsed_dates.min(), parsed_dates.max(), int(parsed_dates.isna().sum()))
 
-    return {
-        "phase": 1,
-        "name": "raw_data_inspection",
-        "source_file": str(CSV_PATH),
-        "dataset_shape": {"rows": int(shape_rows), "columns": int(shape_cols)},
-        "column_types": _records(column_types),
-        "null_summary": _records(null_summary),
-        "cancellation_summary": {
-            "invoice_prefix": INVOICE_CANCELLATION_PREFIX,
-            "cancellation_rows": int(cancellations),
-            "cancellation_percent": round(float(cancellation_pct), 4),
-        },
-        "quantity_distribution": _records(quantity_stats),
-        "quantity_quality_flags": _records(quantity_quality),
-        "price_distribution": _records(price_stats),
-        "price_quality_flags": _records(price_quality),
-        "country_distribution_top20": _records(country_distribution, max_rows=20),
-        "revenue_by_country_top20": _records(revenue_country, max_rows=20),
-        "date_range_validation": date_range_text,
-        "frozen_decisions_for_next_phase": [
-            "Keep UK only",
-            "Remove cancelled invoices",
-            "Remove negative quantities",
-            "Remove zero or negative prices",
-            "Temporal boundary already fixed at source (2010-2011 only)",
-        ],
+    return _assemble_payload(
+        df.shape,
+        column_types,
+        null_summary,
+        cancellations,
+        cancellation_pct,
+        quantity_stats,
+        quantity_quality,
+        price_stats,
+        price_quality,
+        country_distribution,
+        revenue_country,
+        date_range_text,
+    )
+
+
+def _country_key(value: object) -> object:
+    return None if pd.isna(value) else value
+
+
+def _earliest(left: pd.Timestamp, right: pd.Timestamp) -> pd.Timestamp:
+    return right if pd.isna(left) or (pd.notna(right) and right < left) else left
+
+
+def _latest(left: pd.Timestamp, right: pd.Timestamp) -> pd.Timestamp:
+    return right if pd.isna(left) or (pd.notna(right) and right > left) else left
+
+
+class _NumericSummary:
+    """Exact count, sum, variance and extremes of one numeric column, with a quantile sketch for percentiles."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.m2 = 0.0
+        self.minimum = np.nan
+        self.maximum = np.nan
+        self.negative_rows = 0
+        self.zero_rows = 0
+        self.sketch = QuantileSketch(PHASE1_QUANTILE_SKETCH_K)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "_NumericSummary":
+        summary = cls()
+        values = values[~np.isnan(values)]
+        summary.count = len(values)
+        if summary.count:
+            summary.total = float(values.sum())
+            summary.m2 = float(((values - summary.total / summary.count) ** 2).sum())
+            summary.minimum = float(values.min())
+            summary.maximum = float(values.max())
+            summary.negative_rows = int((values < 0).sum())
+            summary.zero_rows = int((values == 0).sum())
+        summary.sketch.update(values)
+        return summary
+
+    def merge(self, other: "_NumericSummary") -> None:
+        if other.count and self.count:
+            # Chan et al. pairwise update keeps the variance stable however the rows are split.
+            delta = other.total / other.count - self.total / self.count
+            self.m2 += other.m2 + delta**2 * self.count * other.count / (self.count + other.count)
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+        elif other.count:
+            self.m2 = other.m2
+            self.minimum = other.minimum
+            self.maximum = other.maximum
+        self.count += other.count
+        self.total += other.total
+        self.negative_rows += other.negative_rows
+        self.zero_rows += other.zero_rows
+        self.sketch.merge(other.sketch)
+
+    def describe_frame(self, column: str) -> pd.DataFrame:
+        # Same rows as Series.describe: count, mean, std, min, the percentiles (with the median) and max.
+        percentiles = sorted(set(RAW_INSPECTION_PERCENTILES) | {0.5})
+        mean = self.total / self.count if self.count else np.nan
+        std = float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+        values = [float(self.count), mean, std, self.minimum, *self.sketch.quantiles(percentiles), self.maximum]
+        labels = ["count", "mean", "std", "min", *[f"{percentile * 100:g}%" for percentile in percentiles], "max"]
+        return pd.Series(values, index=labels, name=column).to_frame().reset_index()
+
+
+class _InspectionState:
+    """One-pass, mergeable Phase 1 statistics; merging batch states in file order gives the report for the file."""
+
+    def __init__(self, columns: list[str]) -> None:
+        self.columns = columns
+        self.row_count = 0
+        self.null_counts = dict.fromkeys(columns, 0)
+        self.dtypes: dict[str, str] = {}
+        self.cancellations = 0
+        self.numeric = {col: _NumericSummary() for col in (RAW_COL_QUANTITY, RAW_COL_PRICE) if col in columns}
+        # Keyed in first-seen order, which is what value_counts uses to order equal counts.
+        self.country_rows: dict[object, int] = {}
+        self.country_revenue: dict[object, float] = {}
+        self.min_date = pd.NaT
+        self.max_date = pd.NaT
+        self.unparseable_dates = 0
+
+    @classmethod
+    def from_batch(cls, batch: pa.RecordBatch, cache_info: dict[str, dict] | None = None) -> "_InspectionState":
+        # Cached batches carry their text dtypes and null counts, since their numeric columns are no longer text.
+        df = batch.to_pandas()
+        parsed_dates = df.pop(RAW_CACHE_PARSED_DATE_COLUMN) if RAW_CACHE_PARSED_DATE_COLUMN in df.columns else None
+        state = cls(list(df.columns))
+        state.row_count = batch.num_rows
+        for col in state.columns:
+            if cache_info is None:
+                state.null_counts[col] = batch.column(col).null_count
+                state.dtypes[col] = inferred_csv_dtype(df[col])
+            else:
+                state.null_counts[col] = cache_info["null_counts"][col]
+                state.dtypes[col] = cache_info["dtypes"][col]
+
+        if RAW_COL_INVOICE in df.columns:
+            state.cancellations = int(df[RAW_COL_INVOICE].str.startswith(INVOICE_CANCELLATION_PREFIX, na=False).sum())
+
+        numeric_values = {
+            col: pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float) for col in state.numeric
+        }
+        for col, values in numeric_values.items():
+            state.numeric[col] = _NumericSummary.from_values(values)
+
+        if RAW_COL_COUNTRY in df.columns:
+            for country, rows in df[RAW_COL_COUNTRY].value_counts(dropna=False, sort=False).items():
+                state.country_rows[_country_key(country)] = int(rows)
+            if len(numeric_values) == 2:
+                revenue = pd.Series(numeric_values[RAW_COL_QUANTITY] * numeric_values[RAW_COL_PRICE])
+                revenue_by_country = revenue.groupby(df[RAW_COL_COUNTRY], dropna=False, sort=False).sum()
+                for country, total in revenue_by_country.items():
+                    state.country_revenue[_country_key(country)] = float(total)
+
+        if RAW_COL_INVOICE_DATE in df.columns:
+            if parsed_dates is None:
+                parsed_dates, _ = parse_dates(df[RAW_COL_INVOICE_DATE])
+            state.min_date = parsed_dates.min()
+            state.max_date = parsed_dates.max()
+            state.unparseable_dates = int(parsed_dates.isna().sum())
+        return state
+
+    def merge(self, other: "_InspectionState") -> None:
+        self.row_count += other.row_count
+        for col in self.columns:
+            self.null_counts[col] += other.null_counts[col]
+            if col in other.dtypes:
+                # Stream mode keeps the widest dtype seen in any batch.
+                self.dtypes[col] = widest_dtype([self.dtypes.get(col, other.dtypes[col]), other.dtypes[col]])
+        self.cancellations += other.cancellations
+        for col, summary in self.numeric.items():
+            summary.merge(other.numeric[col])
+        for country, rows in other.country_rows.items():
+            self.country_rows[country] = self.country_rows.get(country, 0) + rows
+        for country, total in other.country_revenue.items():
+            self.country_revenue[country] = self.country_revenue.get(country, 0.0) + total
+        self.min_date = _earliest(self.min_date, other.min_date)
+        self.max_date = _latest(self.max_date, other.max_date)
+        self.unparseable_dates += other.unparseable_dates
+
+
+def _country_series(values: dict[object, float], name: str) -> pd.Series:
+    index = pd.Index([np.nan if country is None else country for country in values], dtype=object)
+    return pd.Series(list(values.values()), index=index, name=name)
+
+
+def _stream_report_payload(state: _InspectionState) -> dict[str, object]:
+    columns = state.columns
+    column_types = pd.DataFrame({"column": columns, "dtype": [state.dtypes.get(col, "object") for col in columns]})
+    null_summary = _null_summary(columns, pd.Series(state.null_counts, dtype="int64"), state.row_count)
+    cancellation_pct = (state.cancellations / state.row_count) * 100 if state.row_count else 0.0
+
+    quantity = state.numeric.get(RAW_COL_QUANTITY)
+    price = state.numeric.get(RAW_COL_PRICE)
+    quantity_stats = (
+        quantity.describe_frame(RAW_COL_QUANTITY) if quantity else pd.DataFrame(columns=["index", RAW_COL_QUANTITY])
+    )
+    price_stats = price.describe_frame(RAW_COL_PRICE) if price else pd.DataFrame(columns=["index", RAW_COL_PRICE])
+    quantity_quality = _quality_flags(
+        "quantity", quantity.negative_rows if quantity else 0, quantity.zero_rows if quantity else 0
+    )
+    price_quality = _quality_flags("price", price.negative_rows if price else 0, price.zero_rows if price else 0)
+
+    if RAW_COL_COUNTRY in columns:
+        country_distribution = (
+            _country_series(state.country_rows, "count")
+            .sort_values(ascending=False)
+            .rename_axis("country")
+            .reset_index(name="row_count")
+        )
+    else:
+        country_distribution = pd.DataFrame(columns=["country", "row_count"])
+
+    if quantity and price and RAW_COL_COUNTRY in columns:
+        # groupby orders the groups by country (missing last) before the revenue sort; ties keep that order.
+        revenue_country = (
+            _country_series(state.country_revenue, "Revenue")
+            .sort_index(na_position="last")
+            .sort_values(ascending=False)
+            .rename_axis("country")
+            .reset_index()
+        )
+    else:
+        revenue_country = pd.DataFrame(columns=["country", "Revenue"])
+
+    date_range_text = f"{RAW_COL_INVOICE_DATE} column not found."
+    if RAW_COL_INVOICE_DATE in columns:
+        date_range_text = _date_range_text(state.min_date, state.max_date, state.unparseable_dates)
+
+    payload = _assemble_payload(
+        (state.row_count, len(columns)),
+        column_types,
+        null_summary,
+        state.cancellations,
+        cancellation_pct,
+        quantity_stats,
+        quantity_quality,
+        price_stats,
+        price_quality,
+        country_distribution,
+        revenue_country,
+        date_range_text,
+    )
+    payload["statistics_engine"] = {
+        "mode": "stream",
+        "quantile_sketch_k": PHASE1_QUANTILE_SKETCH_K,
+        # Worst-case distance, in rows, between a reported percentile and the exact one (0 = exact).
+        "percentile_max_rank_error": {col: summary.sketch.rank_error for col, summary in state.numeric.items()},
     }
+    return payload
+
+
+def _iter_batch_states() -> Iterator[_InspectionState]:
+    if RAW_CACHE_ENABLED:
+        batches = iter_raw_cache_batches(CSV_PATH)
+    else:
+        batches = (
+            (batch, None) for batch in iter_text_csv_batches(CSV_PATH, RAW_CSV_BLOCK_BYTES, RAW_CSV_NULL_VALUES)
+        )
+    if PHASE1_WORKERS <= 1:
+        for batch, cache_info in batches:
+            yield _InspectionState.from_batch(batch, cache_info)
+        return
+
+    # Batches are summarised in parallel and consumed in file order; the bounded window caps batches in flight.
+    with ProcessPoolExecutor(max_workers=PHASE1_WORKERS) as executor:
+        pending: deque[Future] = deque()
+        for batch, cache_info in batches:
+            pending.append(executor.submit(_InspectionState.from_batch, batch, cache_info))
+            if len(pending) >= 2 * PHASE1_WORKERS:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def build_stream_report_payload() -> dict[str, object]:
+    state = _InspectionState(read_csv_header(CSV_PATH))
+    for batch_state in _iter_batch_states():
+        state.merge(batch_state)
+    return _stream_report_payload(state)
+
+
+def _read_cached_raw_frame() -> tuple[pd.DataFrame, pd.Series | None]:
+    # Give the cached columns the dtypes and missing markers pandas.read_csv would produce.
+    cache_path = ensure_raw_cache(CSV_PATH)
+    dtypes = raw_cache_dtypes(cache_path)
+    malformed = [col for col in RAW_CACHE_NUMERIC_COLUMNS if dtypes.get(col) == "object"]
+    if malformed:
+        # Only the CSV still holds the text of malformed numeric values, which the exact report describes.
+        logger.info("Non-numeric values in %s; reading the raw CSV instead of the cache.", malformed)
+        return pd.read_csv(CSV_PATH), None
+
+    df = pd.read_parquet(cache_path)
+    parsed_dates = df.pop(RAW_CACHE_PARSED_DATE_COLUMN) if RAW_CACHE_PARSED_DATE_COLUMN in df.columns else None
+    for col in df.columns:
+        dtype = dtypes[col]
+        if col in RAW_CACHE_NUMERIC_COLUMNS:
+            if dtype == "int64":
+                df[col] = df[col].astype(dtype)
+        elif dtype == "object":
+            df[col] = df[col].where(df[col].notna(), np.nan)
+        else:
+            df[col] = pd.to_numeric(df[col]).astype(dtype)
+    return df, parsed_dates
+
+
+def _validate_phase1_settings() -> None:
+    if PHASE1_INSPECTION_MODE not in PHASE1_INSPECTION_MODES:
+        raise ValueError(
+            f"Unsupported PHASE1_INSPECTION_MODE: {PHASE1_INSPECTION_MODE}. Supported: {list(PHASE1_INSPECTION_MODES)}"
+        )
+    if PHASE1_QUANTILE_SKETCH_K < 2 or PHASE1_WORKERS < 1:
+        raise ValueError("PHASE1_QUANTILE_SKETCH_K must be at least 2 and PHASE1_WORKERS at least 1.")
 
 
 def run_phase1() -> None:
     logger.info("Phase 1 raw inspection started.")
+    _validate_phase1_settings()
 
     if not CSV_PATH.exists():
         logger.error("Dataset missing at %s", CSV_PATH)
         raise FileNotFoundError(f"Dataset not found: {CSV_PATH}")
 
-    df = pd.read_csv(CSV_PATH)
     REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    report_payload = build_report_payload(df)
+    if PHASE1_INSPECTION_MODE == "stream":
+        logger.info("Phase 1 stream inspection | workers: %s | sketch k: %s", PHASE1_WORKERS, PHASE1_QUANTILE_SKETCH_K)
+        report_payload = build_stream_report_payload()
+    else:
+        if RAW_CACHE_ENABLED:
+            df, parsed_dates = _read_cached_raw_frame()
+        else:
+            df, parsed_dates = pd.read_csv(CSV_PATH), None
+        report_payload = build_report_payload(df, parsed_dates)
     REPORT_PATH.write_text(json.dumps(report_payload, indent=2), encoding="utf-8")
     logger.info("Phase 1 raw inspection completed. Report saved to %s", REPORT_PATH)
 
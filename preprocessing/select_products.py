@@ -3,6 +3,7 @@ import logging
 from pathlib import Path
 import sys
 
+import numpy as np
 import pandas as pd
 
 # Ensure project-root imports work when executing this file directly.
@@ -19,14 +20,19 @@ from config import (
     COL_STOCK_CODE,
     MIN_ACTIVE_DAYS,
     MIN_PRICE_STD,
+    PHASE3_CATALOG_MAX_PRODUCTS,
     PHASE3_REPORT_FILE,
+    PHASE3_SELECTION_MODE,
+    PHASE3_SELECTION_MODES,
+    PRODUCT_DAY_INDEX_PATH,
     PROJECT_ROOT,
     REPORTS_PATH,
     SELECTED_PRODUCTS_PATH,
     SELECTED_PRODUCT_COUNT,
 )
-from preprocessing.common import configured_root, ensure_required_columns
-from utils.data_contracts import validate_selected_products
+from preprocessing.common import configured_root, parse_dates, read_parquet_columns
+from utils.data_contracts import validate_product_day_index, validate_selected_products
+from utils.product_day_index import ProductDayIndex
 
 logger = logging.getLogger(__name__)
 
@@ -34,20 +40,9 @@ CONFIGURED_ROOT_PATH = configured_root(PROJECT_ROOT)
 INPUT_PATH = CONFIGURED_ROOT_PATH / CLEAN_DATA_PATH
 REPORT_PATH = CONFIGURED_ROOT_PATH / REPORTS_PATH / PHASE3_REPORT_FILE
 SELECTED_PRODUCTS_OUTPUT_PATH = CONFIGURED_ROOT_PATH / SELECTED_PRODUCTS_PATH
+PRODUCT_DAY_INDEX_OUTPUT_PATH = CONFIGURED_ROOT_PATH / PRODUCT_DAY_INDEX_PATH
 
-
-def _validate_columns(df: pd.DataFrame) -> None:
-    ensure_required_columns(
-        df,
-        [
-            COL_STOCK_CODE,
-            COL_DESCRIPTION,
-            COL_INVOICE_DATE,
-            COL_PRICE,
-            COL_QUANTITY,
-        ],
-        "Phase 3 product selection",
-    )
+INPUT_COLUMNS = [COL_STOCK_CODE, COL_DESCRIPTION, COL_INVOICE_DATE, COL_PRICE, COL_QUANTITY]
 
 
 def _build_description_map(df: pd.DataFrame) -> pd.Series:
@@ -61,11 +56,48 @@ def _build_description_map(df: pd.DataFrame) -> pd.Series:
     if non_empty.empty:
         return pd.Series(dtype="string")
 
-    # Use the most frequent description for each stock code to handle minor text variants.
-    return non_empty.groupby(COL_STOCK_CODE)[COL_DESCRIPTION].agg(lambda s: s.mode().iloc[0])
+    # Use the most frequent description for each stock code to handle minor text variants; ties go to the
+    # smallest description, as with Series.mode.
+    counts = non_empty.groupby([COL_STOCK_CODE, COL_DESCRIPTION]).size().reset_index(name="count")
+    counts = counts.sort_values(
+        [COL_STOCK_CODE, "count", COL_DESCRIPTION], ascending=[True, False, True], kind="mergesort"
+    )
+    return counts.drop_duplicates(COL_STOCK_CODE).set_index(COL_STOCK_CODE)[COL_DESCRIPTION]
+
+
+def _validate_phase3_settings(selection_mode: str, catalog_max_products: int | None) -> None:
+    if selection_mode not in PHASE3_SELECTION_MODES:
+        raise ValueError(f"Unsupported Phase 3 selection mode: {selection_mode}")
+    if catalog_max_products is not None and catalog_max_products < 1:
+        raise ValueError("PHASE3_CATALOG_MAX_PRODUCTS must be a positive integer or None.")
+
+
+def _select_products(eligible: pd.DataFrame, selection_mode: str, catalog_max_products: int | None) -> pd.DataFrame:
+    if selection_mode == "top":
+        return eligible.sort_values("revenue", ascending=False).head(SELECTED_PRODUCT_COUNT).copy()
+
+    # Catalog mode: a linear-time partition finds the K-th largest revenue so only products at or above it are
+    # sorted; ties on revenue go to the smaller stock code, so the cut at K is deterministic.
+    candidates = eligible
+    max_products = catalog_max_products or len(eligible)
+    if max_products < len(eligible):
+        revenue = eligible["revenue"].to_numpy()
+        kth_revenue = -np.partition(-revenue, max_products - 1)[max_products - 1]
+        candidates = eligible[revenue >= kth_revenue]
+    return (
+        candidates.sort_values(["revenue", COL_STOCK_CODE], ascending=[False, True], kind="mergesort")
+        .head(max_products)
+        .copy()
+    )
 
 
-def _build_report_payload(metrics: pd.DataFrame, eligible: pd.DataFrame, selected: pd.DataFrame) -> dict[str, object]:
+def _build_report_payload(
+    metrics: pd.DataFrame,
+    eligible: pd.DataFrame,
+    selected: pd.DataFrame,
+    selection_mode: str,
+    catalog_max_products: int | None,
+) -> dict[str, object]:
     return {
         "phase": 3,
         "name": "product_selection",
@@ -73,6 +105,8 @@ def _build_report_payload(metrics: pd.DataFrame, eligible: pd.DataFrame, selecte
             "min_price_std": float(MIN_PRICE_STD),
             "min_active_days": int(MIN_ACTIVE_DAYS),
             "selected_product_count": int(SELECTED_PRODUCT_COUNT),
+            "selection_mode": selection_mode,
+            "catalog_max_products": catalog_max_products,
         },
         "run_summary": {
             "products_analyzed": int(len(metrics)),
@@ -83,19 +117,22 @@ def _build_report_payload(metrics: pd.DataFrame, eligible: pd.DataFrame, selecte
     }
 
 
-def run_phase3() -> None:
+def run_phase3(
+    selection_mode: str = PHASE3_SELECTION_MODE, catalog_max_products: int | None = PHASE3_CATALOG_MAX_PRODUCTS
+) -> None:
     logger.info("Phase 3 product selection started.")
     logger.info("Input dataset: %s", INPUT_PATH)
     logger.info("Output report: %s", REPORT_PATH)
     logger.info("Output selected products dataset: %s", SELECTED_PRODUCTS_OUTPUT_PATH)
+    logger.info("Output product-day index: %s", PRODUCT_DAY_INDEX_OUTPUT_PATH)
 
+    _validate_phase3_settings(selection_mode, catalog_max_products)
     if not INPUT_PATH.exists():
         logger.error("Clean dataset missing at %s", INPUT_PATH)
         raise FileNotFoundError(f"Dataset not found: {INPUT_PATH}")
 
-    df = pd.read_parquet(INPUT_PATH)
-    _validate_columns(df)
-    df[COL_INVOICE_DATE] = pd.to_datetime(df[COL_INVOICE_DATE], errors="coerce", format="mixed")
+    df = read_parquet_columns(INPUT_PATH, INPUT_COLUMNS, "Phase 3 product selection")
+    df[COL_INVOICE_DATE], _ = parse_dates(df[COL_INVOICE_DATE])
     invalid_dates = int(df[COL_INVOICE_DATE].isna().sum())
     if invalid_dates:
         logger.info("Dropping rows with invalid invoice dates in Phase 3: %s", invalid_dates)
@@ -104,18 +141,18 @@ def run_phase3() -> None:
     if df.empty:
         raise ValueError("Phase 3 cannot continue: cleaned dataset is empty after date validation.")
 
-    df["invoice_day"] = df[COL_INVOICE_DATE].dt.date
     df["revenue_line"] = df[COL_PRICE] * df[COL_QUANTITY]
 
-    metrics = (
-        df.groupby(COL_STOCK_CODE)
-        .agg(
-            revenue=("revenue_line", "sum"),
-            price_std=(COL_PRICE, "std"),
-            active_days=("invoice_day", "nunique"),
-        )
-        .reset_index()
+    # Active days are popcounts of the product x day bitmap rather than a nunique over per-row date objects.
+    activity_index = ProductDayIndex.from_transactions(df[COL_STOCK_CODE], df[COL_INVOICE_DATE])
+    metrics = df.groupby(COL_STOCK_CODE).agg(
+        revenue=("revenue_line", "sum"),
+        price_std=(COL_PRICE, "std"),
+    )
+    metrics["active_days"] = pd.Series(activity_index.active_days(), index=activity_index.stock_codes).reindex(
+        metrics.index
     )
+    metrics = metrics.reset_index()
     logger.info("Computed product-level metrics for %s products.", len(metrics))
 
     eligible = metrics[
@@ -128,25 +165,25 @@ def run_phase3() -> None:
         len(eligible),
     )
 
-    selected = (
-        eligible.sort_values("revenue", ascending=False)
-        .head(SELECTED_PRODUCT_COUNT)
-        .copy()
-    )
+    selected = _select_products(eligible, selection_mode, catalog_max_products)
 
-    description_map = _build_description_map(df)
+    # Descriptions are only needed for the selected products.
+    description_map = _build_description_map(df[df[COL_STOCK_CODE].isin(selected[COL_STOCK_CODE])])
     selected[COL_DESCRIPTION] = selected[COL_STOCK_CODE].map(description_map).fillna("UNKNOWN DESCRIPTION")
     selected = selected[
         [COL_STOCK_CODE, COL_DESCRIPTION, "revenue", "price_std", "active_days"]
     ].reset_index(drop=True)
 
-    validate_selected_products(selected)
-    logger.info("Selected top %s products for downstream phases.", SELECTED_PRODUCT_COUNT)
+    validate_selected_products(selected, selection_mode, catalog_max_products)
+    logger.info("Selected top %s products for downstream phases.", len(selected))
 
     REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
     SELECTED_PRODUCTS_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     selected.to_parquet(SELECTED_PRODUCTS_OUTPUT_PATH, index=False)
-    report_payload = _build_report_payload(metrics, eligible, selected)
+    validate_product_day_index(activity_index.to_frame())
+    PRODUCT_DAY_INDEX_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    activity_index.write(PRODUCT_DAY_INDEX_OUTPUT_PATH)
+    report_payload = _build_report_payload(metrics, eligible, selected, selection_mode, catalog_max_products)
     REPORT_PATH.write_text(json.dumps(report_payload, indent=2), encoding="utf-8")
     logger.info(
         "Phase 3 product selection completed. Saved report to %s and selected products to %s",
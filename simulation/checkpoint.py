@@ -0,0 +1,69 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+import shutil
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+
+class RunCheckpoint:
+    """Completed work units of one run, stored as parquet parts next to a manifest keyed by a run fingerprint."""
+
+    def __init__(self, directory: Path, fingerprint: dict, resume: bool) -> None:
+        self.directory = directory
+        # Round-trip through JSON so the comparison below sees the same types as the stored manifest.
+        self.fingerprint = json.loads(json.dumps(fingerprint))
+        self.completed: set[int] = set()
+
+        manifest = self._read_manifest()
+        if resume and manifest is not None and manifest.get("fingerprint") == self.fingerprint:
+            self.completed = set(manifest["completed"])
+            logger.info("Resuming from checkpoint %s | completed units: %s", directory, len(self.completed))
+        else:
+            if resume:
+                logger.warning("No compatible checkpoint in %s; starting from scratch.", directory)
+            self.clear()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._write_manifest()
+
+    def _read_manifest(self) -> dict | None:
+        manifest_path = self.directory / MANIFEST_FILE
+        if not manifest_path.exists():
+            return None
+        try:
+            return json.loads(manifest_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+
+    def _write_manifest(self) -> None:
+        # Written after the unit's parts and swapped in atomically, so a crash never lists a unit without its parts.
+        staging_path = self.directory / f"{MANIFEST_FILE}.partial"
+        staging_path.write_text(
+            json.dumps({"fingerprint": self.fingerprint, "completed": sorted(self.completed)}, indent=2),
+            encoding="utf-8",
+        )
+        staging_path.replace(self.directory / MANIFEST_FILE)
+
+    def _part_path(self, unit: int, name: str) -> Path:
+        return self.directory / f"unit_{unit:06d}_{name}.parquet"
+
+    def save(self, unit: int, frames: dict[str, pd.DataFrame]) -> None:
+        for name, df in frames.items():
+            df.to_parquet(self._part_path(unit, name), index=False)
+        self.completed.add(unit)
+        self._write_manifest()
+
+    def load(self, unit: int, names: list[str]) -> dict[str, pd.DataFrame]:
+        return {name: pd.read_parquet(self._part_path(unit, name)) for name in names}
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,191 @@
+import json
+import logging
+import math
+from pathlib import Path
+import sys
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+# Ensure project-root imports work when executing this file directly.
+PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT_PATH) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT_PATH))
+
+from config import (
+    PHASE6_FEATURE_COLUMNS,
+    PHASE6_TARGET_COLUMN,
+    PHASE7_MC_BLOCK_ROWS,
+    PHASE7_MC_DRAWS,
+    PHASE7_MC_MEMORY_BUDGET_MB,
+    PHASE7_MC_SEED,
+    PHASE7_MONTE_CARLO_FROZEN_COLUMNS,
+    PHASE7_STRATEGIES,
+    PROJECT_ROOT,
+    SIMULATION_MONTE_CARLO_PATH,
+    SIMULATION_MONTE_CARLO_SUMMARY_PATH,
+)
+from preprocessing.common import configured_root, ensure_required_columns
+from simulation.simulator import chosen_candidate_index, load_simulation_inputs, score_candidates, select_prices_batch
+from utils.data_contracts import validate_phase7_monte_carlo
+
+logger = logging.getLogger(__name__)
+
+CONFIGURED_ROOT_PATH = configured_root(PROJECT_ROOT)
+REVENUE_OUTPUT_PATH = CONFIGURED_ROOT_PATH / SIMULATION_MONTE_CARLO_PATH
+SUMMARY_OUTPUT_PATH = CONFIGURED_ROOT_PATH / SIMULATION_MONTE_CARLO_SUMMARY_PATH
+
+# Scenario demand, scenario revenue and the gathered strategy slices are alive at the same time.
+SCENARIO_ARRAYS_PER_CHUNK = 3
+
+
+def _test_residuals(test_df: pd.DataFrame, model) -> np.ndarray:
+    # Phase 6 test residuals: observed daily_units minus the model prediction at the observed features.
+    predictions = np.asarray(model.predict(test_df[PHASE6_FEATURE_COLUMNS]), dtype=float)
+    return test_df[PHASE6_TARGET_COLUMN].to_numpy(dtype=float) - predictions
+
+
+def _chunk_rows(grid_width: int, draws: int) -> int:
+    # Whole RNG blocks only, so chunk boundaries never change which shocks a row receives.
+    bytes_per_row = SCENARIO_ARRAYS_PER_CHUNK * grid_width * draws * np.dtype(float).itemsize
+    budget_rows = int(PHASE7_MC_MEMORY_BUDGET_MB * 1024 * 1024 // bytes_per_row)
+    if budget_rows < PHASE7_MC_BLOCK_ROWS:
+        logger.warning(
+            "Phase 7 Monte Carlo | one block of %s rows needs %.1f MB of scenario arrays, over the %s MB budget; "
+            "lower PHASE7_MC_BLOCK_ROWS or PHASE7_MC_DRAWS to stay within it.",
+            PHASE7_MC_BLOCK_ROWS,
+            PHASE7_MC_BLOCK_ROWS * bytes_per_row / (1024 * 1024),
+            PHASE7_MC_MEMORY_BUDGET_MB,
+        )
+    return max(1, budget_rows // PHASE7_MC_BLOCK_ROWS) * PHASE7_MC_BLOCK_ROWS
+
+
+def _draw_demand_shocks(residuals: np.ndarray, start: int, stop: int, draws: int) -> np.ndarray:
+    # Each block of rows has its own seeded stream, so the draws are identical for any chunk size.
+    blocks = []
+    for block in range(start // PHASE7_MC_BLOCK_ROWS, math.ceil(stop / PHASE7_MC_BLOCK_ROWS)):
+        block_rows = min(PHASE7_MC_BLOCK_ROWS, stop - block * PHASE7_MC_BLOCK_ROWS)
+        rng = np.random.default_rng([PHASE7_MC_SEED, block])
+        blocks.append(residuals[rng.integers(0, len(residuals), size=(block_rows, draws))])
+    return np.concatenate(blocks, axis=0)
+
+
+def simulate_revenue_draws(
+    candidate_prices: np.ndarray,
+    predicted_demand: np.ndarray,
+    chosen_idx_by_strategy: dict[str, np.ndarray],
+    residuals: np.ndarray,
+    draws: int = PHASE7_MC_DRAWS,
+) -> dict[str, np.ndarray]:
+    row_count, grid_width = candidate_prices.shape
+    chunk_rows = _chunk_rows(grid_width, draws)
+    totals = {strategy_name: np.zeros(draws, dtype=float) for strategy_name in chosen_idx_by_strategy}
+
+    for start in range(0, row_count, chunk_rows):
+        stop = min(start + chunk_rows, row_count)
+        shocks = _draw_demand_shocks(residuals, start, stop, draws)
+        # (rows x grid x draws): all candidates of a row share that row's demand shock within a draw.
+        scenario_revenue = predicted_demand[start:stop, :, None] + shocks[:, None, :]
+        np.clip(scenario_revenue, 0.0, None, out=scenario_revenue)
+        scenario_revenue *= candidate_prices[start:stop, :, None]
+        for strategy_name, chosen_idx in chosen_idx_by_strategy.items():
+            chosen_revenue = np.take_along_axis(scenario_revenue, chosen_idx[start:stop, None, None], axis=1)
+            totals[strategy_name] += chosen_revenue[:, 0, :].sum(axis=0)
+    return totals
+
+
+def _summarize_draws(
+    totals: dict[str, np.ndarray], predicted_totals: dict[str, float], residual_count: int
+) -> dict[str, object]:
+    strategies: dict[str, dict[str, float]] = {}
+    for strategy_name, draws in totals.items():
+        tail = np.sort(draws)[: max(1, int(len(draws) * 0.05))]
+        strategies[strategy_name] = {
+            "predicted_total_revenue": predicted_totals[strategy_name],
+            "mean_total_revenue": float(draws.mean()),
+            "std_total_revenue": float(draws.std(ddof=1)) if len(draws) > 1 else 0.0,
+            "p05_total_revenue": float(np.quantile(draws, 0.05)),
+            "p50_total_revenue": float(np.quantile(draws, 0.50)),
+            "p95_total_revenue": float(np.quantile(draws, 0.95)),
+            "cvar05_total_revenue": float(tail.mean()),
+        }
+    win_probability = {
+        f"{first}>{second}": float((totals[first] > totals[second]).mean())
+        for first in totals
+        for second in totals
+        if first != second
+    }
+    return {
+        "draws": PHASE7_MC_DRAWS,
+        "seed": PHASE7_MC_SEED,
+        "residual_pool_size": residual_count,
+        "strategies": strategies,
+        "win_probability": win_probability,
+    }
+
+
+def run_phase7_monte_carlo(strategy_names: Sequence[str]) -> None:
+    strategy_names = list(dict.fromkeys(strategy_names))
+    unsupported = [name for name in strategy_names if name not in PHASE7_STRATEGIES]
+    if not strategy_names or unsupported:
+        raise ValueError(f"Unsupported strategies for Phase 7 Monte Carlo simulation: {unsupported or strategy_names}")
+    if PHASE7_MC_DRAWS < 1 or PHASE7_MC_BLOCK_ROWS < 1 or PHASE7_MC_MEMORY_BUDGET_MB <= 0:
+        raise ValueError("Phase 7 Monte Carlo settings must be positive.")
+
+    logger.info(
+        "Phase 7 Monte Carlo simulation started | strategies: %s | draws: %s | seed: %s",
+        ", ".join(strategy_names),
+        PHASE7_MC_DRAWS,
+        PHASE7_MC_SEED,
+    )
+    test_df, model = load_simulation_inputs()
+    ensure_required_columns(test_df, [PHASE6_TARGET_COLUMN], "Phase 7 Monte Carlo residuals")
+    residuals = _test_residuals(test_df, model)
+
+    candidate_prices, predicted_demand, predicted_revenue = score_candidates(test_df, model)
+    chosen_idx_by_strategy: dict[str, np.ndarray] = {}
+    predicted_totals: dict[str, float] = {}
+    for strategy_name in strategy_names:
+        chosen_prices = select_prices_batch(
+            test_df, candidate_prices, predicted_demand, predicted_revenue, strategy_name
+        )
+        chosen_idx = chosen_candidate_index(candidate_prices, chosen_prices)
+        chosen_idx_by_strategy[strategy_name] = chosen_idx
+        predicted_totals[strategy_name] = float(np.take_along_axis(predicted_revenue, chosen_idx[:, None], axis=1).sum())
+
+    totals = simulate_revenue_draws(candidate_prices, predicted_demand, chosen_idx_by_strategy, residuals)
+    revenue_df = pd.DataFrame(
+        {
+            "strategy_name": np.repeat(np.array(strategy_names, dtype=object), PHASE7_MC_DRAWS),
+            "draw": np.tile(np.arange(PHASE7_MC_DRAWS, dtype="int64"), len(strategy_names)),
+            "total_revenue": np.concatenate([totals[name] for name in strategy_names]),
+        },
+        columns=PHASE7_MONTE_CARLO_FROZEN_COLUMNS,
+    )
+    validate_phase7_monte_carlo(revenue_df)
+
+    REVENUE_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    SUMMARY_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    revenue_df.to_parquet(REVENUE_OUTPUT_PATH, index=False)
+    summary_payload = _summarize_draws(totals, predicted_totals, len(residuals))
+    SUMMARY_OUTPUT_PATH.write_text(json.dumps(summary_payload, indent=2), encoding="utf-8")
+
+    for strategy_name, stats in summary_payload["strategies"].items():
+        logger.info(
+            "Phase 7 Monte Carlo summary | strategy: %s | predicted: %.2f | mean: %.2f | p05: %.2f | p95: %.2f",
+            strategy_name,
+            stats["predicted_total_revenue"],
+            stats["mean_total_revenue"],
+            stats["p05_total_revenue"],
+            stats["p95_total_revenue"],
+        )
+    logger.info(
+        "Phase 7 Monte Carlo simulation completed successfully | revenue output: %s | summary output: %s",
+        REVENUE_OUTPUT_PATH,
+        SUMMARY_OUTPUT_PATH,
+    )
+
+
+if __name__ == "__main__":
+    run_phase7_monte_carlo(sys.argv[1:] or list(PHASE7_STRATEGIES))
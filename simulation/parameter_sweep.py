@@ -0,0 +1,322 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import itertools
+import json
+import logging
+from pathlib import Path
+import shutil
+import sys
+from typing import Callable
+
+import pandas as pd
+
+# Ensure project-root imports work when executing this file directly.
+PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT_PATH) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT_PATH))
+
+from config import (
+    HYBRID_SMOOTHING_ALPHA,
+    MAX_DAILY_CHANGE,
+    PHASE7_GRID_POINTS,
+    PHASE7_LINEAR_FAST_PATH,
+    PHASE7_PRICE_SEARCH,
+    PHASE7_SOLVER_ITERATIONS,
+    PHASE7_STRATEGIES,
+    PHASE13_CHECKPOINT_PATH,
+    PHASE13_CHECKPOINTS,
+    PHASE13_DEFAULT_PARAMETER_GRID,
+    PHASE13_FROZEN_COLUMNS,
+    PHASE13_SWEEP_PARAMETERS,
+    PHASE13_WORKERS,
+    PRICE_GRID_PERCENTAGE,
+    PROJECT_ROOT,
+    ROBUSTNESS_RESULTS_PATH,
+    ROBUSTNESS_SUMMARY_PATH,
+    RULE_PRICE_DECREASE,
+    RULE_PRICE_INCREASE,
+)
+from preprocessing.common import configured_root, file_sha256
+from simulation.checkpoint import RunCheckpoint, frame_fingerprint
+from simulation.simulator import (
+    MODEL_INPUT_PATH,
+    build_results_table,
+    load_simulation_inputs,
+    score_candidates,
+    select_prices_batch,
+)
+from utils.data_contracts import validate_phase13_robustness_results, validate_phase7_results
+
+logger = logging.getLogger(__name__)
+
+CONFIGURED_ROOT_PATH = configured_root(PROJECT_ROOT)
+RESULTS_OUTPUT_PATH = CONFIGURED_ROOT_PATH / ROBUSTNESS_RESULTS_PATH
+SUMMARY_OUTPUT_PATH = CONFIGURED_ROOT_PATH / ROBUSTNESS_SUMMARY_PATH
+CHECKPOINT_DIRECTORY_PATH = CONFIGURED_ROOT_PATH / PHASE13_CHECKPOINT_PATH
+
+BASELINE_PARAMETERS: dict[str, float] = {
+    "PRICE_GRID_PERCENTAGE": PRICE_GRID_PERCENTAGE,
+    "PHASE7_GRID_POINTS": PHASE7_GRID_POINTS,
+    "MAX_DAILY_CHANGE": MAX_DAILY_CHANGE,
+    "HYBRID_SMOOTHING_ALPHA": HYBRID_SMOOTHING_ALPHA,
+    "RULE_PRICE_INCREASE": RULE_PRICE_INCREASE,
+    "RULE_PRICE_DECREASE": RULE_PRICE_DECREASE,
+}
+
+# Valid values per swept parameter: fractional price changes must leave every price positive, and the smoothing
+# weight is a convex combination.
+SWEEP_PARAMETER_RANGES: dict[str, tuple[Callable[[float], bool], str]] = {
+    "PRICE_GRID_PERCENTAGE": (lambda value: 0 < value < 1, "in (0, 1)"),
+    "PHASE7_GRID_POINTS": (lambda value: float(value).is_integer() and value >= 2, "integers >= 2"),
+    "MAX_DAILY_CHANGE": (lambda value: 0 <= value < 1, "in [0, 1)"),
+    "HYBRID_SMOOTHING_ALPHA": (lambda value: 0 <= value <= 1, "in [0, 1]"),
+    "RULE_PRICE_INCREASE": (lambda value: value >= 0, "non-negative"),
+    "RULE_PRICE_DECREASE": (lambda value: 0 <= value < 1, "in [0, 1)"),
+}
+
+# Maps swept config names onto the keyword arguments of each strategy's choose_prices_batch.
+STRATEGY_SWEEP_PARAMETERS: dict[str, dict[str, str]] = {
+    "rule": {"RULE_PRICE_INCREASE": "price_increase", "RULE_PRICE_DECREASE": "price_decrease"},
+    "ml": {},
+    "hybrid": {"MAX_DAILY_CHANGE": "max_daily_change", "HYBRID_SMOOTHING_ALPHA": "smoothing_alpha"},
+}
+
+
+def _expand_parameter_grid(parameter_grid: dict[str, list]) -> list[dict[str, float]]:
+    unknown = sorted(set(parameter_grid) - set(PHASE13_SWEEP_PARAMETERS))
+    if unknown:
+        raise ValueError(f"Unsupported sweep parameters: {unknown}. Supported: {PHASE13_SWEEP_PARAMETERS}")
+
+    swept = [name for name in PHASE13_SWEEP_PARAMETERS if name in parameter_grid]
+    for name in swept:
+        values = parameter_grid[name]
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Sweep parameter {name} must map to a non-empty list of values.")
+        if any(isinstance(value, bool) or not isinstance(value, (int, float)) for value in values):
+            raise ValueError(f"Sweep parameter {name} values must be numbers, got {values}.")
+        is_valid, valid_range = SWEEP_PARAMETER_RANGES[name]
+        if not all(is_valid(value) for value in values):
+            raise ValueError(f"Sweep parameter {name} values must be {valid_range}, got {values}.")
+
+    configurations: list[dict[str, float]] = []
+    for values in itertools.product(*(parameter_grid[name] for name in swept)):
+        configuration = dict(BASELINE_PARAMETERS)
+        configuration.update(zip(swept, values))
+        configuration["PHASE7_GRID_POINTS"] = int(configuration["PHASE7_GRID_POINTS"])
+        configurations.append(configuration)
+    return configurations
+
+
+def _summarize_results(results_df: pd.DataFrame) -> dict[str, float]:
+    # Phase 11 metric definitions, computed from simulator-produced columns.
+    return {
+        "result_rows": int(len(results_df)),
+        "total_predicted_revenue": float(results_df["predicted_revenue"].sum()),
+        "mean_daily_revenue": float(results_df["predicted_revenue"].mean()),
+        "mean_absolute_change": float(results_df["abs_price_change"].mean()),
+        "price_std": float(results_df["chosen_price"].std()),
+        "max_price_jump": float(results_df["abs_price_change"].max()),
+        "change_frequency": float((results_df["price_change"] != 0).mean()),
+    }
+
+
+_WORKER_INPUTS: tuple[pd.DataFrame, object] | None = None
+
+
+def _init_sweep_worker(test_df: pd.DataFrame, model) -> None:
+    global _WORKER_INPUTS
+    _WORKER_INPUTS = (test_df, model)
+
+
+def _simulate_price_grid_group(
+    test_df: pd.DataFrame,
+    model,
+    configurations: list[tuple[int, dict[str, float]]],
+    strategy_names: list[str],
+) -> list[dict[str, object]]:
+    # Every configuration in a group shares the same price grid, so model predictions are computed once.
+    grid_configuration = configurations[0][1]
+    candidate_prices, predicted_demand, predicted_revenue = score_candidates(
+        test_df,
+        model,
+        grid_percentage=grid_configuration["PRICE_GRID_PERCENTAGE"],
+        grid_points=grid_configuration["PHASE7_GRID_POINTS"],
+    )
+
+    rows: list[dict[str, object]] = []
+    for config_id, configuration in configurations:
+        for strategy_name in strategy_names:
+            strategy_parameters = {
+                argument: configuration[name] for name, argument in STRATEGY_SWEEP_PARAMETERS[strategy_name].items()
+            }
+            chosen_prices = select_prices_batch(
+                test_df, candidate_prices, predicted_demand, predicted_revenue, strategy_name, strategy_parameters
+            )
+            results_df = build_results_table(
+                test_df, candidate_prices, predicted_demand, predicted_revenue, chosen_prices, strategy_name
+            )
+            validate_phase7_results(results_df)
+            rows.append(
+                {
+                    "config_id": config_id,
+                    **{name.lower(): configuration[name] for name in PHASE13_SWEEP_PARAMETERS},
+                    "strategy_name": strategy_name,
+                    **_summarize_results(results_df),
+                }
+            )
+    return rows
+
+
+def _simulate_price_grid_group_in_worker(
+    configurations: list[tuple[int, dict[str, float]]], strategy_names: list[str]
+) -> list[dict[str, object]]:
+    test_df, model = _WORKER_INPUTS
+    return _simulate_price_grid_group(test_df, model, configurations, strategy_names)
+
+
+def _open_checkpoint(
+    test_df: pd.DataFrame, configurations: list[dict[str, float]], strategy_names: list[str], resume: bool
+) -> RunCheckpoint:
+    # Work units are price-grid groups; any change to the grid, inputs or scoring settings makes --resume start over.
+    fingerprint = {
+        "configurations": configurations,
+        "strategies": strategy_names,
+        "model_sha256": file_sha256(MODEL_INPUT_PATH),
+        "test_rows_sha256": frame_fingerprint(test_df),
+        "settings": {
+            "PHASE7_LINEAR_FAST_PATH": PHASE7_LINEAR_FAST_PATH,
+            "PHASE7_PRICE_SEARCH": PHASE7_PRICE_SEARCH,
+            "PHASE7_SOLVER_ITERATIONS": PHASE7_SOLVER_ITERATIONS,
+        },
+    }
+    return RunCheckpoint(CHECKPOINT_DIRECTORY_PATH, fingerprint, resume)
+
+
+def _checkpoint_group(
+    checkpoint: RunCheckpoint | None, group_id: int, rows: list[dict[str, object]]
+) -> list[dict[str, object]]:
+    if checkpoint is not None:
+        checkpoint.save(group_id, {"rows": pd.DataFrame(rows, columns=PHASE13_FROZEN_COLUMNS)})
+    return rows
+
+
+def run_parameter_sweep(
+    parameter_grid: dict[str, list],
+    strategy_names: list[str] | None = None,
+    resume: bool = False,
+) -> pd.DataFrame:
+    strategy_names = list(strategy_names or PHASE7_STRATEGIES)
+    unsupported = [name for name in strategy_names if name not in PHASE7_STRATEGIES]
+    if unsupported:
+        raise ValueError(f"Unsupported strategies for Phase 13 sweep: {unsupported}")
+    if PHASE13_WORKERS < 1:
+        raise ValueError("PHASE13_WORKERS must be a positive integer.")
+
+    configurations = _expand_parameter_grid(parameter_grid)
+    grid_groups: dict[tuple[float, int], list[tuple[int, dict[str, float]]]] = {}
+    for config_id, configuration in enumerate(configurations):
+        grid_key = (configuration["PRICE_GRID_PERCENTAGE"], configuration["PHASE7_GRID_POINTS"])
+        grid_groups.setdefault(grid_key, []).append((config_id, configuration))
+    logger.info(
+        "Phase 13 sweep | configurations: %s | price-grid groups: %s | strategies: %s",
+        len(configurations),
+        len(grid_groups),
+        ", ".join(strategy_names),
+    )
+
+    test_df, model = load_simulation_inputs()
+    groups = list(grid_groups.values())
+    group_rows: dict[int, list[dict[str, object]]] = {}
+    checkpointed = PHASE13_CHECKPOINTS or resume
+    checkpoint = _open_checkpoint(test_df, configurations, strategy_names, resume) if checkpointed else None
+    if checkpoint is not None and checkpoint.completed:
+        logger.info(
+            "Phase 13 resume | price-grid groups already completed: %s of %s", len(checkpoint.completed), len(groups)
+        )
+        for group_id in checkpoint.completed:
+            group_rows[group_id] = checkpoint.load(group_id, ["rows"])["rows"].to_dict(orient="records")
+    remaining = [group_id for group_id in range(len(groups)) if group_id not in group_rows]
+
+    workers = min(PHASE13_WORKERS, len(remaining))
+    if workers <= 1:
+        for group_id in remaining:
+            rows = _simulate_price_grid_group(test_df, model, groups[group_id], strategy_names)
+            group_rows[group_id] = _checkpoint_group(checkpoint, group_id, rows)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_sweep_worker, initargs=(test_df, model)
+        ) as executor:
+            futures = {
+                executor.submit(_simulate_price_grid_group_in_worker, groups[group_id], strategy_names): group_id
+                for group_id in remaining
+            }
+            # Groups are checkpointed as soon as they finish, in whatever order the workers complete them.
+            for future in as_completed(futures):
+                group_rows[futures[future]] = _checkpoint_group(checkpoint, futures[future], future.result())
+
+    strategy_order = {name: position for position, name in enumerate(strategy_names)}
+    results_df = pd.DataFrame(list(itertools.chain.from_iterable(group_rows.values())), columns=PHASE13_FROZEN_COLUMNS)
+    results_df = (
+        results_df.sort_values(
+            ["config_id", "strategy_name"],
+            key=lambda column: column.map(strategy_order) if column.name == "strategy_name" else column,
+            kind="mergesort",
+        )
+        .reset_index(drop=True)
+    )
+    return results_df
+
+
+def _build_summary_payload(parameter_grid: dict[str, list], results_df: pd.DataFrame) -> dict[str, object]:
+    best_by_strategy = results_df.loc[
+        results_df.groupby("strategy_name", sort=False)["total_predicted_revenue"].idxmax()
+    ]
+    return {
+        "phase": 13,
+        "name": "robustness_parameter_sweep",
+        "parameter_grid": parameter_grid,
+        "baseline_parameters": BASELINE_PARAMETERS,
+        "run_summary": {
+            "configurations": int(results_df["config_id"].nunique()),
+            "strategies": results_df["strategy_name"].drop_duplicates().tolist(),
+            "result_rows": int(len(results_df)),
+        },
+        "best_configuration_by_revenue": json.loads(best_by_strategy.to_json(orient="records")),
+    }
+
+
+def run_phase13(parameter_grid_path: str | None = None, resume: bool = False) -> None:
+    logger.info("Phase 13 robustness parameter sweep started.")
+    if parameter_grid_path is None:
+        parameter_grid = PHASE13_DEFAULT_PARAMETER_GRID
+    else:
+        grid_path = Path(parameter_grid_path)
+        if not grid_path.exists():
+            raise FileNotFoundError(f"Phase 13 parameter grid not found: {grid_path}")
+        parameter_grid = json.loads(grid_path.read_text(encoding="utf-8"))
+        if not isinstance(parameter_grid, dict):
+            raise ValueError("Phase 13 parameter grid must be a JSON object of {parameter: [values]}.")
+    logger.info("Parameter grid: %s", parameter_grid)
+
+    results_df = run_parameter_sweep(parameter_grid, resume=resume)
+    validate_phase13_robustness_results(results_df)
+
+    RESULTS_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    SUMMARY_OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    results_df.to_parquet(RESULTS_OUTPUT_PATH, index=False)
+    summary_payload = _build_summary_payload(parameter_grid, results_df)
+    SUMMARY_OUTPUT_PATH.write_text(json.dumps(summary_payload, indent=2), encoding="utf-8")
+    # Completed groups are kept until the outputs are written, so a failed sweep can be resumed.
+    shutil.rmtree(CHECKPOINT_DIRECTORY_PATH, ignore_errors=True)
+
+    logger.info(
+        "Phase 13 summary | configurations: %s | result rows: %s | results output: %s | summary output: %s",
+        results_df["config_id"].nunique(),
+        len(results_df),
+        RESULTS_OUTPUT_PATH,
+        SUMMARY_OUTPUT_PATH,
+    )
+    logger.info("Phase 13 robustness parameter sweep completed successfully.")
+
+
+if __name__ == "__main__":
+    run_phase13(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,138 @@
+from collections import OrderedDict
+import hashlib
+from pathlib import Path
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# SQLite caps bound parameters per statement; keys are looked up in batches below that limit.
+DISK_LOOKUP_BATCH = 500
+
+
+class CachedDemandModel:
+    """Memoizes model.predict per feature vector, keyed by model artifact hash and feature-vector hash."""
+
+    def __init__(
+        self,
+        model,
+        model_hash: str,
+        feature_columns: list[str],
+        max_entries: int,
+        disk_path: Path | None = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("Prediction cache max_entries must be a positive integer.")
+        self.model = model
+        self.model_hash = model_hash
+        self.feature_columns = list(feature_columns)
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[bytes, float] = OrderedDict()
+        self._connection: sqlite3.Connection | None = None
+
+    def __getstate__(self) -> dict:
+        # Worker processes reopen the disk layer themselves and start with an empty memory layer.
+        state = self.__dict__.copy()
+        state["_memory"] = OrderedDict()
+        state["_connection"] = None
+        return state
+
+    def _disk(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.disk_path, timeout=60.0)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "model_hash TEXT NOT NULL, feature_key BLOB NOT NULL, prediction REAL NOT NULL, "
+                "PRIMARY KEY (model_hash, feature_key)) WITHOUT ROWID"
+            )
+        return self._connection
+
+    def _remember(self, key: bytes, prediction: float) -> None:
+        self._memory[key] = prediction
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load_from_disk(self, keys: list[bytes]) -> dict[bytes, float]:
+        found: dict[bytes, float] = {}
+        connection = self._disk()
+        for start in range(0, len(keys), DISK_LOOKUP_BATCH):
+            batch = keys[start : start + DISK_LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found.update(
+                connection.execute(
+                    f"SELECT feature_key, prediction FROM predictions "
+                    f"WHERE model_hash = ? AND feature_key IN ({placeholders})",
+                    [self.model_hash, *batch],
+                ).fetchall()
+            )
+        return found
+
+    def _store_on_disk(self, keys: list[bytes], predictions: np.ndarray) -> None:
+        connection = self._disk()
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO predictions (model_hash, feature_key, prediction) VALUES (?, ?, ?)",
+                [(self.model_hash, key, float(value)) for key, value in zip(keys, predictions)],
+            )
+
+    def predict(self, features: pd.DataFrame | np.ndarray) -> np.ndarray:
+        if isinstance(features, pd.DataFrame):
+            features = features[self.feature_columns]
+        feature_matrix = np.ascontiguousarray(features, dtype=float)
+        if feature_matrix.ndim != 2 or feature_matrix.shape[1] != len(self.feature_columns):
+            raise ValueError(f"Prediction cache expects a 2-D feature matrix with {len(self.feature_columns)} columns.")
+        if len(feature_matrix) == 0:
+            return np.empty(0, dtype=float)
+
+        # Identical vectors within one call (for example a shared base price) are looked up once.
+        row_view = feature_matrix.view(np.dtype((np.void, feature_matrix.strides[0]))).ravel()
+        _, first_index, inverse = np.unique(row_view, return_index=True, return_inverse=True)
+        unique_rows = feature_matrix[first_index]
+        keys = [hashlib.blake2b(row.tobytes(), digest_size=16).digest() for row in unique_rows]
+
+        predictions = np.empty(len(keys), dtype=float)
+        missing: list[int] = []
+        for position, key in enumerate(keys):
+            cached = self._memory.get(key)
+            if cached is None:
+                missing.append(position)
+            else:
+                self._memory.move_to_end(key)
+                predictions[position] = cached
+        self.hits += len(keys) - len(missing)
+
+        if missing and self.disk_path is not None:
+            stored = self._load_from_disk([keys[position] for position in missing])
+            still_missing = []
+            for position in missing:
+                value = stored.get(keys[position])
+                if value is None:
+                    still_missing.append(position)
+                else:
+                    predictions[position] = value
+                    self._remember(keys[position], value)
+            self.disk_hits += len(missing) - len(still_missing)
+            missing = still_missing
+
+        if missing:
+            missing_features = pd.DataFrame(unique_rows[missing], columns=self.feature_columns)
+            computed = np.asarray(self.model.predict(missing_features), dtype=float)
+            predictions[missing] = computed
+            missing_keys = [keys[position] for position in missing]
+            for key, value in zip(missing_keys, computed):
+                self._remember(key, float(value))
+            if self.disk_path is not None:
+                self._store_on_disk(missing_keys, computed)
+            self.misses += len(missing)
+
+        return predictions[inverse.ravel()]
+
+
+def unwrap_model(model):
+    return model.model if isinstance(model, CachedDemandModel) else model
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import logging
+import math
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Ensure project-root imports work when executing this file directly.
+PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT_PATH) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT_PATH))
+
+from config import (
+    COL_STOCK_CODE,
+    PHASE6_FEATURE_COLUMNS,
+    PHASE7_STRATEGIES,
+    PRICING_SERVICE_BATCH_WINDOW_MS,
+    PRICING_SERVICE_HOST,
+    PRICING_SERVICE_MAX_BATCH,
+    PRICING_SERVICE_PORT,
+    PRICING_SERVICE_SOCKET_PATH,
+    PROJECT_ROOT,
+)
+from preprocessing.common import configured_root
+from simulation.simulator import (
+    PRICE_FEATURE_INDEX,
+    chosen_candidate_index,
+    load_demand_model,
+    score_candidates,
+    select_prices_batch,
+)
+
+logger = logging.getLogger(__name__)
+
+CONFIGURED_ROOT_PATH = configured_root(PROJECT_ROOT)
+
+
+def _parse_request(payload: object) -> dict[str, object]:
+    if not isinstance(payload, dict):
+        raise ValueError("Pricing request must be a JSON object.")
+    strategy_name = payload.get("strategy")
+    if strategy_name not in PHASE7_STRATEGIES:
+        raise ValueError(f"Unsupported pricing strategy: {strategy_name}. Supported: {list(PHASE7_STRATEGIES)}")
+    features = payload.get("features")
+    if not isinstance(features, dict):
+        raise ValueError("Pricing request must include a features object.")
+    missing = [col for col in PHASE6_FEATURE_COLUMNS if col not in features]
+    if missing:
+        raise ValueError(f"Pricing request is missing features: {missing}")
+
+    feature_values = [float(features[col]) for col in PHASE6_FEATURE_COLUMNS]
+    # NaN or infinite inputs would come back as bare NaN tokens, which are not valid JSON.
+    non_finite = [col for col, value in zip(PHASE6_FEATURE_COLUMNS, feature_values) if not math.isfinite(value)]
+    if non_finite:
+        raise ValueError(f"Pricing request features must be finite numbers: {non_finite}")
+    base_price = feature_values[PRICE_FEATURE_INDEX]
+    previous_price = payload.get("previous_price")
+    previous_price = base_price if previous_price is None else float(previous_price)
+    if not math.isfinite(previous_price):
+        raise ValueError("Pricing request previous_price must be a finite number.")
+    if base_price <= 0 or previous_price <= 0:
+        raise ValueError("Pricing request prices must be positive.")
+    return {
+        "id": payload.get("id"),
+        "stock_code": payload.get("stock_code"),
+        "strategy": strategy_name,
+        "features": feature_values,
+        "previous_price": previous_price,
+    }
+
+
+def price_requests(model, requests: list[dict[str, object]]) -> list[dict[str, object]]:
+    # One predict pass for the whole batch; each strategy's rows then go through its batch selector.
+    batch_df = pd.DataFrame(
+        np.array([request["features"] for request in requests], dtype=float), columns=PHASE6_FEATURE_COLUMNS
+    )
+    # Requests are independent, so each row is its own product sequence and reads previous_price directly.
+    batch_df[COL_STOCK_CODE] = np.arange(len(requests)).astype(str)
+    previous_prices = np.array([request["previous_price"] for request in requests], dtype=float)
+    strategy_names = np.array([request["strategy"] for request in requests], dtype=object)
+
+    candidate_prices, predicted_demand, predicted_revenue = score_candidates(batch_df, model)
+    chosen_prices = np.empty(len(requests), dtype=float)
+    for strategy_name in dict.fromkeys(strategy_names):
+        rows = np.flatnonzero(strategy_names == strategy_name)
+        rows_df = batch_df if len(rows) == len(requests) else batch_df.iloc[rows].reset_index(drop=True)
+        chosen_prices[rows] = select_prices_batch(
+            rows_df,
+            candidate_prices[rows],
+            predicted_demand[rows],
+            predicted_revenue[rows],
+            strategy_name,
+            previous_prices=previous_prices[rows],
+        )
+
+    chosen_idx = chosen_candidate_index(candidate_prices, chosen_prices)[:, None]
+    chosen_prices = np.take_along_axis(candidate_prices, chosen_idx, axis=1)[:, 0]
+    chosen_demand = np.take_along_axis(predicted_demand, chosen_idx, axis=1)[:, 0]
+    chosen_revenue = np.take_along_axis(predicted_revenue, chosen_idx, axis=1)[:, 0]
+    return [
+        {
+            "id": request["id"],
+            "stock_code": request["stock_code"],
+            "strategy": request["strategy"],
+            "chosen_price": float(price),
+            "predicted_demand": float(demand),
+            "predicted_revenue": float(revenue),
+        }
+        for request, price, demand, revenue in zip(requests, chosen_prices, chosen_demand, chosen_revenue)
+    ]
+
+
+class PricingService:
+    """Serves strategy prices over newline-delimited JSON, coalescing concurrent requests into batches."""
+
+    def __init__(self, model) -> None:
+        self.model = model
+        self.requests_served = 0
+        self.batches_served = 0
+        self._queue: asyncio.Queue | None = None
+
+    def _submit(self, line: bytes) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        payload = None
+        try:
+            payload = json.loads(line)
+            request = _parse_request(payload)
+        except (ValueError, TypeError) as error:
+            request_id = payload.get("id") if isinstance(payload, dict) else None
+            future.set_result({"id": request_id, "error": str(error)})
+            return future
+        self._queue.put_nowait((request, future))
+        return future
+
+    def _price_batch(self, pending: list[tuple[dict, asyncio.Future]]) -> None:
+        requests = [request for request, _ in pending]
+        try:
+            replies = price_requests(self.model, requests)
+        except Exception as error:
+            logger.exception("Pricing batch of %s requests failed.", len(requests))
+            replies = [{"id": request["id"], "error": str(error)} for request in requests]
+        for (_, future), reply in zip(pending, replies):
+            if not future.done():
+                future.set_result(reply)
+        self.requests_served += len(pending)
+        self.batches_served += 1
+
+    async def _batch_loop(self) -> None:
+        # Requests that arrive while a batch is being priced are picked up together by the next batch.
+        while True:
+            pending = [await self._queue.get()]
+            if PRICING_SERVICE_BATCH_WINDOW_MS > 0:
+                await asyncio.sleep(PRICING_SERVICE_BATCH_WINDOW_MS / 1000.0)
+            while len(pending) < PRICING_SERVICE_MAX_BATCH and not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._price_batch(pending)
+
+    async def _write_replies(self, replies: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        # Replies are written in request order, so clients may pipeline many requests per connection.
+        while (future := await replies.get()) is not None:
+            writer.write((json.dumps(await future) + "\n").encode("utf-8"))
+            if replies.empty():
+                await writer.drain()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        replies: asyncio.Queue = asyncio.Queue()
+        writer_task = asyncio.create_task(self._write_replies(replies, writer))
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    replies.put_nowait(self._submit(line))
+        except ConnectionError:
+            pass
+        finally:
+            replies.put_nowait(None)
+            try:
+                await writer_task
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self) -> None:
+        if PRICING_SERVICE_MAX_BATCH < 1 or PRICING_SERVICE_BATCH_WINDOW_MS < 0:
+            raise ValueError("Pricing service batch settings must be positive.")
+        self._queue = asyncio.Queue()
+        batch_task = asyncio.create_task(self._batch_loop())
+        if PRICING_SERVICE_SOCKET_PATH:
+            socket_path = CONFIGURED_ROOT_PATH / PRICING_SERVICE_SOCKET_PATH
+            socket_path.parent.mkdir(parents=True, exist_ok=True)
+            socket_path.unlink(missing_ok=True)
+            server = await asyncio.start_unix_server(self._handle_connection, path=str(socket_path))
+            logger.info("Pricing service listening on unix socket %s", socket_path)
+        else:
+            server = await asyncio.start_server(self._handle_connection, PRICING_SERVICE_HOST, PRICING_SERVICE_PORT)
+            logger.info("Pricing service listening on %s:%s", PRICING_SERVICE_HOST, PRICING_SERVICE_PORT)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batch_task.cancel()
+
+
+def run_pricing_service() -> None:
+    logger.info("Pricing service starting.")
+    service = PricingService(load_demand_model())
+    try:
+        asyncio.run(service.serve())
+    except KeyboardInterrupt:
+        pass
+    logger.info(
+        "Pricing service stopped | requests served: %s | batches: %s",
+        service.requests_served,
+        service.batches_served,
+    )
+
+
+if __name__ == "__main__":
+    run_pricing_service()
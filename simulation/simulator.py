@@ -1,11 +1,20 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
 import logging
+import math
 from pathlib import Path
 import sys
-from typing import Callable
+import time
+from typing import Callable, Iterator, Sequence
 
 import joblib
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sklearn.linear_model import LinearRegression
 
 # Ensure project-root imports work when executing this file directly.
 PROJECT_ROOT_PATH = Path(__file__).resolve().parents[1]
@@ -14,29 +23,92 @@ if str(PROJECT_ROOT_PATH) not in sys.path:
 
 from config import (
     COL_STOCK_CODE,
+    DATASET_LAYOUT,
     FEATURE_TEST_DATA_PATH,
+    FEATURE_TRAIN_DATA_PATH,
+    HYBRID_SMOOTHING_ALPHA,
+    MAX_DAILY_CHANGE,
     PHASE6_FEATURE_COLUMNS,
     PHASE6_MODEL_ARTIFACT_PATH,
+    PHASE6_TARGET_COLUMN,
     PHASE7_CANDIDATE_FROZEN_COLUMNS,
+    PHASE7_CHECKPOINT_PATH,
+    PHASE7_CHECKPOINT_ROWS,
+    PHASE7_CHECKPOINTS,
+    PHASE7_CHUNKS_PER_WORKER,
+    PHASE7_DEMAND_FEEDBACK,
+    PHASE7_DEMAND_FEEDBACK_MODES,
     PHASE7_GRID_POINTS,
+    PHASE7_LINEAR_FAST_PATH,
+    PHASE7_OUTPUT_MODE,
+    PHASE7_OUTPUT_MODES,
+    PHASE7_PREDICTION_CACHE,
+    PHASE7_PREDICTION_CACHE_MAX_ENTRIES,
+    PHASE7_PREDICTION_CACHE_MODES,
+    PHASE7_PREDICTION_CACHE_PATH,
+    PHASE7_PRICE_SEARCH,
+    PHASE7_PRICE_SEARCH_MODES,
     PHASE7_RESULT_FROZEN_COLUMNS,
+    PHASE7_RUN_MODE,
+    PHASE7_RUN_MODES,
+    PHASE7_STATE_FROZEN_COLUMNS,
+    PHASE7_SELECTION_ENGINE,
+    PHASE7_SELECTION_ENGINES,
+    PHASE7_SOLVER_ITERATIONS,
     PHASE7_STRATEGIES,
+    PHASE7_STREAM_CHUNK_ROWS,
+    PHASE7_VALIDATION_POLICIES,
+    PHASE7_VALIDATION_POLICY,
+    PHASE7_VALIDATION_SAMPLE_EVERY,
+    PHASE7_WORKERS,
     PRICE_GRID_PERCENTAGE,
     PROJECT_ROOT,
+    RULE_PRICE_DECREASE,
+    RULE_PRICE_INCREASE,
     SIMULATION_CANDIDATE_PATHS,
     SIMULATION_RESULTS_PATHS,
+    SIMULATION_STATE_PATHS,
 )
-from preprocessing.common import configured_root, ensure_required_columns
+from preprocessing.common import (
+    PRODUCT_DATASET_ORDER,
+    configured_root,
+    copy_dataset,
+    dataset_exists,
+    file_sha256,
+    merge_dataset_parts,
+    read_dataset,
+    read_parquet_columns,
+    remove_dataset,
+    replace_dataset,
+    write_dataset_part,
+    write_product_dataset,
+)
+from simulation.checkpoint import RunCheckpoint, frame_fingerprint
+from simulation.prediction_cache import CachedDemandModel, unwrap_model
 from strategies.hybrid_pricing import choose_price as choose_hybrid_price
+from strategies.hybrid_pricing import choose_prices_batch as choose_hybrid_prices_batch
 from strategies.ml_pricing import choose_price as choose_ml_price
+from strategies.ml_pricing import choose_prices_batch as choose_ml_prices_batch
 from strategies.rule_based import choose_price as choose_rule_price
-from utils.data_contracts import validate_phase7_candidates, validate_phase7_results
+from strategies.rule_based import choose_prices_batch as choose_rule_prices_batch
+from utils.data_contracts import validate_phase7_candidates, validate_phase7_results, validate_phase7_state
 
 logger = logging.getLogger(__name__)
 
 CONFIGURED_ROOT_PATH = configured_root(PROJECT_ROOT)
 TEST_INPUT_PATH = CONFIGURED_ROOT_PATH / FEATURE_TEST_DATA_PATH
+TRAIN_INPUT_PATH = CONFIGURED_ROOT_PATH / FEATURE_TRAIN_DATA_PATH
 MODEL_INPUT_PATH = CONFIGURED_ROOT_PATH / PHASE6_MODEL_ARTIFACT_PATH
+PREDICTION_CACHE_PATH = CONFIGURED_ROOT_PATH / PHASE7_PREDICTION_CACHE_PATH
+CHECKPOINT_ROOT_PATH = CONFIGURED_ROOT_PATH / PHASE7_CHECKPOINT_PATH
+PRICE_FEATURE_INDEX = PHASE6_FEATURE_COLUMNS.index("avg_daily_price")
+
+# Closed-loop mode: lag1_units, lag7_units and rolling7_mean_units all read from the last 7 daily demands.
+DEMAND_HISTORY_DAYS = 7
+DEMAND_HISTORY_COLUMNS = [f"history_units_{lag}" for lag in range(DEMAND_HISTORY_DAYS, 0, -1)]
+
+# Incremental mode: chosen price carried over from the previous run, read at each product's first new row.
+CARRIED_PRICE_COLUMN = "carried_previous_price"
 
 StrategySelector = Callable[[pd.DataFrame, dict], float]
 STRATEGY_SELECTORS: dict[str, StrategySelector] = {
@@ -44,149 +116,974 @@ STRATEGY_SELECTORS: dict[str, StrategySelector] = {
     "ml": choose_ml_price,
     "hybrid": choose_hybrid_price,
 }
+StrategyBatchSelector = Callable[[np.ndarray, np.ndarray, np.ndarray, dict], np.ndarray]
+STRATEGY_BATCH_SELECTORS: dict[str, StrategyBatchSelector] = {
+    "rule": choose_rule_prices_batch,
+    "ml": choose_ml_prices_batch,
+    "hybrid": choose_hybrid_prices_batch,
+}
+
+
+def _price_bounds(
+    base_prices: np.ndarray, grid_percentage: float = PRICE_GRID_PERCENTAGE
+) -> tuple[np.ndarray, np.ndarray]:
+    low = base_prices * (1.0 - grid_percentage)
+    high = base_prices * (1.0 + grid_percentage)
+    return low, high
+
+
+def _generate_candidate_prices(
+    base_prices: np.ndarray,
+    grid_percentage: float = PRICE_GRID_PERCENTAGE,
+    grid_points: int = PHASE7_GRID_POINTS,
+) -> np.ndarray:
+    low, high = _price_bounds(base_prices, grid_percentage)
+    return np.linspace(low, high, grid_points, dtype=float, axis=1)
+
+
+def _rank_by_revenue(predicted_revenue: np.ndarray) -> np.ndarray:
+    # Matches Series.rank(ascending=False, method="first") within each row: ties keep grid order.
+    order = np.argsort(-predicted_revenue, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, order.shape[1] + 1), axis=1)
+    return ranks.astype("int64")
+
+
+def _linear_price_coefficient(model) -> float | None:
+    # Demand from a linear model is affine in price, so the grid can be scored from one base prediction per row.
+    model = unwrap_model(model)
+    if not PHASE7_LINEAR_FAST_PATH or not isinstance(model, LinearRegression):
+        return None
+    coefficients = np.asarray(model.coef_, dtype=float)
+    if coefficients.ndim != 1 or len(coefficients) != len(PHASE6_FEATURE_COLUMNS):
+        return None
+    feature_names = getattr(model, "feature_names_in_", None)
+    if feature_names is not None and list(feature_names) != PHASE6_FEATURE_COLUMNS:
+        return None
+    return float(coefficients[PRICE_FEATURE_INDEX])
+
+
+def _demand_function(test_df: pd.DataFrame, model) -> Callable[[np.ndarray], np.ndarray]:
+    # Returns raw (unclipped) demand for a (rows x k) price array, holding every other feature at its test value.
+    base_prices = test_df["avg_daily_price"].to_numpy(dtype=float)
+    base_features = test_df[PHASE6_FEATURE_COLUMNS].to_numpy(dtype=float)
+    price_coefficient = _linear_price_coefficient(model)
+    if price_coefficient is not None:
+        if isinstance(model, CachedDemandModel):
+            # With a prediction cache the one base prediction per row goes through it, so it can be reused.
+            base_demand = np.asarray(model.predict(base_features), dtype=float)
+        else:
+            # Same arithmetic as LinearRegression.predict, without its per-call input validation.
+            linear_model = unwrap_model(model)
+            base_demand = base_features @ linear_model.coef_ + linear_model.intercept_
+        return lambda prices: base_demand[:, None] + price_coefficient * (prices - base_prices[:, None])
+
+    def predict_demand(prices: np.ndarray) -> np.ndarray:
+        # Expand every row into its k prices and score the whole (rows x k) matrix in one predict call.
+        row_count, price_points = prices.shape
+        feature_matrix = np.repeat(base_features, price_points, axis=0)
+        feature_matrix[:, PRICE_FEATURE_INDEX] = prices.ravel()
+        feature_df = pd.DataFrame(feature_matrix, columns=PHASE6_FEATURE_COLUMNS)
+        return model.predict(feature_df).astype(float).reshape(row_count, price_points)
+
+    return predict_demand
+
+
+def _solve_revenue_optimal_prices(
+    model,
+    demand_function: Callable[[np.ndarray], np.ndarray],
+    base_prices: np.ndarray,
+    grid_percentage: float = PRICE_GRID_PERCENTAGE,
+) -> np.ndarray:
+    low, high = _price_bounds(base_prices, grid_percentage)
+
+    price_coefficient = _linear_price_coefficient(model)
+    if price_coefficient is not None:
+        # Revenue p * (c + b * p) peaks at -c / 2b when b < 0; with b >= 0 it is non-decreasing in price.
+        intercept = demand_function(base_prices[:, None])[:, 0] - price_coefficient * base_prices
+        if price_coefficient < 0:
+            return np.clip(-intercept / (2.0 * price_coefficient), low, high)
+        return high
+
+    def revenue(prices: np.ndarray) -> np.ndarray:
+        return prices * np.clip(demand_function(prices[:, None])[:, 0], a_min=0.0, a_max=None)
 
+    # Golden-section search run for all rows at once: one predict call per iteration.
+    inverse_golden_ratio = (np.sqrt(5.0) - 1.0) / 2.0
+    lower, upper = low.copy(), high.copy()
+    left_probe = upper - inverse_golden_ratio * (upper - lower)
+    right_probe = lower + inverse_golden_ratio * (upper - lower)
+    left_revenue, right_revenue = revenue(left_probe), revenue(right_probe)
+    for _ in range(PHASE7_SOLVER_ITERATIONS):
+        keep_left = left_revenue >= right_revenue
+        upper = np.where(keep_left, right_probe, upper)
+        lower = np.where(keep_left, lower, left_probe)
+        new_probe = np.where(
+            keep_left,
+            upper - inverse_golden_ratio * (upper - lower),
+            lower + inverse_golden_ratio * (upper - lower),
+        )
+        new_revenue = revenue(new_probe)
+        left_probe, right_probe = (
+            np.where(keep_left, new_probe, right_probe),
+            np.where(keep_left, left_probe, new_probe),
+        )
+        left_revenue, right_revenue = (
+            np.where(keep_left, new_revenue, right_revenue),
+            np.where(keep_left, left_revenue, new_revenue),
+        )
+    return (lower + upper) / 2.0
 
-def _generate_candidate_prices(base_price: float) -> np.ndarray:
-    low = base_price * (1.0 - PRICE_GRID_PERCENTAGE)
-    high = base_price * (1.0 + PRICE_GRID_PERCENTAGE)
-    return np.linspace(low, high, PHASE7_GRID_POINTS, dtype=float)
 
+def _add_optimal_prices(candidate_prices: np.ndarray, optimal_prices: np.ndarray) -> np.ndarray:
+    # The continuous optimum joins the grid as an extra candidate so every strategy can still select it. Where it
+    # already is a grid point (a bound it was clipped to), the extra slot instead refines the grid halfway toward that
+    # point's neighbour, so every row keeps grid_points + 1 distinct prices.
+    rows = np.arange(len(candidate_prices))
+    nearest = np.abs(candidate_prices - optimal_prices[:, None]).argmin(axis=1)
+    nearest_prices = candidate_prices[rows, nearest]
+    neighbour = np.where(nearest + 1 < candidate_prices.shape[1], nearest + 1, nearest - 1)
+    on_grid = np.isclose(optimal_prices, nearest_prices, rtol=1e-9, atol=0.0)
+    extra_prices = np.where(on_grid, (nearest_prices + candidate_prices[rows, neighbour]) / 2.0, optimal_prices)
+    return np.sort(np.column_stack([candidate_prices, extra_prices]), axis=1)
 
-def _build_candidates_for_row(row: pd.Series, model) -> pd.DataFrame:
-    base_price = float(row["avg_daily_price"])
-    candidate_prices = _generate_candidate_prices(base_price)
-    feature_rows: list[dict[str, float]] = []
 
-    for candidate_price in candidate_prices:
-        feature_row = {feature: float(row[feature]) for feature in PHASE6_FEATURE_COLUMNS}
-        feature_row["avg_daily_price"] = float(candidate_price)
-        feature_rows.append(feature_row)
+def score_candidates(
+    test_df: pd.DataFrame,
+    model,
+    grid_percentage: float = PRICE_GRID_PERCENTAGE,
+    grid_points: int = PHASE7_GRID_POINTS,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    base_prices = test_df["avg_daily_price"].to_numpy(dtype=float)
+    candidate_prices = _generate_candidate_prices(base_prices, grid_percentage, grid_points)
+    demand_function = _demand_function(test_df, model)
 
-    feature_df = pd.DataFrame(feature_rows, columns=PHASE6_FEATURE_COLUMNS)
-    predicted_demand = np.clip(model.predict(feature_df).astype(float), a_min=0.0, a_max=None)
+    if PHASE7_PRICE_SEARCH == "solver":
+        optimal_prices = _solve_revenue_optimal_prices(model, demand_function, base_prices, grid_percentage)
+        candidate_prices = _add_optimal_prices(candidate_prices, optimal_prices)
+
+    predicted_demand = np.clip(demand_function(candidate_prices), a_min=0.0, a_max=None)
     predicted_revenue = candidate_prices * predicted_demand
+    return candidate_prices, predicted_demand, predicted_revenue
+
 
-    candidates_df = pd.DataFrame(
+def _build_candidate_table(
+    test_df: pd.DataFrame,
+    candidate_prices: np.ndarray,
+    predicted_demand: np.ndarray,
+    predicted_revenue: np.ndarray,
+) -> pd.DataFrame:
+    grid_points = candidate_prices.shape[1]
+    return pd.DataFrame(
         {
-            "invoice_day": [row["invoice_day"]] * len(candidate_prices),
-            COL_STOCK_CODE: [row[COL_STOCK_CODE]] * len(candidate_prices),
-            "candidate_price": candidate_prices,
-            "predicted_demand": predicted_demand,
-            "predicted_revenue": predicted_revenue,
+            "invoice_day": np.repeat(test_df["invoice_day"].to_numpy(), grid_points),
+            COL_STOCK_CODE: np.repeat(test_df[COL_STOCK_CODE].to_numpy(dtype=object), grid_points),
+            "candidate_price": candidate_prices.ravel(),
+            "predicted_demand": predicted_demand.ravel(),
+            "predicted_revenue": predicted_revenue.ravel(),
+            "candidate_rank_by_revenue": _rank_by_revenue(predicted_revenue).ravel(),
         }
     )
-    candidates_df["candidate_rank_by_revenue"] = (
-        candidates_df["predicted_revenue"].rank(ascending=False, method="first").astype("int64")
-    )
-    candidates_df = candidates_df.sort_values("candidate_price", kind="mergesort").reset_index(drop=True)
-    return candidates_df
 
 
-def _build_simulation_outputs(test_df: pd.DataFrame, model, strategy_name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+def _required_context_keys(strategy_name: str, row_key: str) -> set[str]:
+    return {"base_price", row_key, "strategy_name"} | ({"previous_price"} if strategy_name == "hybrid" else set())
+
+
+def _validate_strategy_context(context: dict, required_context_keys: set[str]) -> None:
+    if set(context.keys()) != required_context_keys:
+        raise ValueError(
+            "Strategy context validation failed: expected keys "
+            f"{sorted(required_context_keys)}, got {sorted(context.keys())}."
+        )
+
+
+def _first_row_of_product(test_df: pd.DataFrame) -> np.ndarray:
+    stock_codes = test_df[COL_STOCK_CODE].astype(str).to_numpy()
+    is_first_row = np.ones(len(stock_codes), dtype=bool)
+    is_first_row[1:] = stock_codes[1:] != stock_codes[:-1]
+    return is_first_row
+
+
+def _initial_previous_prices(test_df: pd.DataFrame) -> np.ndarray:
+    base_prices = test_df["avg_daily_price"].to_numpy(dtype=float)
+    if CARRIED_PRICE_COLUMN not in test_df.columns:
+        return base_prices
+    carried_prices = test_df[CARRIED_PRICE_COLUMN].to_numpy(dtype=float)
+    return np.where(np.isnan(carried_prices), base_prices, carried_prices)
+
+
+def _select_prices_by_row(test_df: pd.DataFrame, candidate_table: pd.DataFrame, strategy_name: str) -> np.ndarray:
+    # Reference engine: feeds each row's candidate block through the choose_price(candidate_table, context) contract.
     selector = STRATEGY_SELECTORS[strategy_name]
+    grid_points = len(candidate_table) // len(test_df)
+    required_context_keys = _required_context_keys(strategy_name, "row")
+    # The writers validate the whole candidate table; per-row checks repeat them on each row's block.
+    validate_every = {"full": 1, "sampled": PHASE7_VALIDATION_SAMPLE_EVERY, "final-only": 0}[PHASE7_VALIDATION_POLICY]
 
-    all_candidates: list[pd.DataFrame] = []
-    all_results: list[dict[str, object]] = []
+    chosen_prices = np.empty(len(test_df), dtype=float)
+    initial_previous_prices = _initial_previous_prices(test_df)
     previous_price_by_product: dict[str, float] = {}
 
-    for _, row in test_df.iterrows():
-        candidates_df = _build_candidates_for_row(row, model)
-        validate_phase7_candidates(candidates_df[PHASE7_CANDIDATE_FROZEN_COLUMNS])
+    for position, (_, row) in enumerate(test_df.iterrows()):
+        start = position * grid_points
+        candidates_df = candidate_table.iloc[start : start + grid_points].reset_index(drop=True)
+        validate_row = validate_every > 0 and position % validate_every == 0
+        if validate_row:
+            validate_phase7_candidates(candidates_df[PHASE7_CANDIDATE_FROZEN_COLUMNS])
 
         base_price = float(row["avg_daily_price"])
         stock_code = str(row[COL_STOCK_CODE])
-        previous_price = previous_price_by_product.get(stock_code, base_price)
+        previous_price = previous_price_by_product.get(stock_code, float(initial_previous_prices[position]))
         context = {"base_price": base_price, "row": row, "strategy_name": strategy_name}
         if strategy_name == "hybrid":
             context["previous_price"] = previous_price
-        required_context_keys = {"base_price", "row", "strategy_name"} | (
-            {"previous_price"} if strategy_name == "hybrid" else set()
-        )
-        if set(context.keys()) != required_context_keys:
-            raise ValueError(
-                "Strategy context validation failed: expected keys "
-                f"{sorted(required_context_keys)}, got {sorted(context.keys())}."
-            )
+        if validate_row or position == 0:
+            # Every row's context is built with the same keys, so the first row covers the unsampled ones.
+            _validate_strategy_context(context, required_context_keys)
         chosen_price = float(selector(candidates_df.copy(), context))
 
-        chosen_rows = candidates_df[candidates_df["candidate_price"] == chosen_price]
-        if chosen_rows.empty:
-            nearest_idx = (candidates_df["candidate_price"] - chosen_price).abs().idxmin()
-            chosen_row = candidates_df.loc[nearest_idx]
-            chosen_price = float(chosen_row["candidate_price"])
+        previous_price_by_product[stock_code] = chosen_price
+        chosen_prices[position] = chosen_price
+
+    return chosen_prices
+
+
+def select_prices_batch(
+    test_df: pd.DataFrame,
+    candidate_prices: np.ndarray,
+    predicted_demand: np.ndarray,
+    predicted_revenue: np.ndarray,
+    strategy_name: str,
+    strategy_parameters: dict[str, float] | None = None,
+    previous_prices: np.ndarray | None = None,
+) -> np.ndarray:
+    selector = STRATEGY_BATCH_SELECTORS[strategy_name]
+    base_prices = test_df["avg_daily_price"].to_numpy(dtype=float)
+    context = {"base_price": base_prices, "rows": test_df, "strategy_name": strategy_name}
+    if strategy_name == "hybrid":
+        context["previous_price"] = base_prices if previous_prices is None else previous_prices
+    _validate_strategy_context(context, _required_context_keys(strategy_name, "rows"))
+    chosen_prices = selector(candidate_prices, predicted_demand, predicted_revenue, context, **(strategy_parameters or {}))
+    return np.asarray(chosen_prices, dtype=float)
+
+
+def chosen_candidate_index(candidate_prices: np.ndarray, chosen_prices: np.ndarray) -> np.ndarray:
+    # Snap each chosen price onto its candidate row; fall back to the nearest candidate if it is off-grid.
+    exact_match = candidate_prices == chosen_prices[:, None]
+    return np.where(
+        exact_match.any(axis=1),
+        exact_match.argmax(axis=1),
+        np.abs(candidate_prices - chosen_prices[:, None]).argmin(axis=1),
+    )
+
+
+def build_results_table(
+    test_df: pd.DataFrame,
+    candidate_prices: np.ndarray,
+    predicted_demand: np.ndarray,
+    predicted_revenue: np.ndarray,
+    chosen_prices: np.ndarray,
+    strategy_name: str,
+    previous_prices: np.ndarray | None = None,
+) -> pd.DataFrame:
+    chosen_idx = chosen_candidate_index(candidate_prices, chosen_prices)[:, None]
+    chosen_prices = np.take_along_axis(candidate_prices, chosen_idx, axis=1)[:, 0]
+
+    base_prices = test_df["avg_daily_price"].to_numpy(dtype=float)
+    initial_previous_prices = base_prices if previous_prices is None else previous_prices
+    previous_prices = np.where(_first_row_of_product(test_df), initial_previous_prices, np.roll(chosen_prices, 1))
+    price_change = chosen_prices - previous_prices
+
+    return pd.DataFrame(
+        {
+            "invoice_day": test_df["invoice_day"].to_numpy(),
+            COL_STOCK_CODE: test_df[COL_STOCK_CODE].astype(str).to_numpy(dtype=object),
+            "base_price": base_prices,
+            "previous_price": previous_prices,
+            "chosen_price": chosen_prices,
+            "price_change": price_change,
+            "abs_price_change": np.abs(price_change),
+            "predicted_demand": np.take_along_axis(predicted_demand, chosen_idx, axis=1)[:, 0],
+            "predicted_revenue": np.take_along_axis(predicted_revenue, chosen_idx, axis=1)[:, 0],
+            "strategy_name": np.full(len(test_df), strategy_name, dtype=object),
+        },
+        columns=PHASE7_RESULT_FROZEN_COLUMNS,
+    )
+
+
+def _attach_demand_history(test_df: pd.DataFrame) -> pd.DataFrame:
+    # Seeds each product's closed-loop history with the last observed training days before its first test row.
+    if not TRAIN_INPUT_PATH.exists():
+        raise FileNotFoundError(f"Phase 7 closed-loop mode requires the train dataset: {TRAIN_INPUT_PATH}")
+    train_df = read_dataset(TRAIN_INPUT_PATH, columns=[COL_STOCK_CODE, "invoice_day", "daily_units"])
+    train_df = train_df.sort_values([COL_STOCK_CODE, "invoice_day"], kind="mergesort")
+    history_df = train_df.groupby(COL_STOCK_CODE, sort=False).tail(DEMAND_HISTORY_DAYS)
+    history_df = history_df.assign(
+        slot=history_df.groupby(COL_STOCK_CODE, sort=False).cumcount()
+        + DEMAND_HISTORY_DAYS
+        - history_df.groupby(COL_STOCK_CODE, sort=False)["daily_units"].transform("size")
+    ).pivot(index=COL_STOCK_CODE, columns="slot", values="daily_units")
+    history_df = history_df.reindex(columns=range(DEMAND_HISTORY_DAYS))
+    history_df.columns = DEMAND_HISTORY_COLUMNS
+
+    test_df = test_df.merge(history_df, how="left", left_on=COL_STOCK_CODE, right_index=True, sort=False)
+    incomplete = test_df.loc[test_df[DEMAND_HISTORY_COLUMNS].isna().any(axis=1), COL_STOCK_CODE].unique()
+    if len(incomplete) > 0:
+        raise ValueError(
+            f"Phase 7 closed-loop mode needs {DEMAND_HISTORY_DAYS} training days per product; "
+            f"insufficient history for: {sorted(map(str, incomplete))}"
+        )
+    return test_df.reset_index(drop=True)
+
+
+def _build_closed_loop_outputs(
+    test_df: pd.DataFrame, model, strategy_name: str
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Day k of every product is simulated at once. Each product keeps a ring buffer of its last 7 demands
+    # (seeded from training, then fed with the predicted demand at the chosen price), and the lag features
+    # of the next day are read from it instead of the observed values.
+    is_first_row = _first_row_of_product(test_df)
+    product_index = np.cumsum(is_first_row) - 1
+    positions = np.arange(len(test_df))
+    day_ordinal = positions - np.flatnonzero(is_first_row)[product_index]
+
+    history = test_df.loc[is_first_row, DEMAND_HISTORY_COLUMNS].to_numpy(dtype=float)
+    previous_prices = test_df.loc[is_first_row, "avg_daily_price"].to_numpy(dtype=float)
+
+    step_order = np.argsort(day_ordinal, kind="stable")
+    step_bounds = np.searchsorted(day_ordinal[step_order], np.arange(day_ordinal.max() + 2))
+    step_outputs: list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+    chosen_prices = np.empty(len(test_df), dtype=float)
+    for step in range(len(step_bounds) - 1):
+        idx = step_order[step_bounds[step] : step_bounds[step + 1]]
+        products = product_index[idx]
+        newest_slot, oldest_slot = (step - 1) % DEMAND_HISTORY_DAYS, step % DEMAND_HISTORY_DAYS
+
+        step_df = test_df.iloc[idx].reset_index(drop=True)
+        step_df["lag1_units"] = history[products, newest_slot]
+        step_df["lag7_units"] = history[products, oldest_slot]
+        step_df["rolling7_mean_units"] = history[products].mean(axis=1)
+
+        candidate_prices, predicted_demand, predicted_revenue = score_candidates(step_df, model)
+        step_prices = select_prices_batch(
+            step_df,
+            candidate_prices,
+            predicted_demand,
+            predicted_revenue,
+            strategy_name,
+            previous_prices=previous_prices[products],
+        )
+        chosen_idx = chosen_candidate_index(candidate_prices, step_prices)[:, None]
+        chosen_prices[idx] = np.take_along_axis(candidate_prices, chosen_idx, axis=1)[:, 0]
+        history[products, oldest_slot] = np.take_along_axis(predicted_demand, chosen_idx, axis=1)[:, 0]
+        previous_prices[products] = chosen_prices[idx]
+        step_outputs.append((idx, candidate_prices, predicted_demand, predicted_revenue))
+
+    grid_width = step_outputs[0][1].shape[1]
+    candidate_prices, predicted_demand, predicted_revenue = (
+        np.empty((len(test_df), grid_width), dtype=float) for _ in range(3)
+    )
+    for idx, step_prices, step_demand, step_revenue in step_outputs:
+        candidate_prices[idx], predicted_demand[idx], predicted_revenue[idx] = step_prices, step_demand, step_revenue
+
+    candidates_output = _build_candidate_table(test_df, candidate_prices, predicted_demand, predicted_revenue)
+    results_output = build_results_table(
+        test_df, candidate_prices, predicted_demand, predicted_revenue, chosen_prices, strategy_name
+    )
+    return candidates_output[PHASE7_CANDIDATE_FROZEN_COLUMNS], results_output
+
+
+def _build_simulation_outputs(
+    test_df: pd.DataFrame, model, strategy_names: Sequence[str]
+) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+    if PHASE7_DEMAND_FEEDBACK == "closed-loop":
+        # Each strategy drives its own demand history, so closed-loop runs are simulated one strategy at a time.
+        (strategy_name,) = strategy_names
+        candidates_output, results_output = _build_closed_loop_outputs(test_df, model, strategy_name)
+        return candidates_output, {strategy_name: results_output}
+
+    # Candidates do not depend on the strategy, so they are scored once and shared by every selector.
+    candidate_prices, predicted_demand, predicted_revenue = score_candidates(test_df, model)
+    candidates_output = _build_candidate_table(test_df, candidate_prices, predicted_demand, predicted_revenue)
+
+    initial_previous_prices = _initial_previous_prices(test_df)
+    results_by_strategy: dict[str, pd.DataFrame] = {}
+    for strategy_name in strategy_names:
+        if PHASE7_SELECTION_ENGINE == "row":
+            chosen_prices = _select_prices_by_row(test_df, candidates_output, strategy_name)
         else:
-            chosen_row = chosen_rows.iloc[0]
+            chosen_prices = select_prices_batch(
+                test_df,
+                candidate_prices,
+                predicted_demand,
+                predicted_revenue,
+                strategy_name,
+                previous_prices=initial_previous_prices,
+            )
+        results_by_strategy[strategy_name] = build_results_table(
+            test_df,
+            candidate_prices,
+            predicted_demand,
+            predicted_revenue,
+            chosen_prices,
+            strategy_name,
+            previous_prices=initial_previous_prices,
+        )
+    return candidates_output[PHASE7_CANDIDATE_FROZEN_COLUMNS], results_by_strategy
 
-        price_change = chosen_price - previous_price
-        previous_price_by_product[stock_code] = chosen_price
 
-        all_candidates.append(candidates_df)
-        all_results.append(
+def _split_by_product(test_df: pd.DataFrame, chunk_count: int) -> list[pd.DataFrame]:
+    # Contiguous groups of whole products with roughly equal row counts; products never straddle two chunks.
+    row_count = len(test_df)
+    product_starts = np.append(np.flatnonzero(_first_row_of_product(test_df)), row_count)
+    targets = np.linspace(0, row_count, chunk_count + 1)[1:-1]
+    cuts = np.unique(product_starts[np.searchsorted(product_starts, targets)])
+    bounds = [0, *[int(cut) for cut in cuts if 0 < cut < row_count], row_count]
+    return [test_df.iloc[start:end].reset_index(drop=True) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+_WORKER_MODEL = None
+
+
+def _init_simulation_worker(model) -> None:
+    global _WORKER_MODEL
+    _WORKER_MODEL = model
+
+
+def _simulate_product_chunk(
+    chunk_df: pd.DataFrame, strategy_names: Sequence[str]
+) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+    return _build_simulation_outputs(chunk_df, _WORKER_MODEL, strategy_names)
+
+
+def _simulation_chunk_count(row_count: int, workers: int, checkpointed: bool) -> int:
+    chunk_count = workers * PHASE7_CHUNKS_PER_WORKER if workers > 1 else 1
+    if PHASE7_OUTPUT_MODE == "stream":
+        chunk_count = max(chunk_count, math.ceil(row_count / PHASE7_STREAM_CHUNK_ROWS))
+    if checkpointed:
+        chunk_count = max(chunk_count, math.ceil(row_count / PHASE7_CHECKPOINT_ROWS))
+    return chunk_count
+
+
+def _simulation_chunk_plan(test_df: pd.DataFrame, checkpointed: bool = False) -> tuple[int, int]:
+    product_count = int(_first_row_of_product(test_df).sum())
+    workers = min(PHASE7_WORKERS, product_count)
+    return workers, min(_simulation_chunk_count(len(test_df), workers, checkpointed), product_count)
+
+
+def _open_checkpoint(test_df: pd.DataFrame, strategy_names: Sequence[str], resume: bool) -> RunCheckpoint:
+    # Anything that changes the chunk outputs is part of the fingerprint; a mismatch makes --resume start over.
+    fingerprint = {
+        "strategies": list(strategy_names),
+        "model_sha256": file_sha256(MODEL_INPUT_PATH),
+        "test_rows_sha256": frame_fingerprint(test_df),
+        "chunk_count": _simulation_chunk_plan(test_df, checkpointed=True)[1],
+        "settings": {
+            "PRICE_GRID_PERCENTAGE": PRICE_GRID_PERCENTAGE,
+            "PHASE7_GRID_POINTS": PHASE7_GRID_POINTS,
+            "PHASE7_SELECTION_ENGINE": PHASE7_SELECTION_ENGINE,
+            "PHASE7_LINEAR_FAST_PATH": PHASE7_LINEAR_FAST_PATH,
+            "PHASE7_PRICE_SEARCH": PHASE7_PRICE_SEARCH,
+            "PHASE7_SOLVER_ITERATIONS": PHASE7_SOLVER_ITERATIONS,
+            "PHASE7_DEMAND_FEEDBACK": PHASE7_DEMAND_FEEDBACK,
+            "RULE_PRICE_INCREASE": RULE_PRICE_INCREASE,
+            "RULE_PRICE_DECREASE": RULE_PRICE_DECREASE,
+            "MAX_DAILY_CHANGE": MAX_DAILY_CHANGE,
+            "HYBRID_SMOOTHING_ALPHA": HYBRID_SMOOTHING_ALPHA,
+        },
+    }
+    return RunCheckpoint(CHECKPOINT_ROOT_PATH / "-".join(strategy_names), fingerprint, resume)
+
+
+def _remove_empty_checkpoint_root() -> None:
+    # Other strategy batches may still hold checkpoints; the shared root goes only once it is empty.
+    try:
+        CHECKPOINT_ROOT_PATH.rmdir()
+    except OSError:
+        pass
+
+
+def _checkpoint_part_names(strategy_names: Sequence[str]) -> list[str]:
+    return ["candidates", *[f"results_{strategy_name}" for strategy_name in strategy_names]]
+
+
+def _finish_chunk(
+    checkpoint: RunCheckpoint | None,
+    chunk_id: int,
+    strategy_names: Sequence[str],
+    outputs: tuple[pd.DataFrame, dict[str, pd.DataFrame]] | None,
+) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+    # Completed chunks are read back from the checkpoint; fresh ones are saved there before being handed on.
+    part_names = _checkpoint_part_names(strategy_names)
+    if outputs is None:
+        parts = checkpoint.load(chunk_id, part_names)
+        return parts[part_names[0]], {name: parts[part] for name, part in zip(strategy_names, part_names[1:])}
+    if checkpoint is not None:
+        candidates_df, results_by_strategy = outputs
+        checkpoint.save(
+            chunk_id,
             {
-                "invoice_day": row["invoice_day"],
-                COL_STOCK_CODE: stock_code,
-                "base_price": base_price,
-                "previous_price": previous_price,
-                "chosen_price": chosen_price,
-                "price_change": price_change,
-                "abs_price_change": abs(price_change),
-                "predicted_demand": float(chosen_row["predicted_demand"]),
-                "predicted_revenue": float(chosen_row["predicted_revenue"]),
-                "strategy_name": strategy_name,
-            }
+                part_names[0]: candidates_df,
+                **{part: results_by_strategy[name] for name, part in zip(strategy_names, part_names[1:])},
+            },
+        )
+    return outputs
+
+
+def _iter_simulation_chunks(
+    test_df: pd.DataFrame, model, strategy_names: Sequence[str], checkpoint: RunCheckpoint | None = None
+) -> Iterator[tuple[pd.DataFrame, dict[str, pd.DataFrame]]]:
+    # The only cross-row state is per product, so product chunks are independent; outputs are yielded in input order.
+    workers, chunk_count = _simulation_chunk_plan(test_df, checkpointed=checkpoint is not None)
+    if chunk_count <= 1 and checkpoint is None:
+        yield _build_simulation_outputs(test_df, model, strategy_names)
+        return
+
+    chunks = _split_by_product(test_df, chunk_count)
+    completed = checkpoint.completed if checkpoint is not None else set()
+    if completed:
+        logger.info("Phase 7 resume | product chunks already completed: %s of %s", len(completed), len(chunks))
+    if workers <= 1:
+        for chunk_id, chunk_df in enumerate(chunks):
+            outputs = None if chunk_id in completed else _build_simulation_outputs(chunk_df, model, strategy_names)
+            yield _finish_chunk(checkpoint, chunk_id, strategy_names, outputs)
+        return
+
+    logger.info("Phase 7 parallel simulation | workers: %s | product chunks: %s", workers, len(chunks))
+    # Keep a bounded window of chunks in flight so finished-but-unconsumed outputs cannot pile up in memory.
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_simulation_worker, initargs=(model,)
+    ) as executor:
+        pending: deque[tuple[int, Future | None]] = deque()
+        for chunk_id, chunk_df in enumerate(chunks):
+            if chunk_id in completed:
+                pending.append((chunk_id, None))
+            else:
+                pending.append((chunk_id, executor.submit(_simulate_product_chunk, chunk_df, list(strategy_names))))
+            if len(pending) >= 2 * workers:
+                chunk_id, future = pending.popleft()
+                yield _finish_chunk(checkpoint, chunk_id, strategy_names, None if future is None else future.result())
+        while pending:
+            chunk_id, future = pending.popleft()
+            yield _finish_chunk(checkpoint, chunk_id, strategy_names, None if future is None else future.result())
+
+
+def _run_simulation(
+    test_df: pd.DataFrame, model, strategy_names: Sequence[str], checkpoint: RunCheckpoint | None = None
+) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+    chunk_outputs = list(_iter_simulation_chunks(test_df, model, strategy_names, checkpoint))
+    if len(chunk_outputs) == 1:
+        return chunk_outputs[0]
+
+    candidates_df = pd.concat([candidates for candidates, _ in chunk_outputs], ignore_index=True)
+    results_by_strategy = {
+        strategy_name: pd.concat([results[strategy_name] for _, results in chunk_outputs], ignore_index=True)
+        for strategy_name in strategy_names
+    }
+    return candidates_df, results_by_strategy
+
+
+def _output_paths(strategy_name: str) -> tuple[Path, Path]:
+    candidates_output_path = CONFIGURED_ROOT_PATH / SIMULATION_CANDIDATE_PATHS[strategy_name]
+    results_output_path = CONFIGURED_ROOT_PATH / SIMULATION_RESULTS_PATHS[strategy_name]
+    candidates_output_path.parent.mkdir(parents=True, exist_ok=True)
+    results_output_path.parent.mkdir(parents=True, exist_ok=True)
+    return candidates_output_path, results_output_path
+
+
+def _last_rows_by_product(results_df: pd.DataFrame) -> pd.DataFrame:
+    # Results are ordered by product then day, so each product's last row is its latest priced day.
+    last_rows = results_df.groupby(COL_STOCK_CODE, sort=False).tail(1)
+    return pd.DataFrame(
+        {
+            COL_STOCK_CODE: last_rows[COL_STOCK_CODE].to_numpy(dtype=object),
+            "last_invoice_day": last_rows["invoice_day"].to_numpy(),
+            "last_chosen_price": last_rows["chosen_price"].to_numpy(dtype=float),
+        },
+        columns=PHASE7_STATE_FROZEN_COLUMNS,
+    )
+
+
+def _write_simulation_outputs(
+    test_df: pd.DataFrame, model, strategy_names: Sequence[str], checkpoint: RunCheckpoint | None = None
+) -> tuple[int, dict[str, int], dict[str, pd.DataFrame]]:
+    candidates_df, results_by_strategy = _run_simulation(test_df, model, strategy_names, checkpoint)
+
+    validate_phase7_candidates(candidates_df)
+    for results_df in results_by_strategy.values():
+        validate_phase7_results(results_df)
+
+    write_product_dataset(candidates_df, _output_paths(strategy_names[0])[0])
+    for strategy_name, results_df in results_by_strategy.items():
+        write_product_dataset(results_df, _output_paths(strategy_name)[1])
+    return (
+        len(candidates_df),
+        {strategy_name: len(df) for strategy_name, df in results_by_strategy.items()},
+        {strategy_name: _last_rows_by_product(df) for strategy_name, df in results_by_strategy.items()},
+    )
+
+
+class _SortedAppendWriter:
+    """ParquetWriter stand-in that merges product-sorted chunks into an existing product-sorted output file.
+
+    Existing row groups are read only as far as the current chunk's last product, so the rewritten file keeps a full
+    run's (stock_code, invoice_day) order while holding one chunk plus the existing rows it interleaves with.
+    """
+
+    def __init__(self, path: Path, existing_path: Path) -> None:
+        self._existing_file = pq.ParquetFile(existing_path)
+        self._row_groups = iter(range(self._existing_file.num_row_groups))
+        self._pending = self._existing_file.schema_arrow.empty_table()
+        self._writer = pq.ParquetWriter(path, self._existing_file.schema_arrow)
+        self.schema = self._writer.schema
+
+    def _existing_through(self, last_stock_code: str) -> pa.Table:
+        while self._pending.num_rows == 0 or self._pending.column(COL_STOCK_CODE)[-1].as_py() <= last_stock_code:
+            row_group = next(self._row_groups, None)
+            if row_group is None:
+                break
+            self._pending = pa.concat_tables([self._pending, self._existing_file.read_row_group(row_group)])
+        through = pc.less_equal(self._pending.column(COL_STOCK_CODE), last_stock_code)
+        existing = self._pending.filter(through)
+        self._pending = self._pending.filter(pc.invert(through))
+        return existing
+
+    def write_table(self, table: pa.Table) -> None:
+        if table.num_rows == 0:
+            return
+        # A product's appended days all follow its existing ones, so a stable sort puts each after its history.
+        existing = self._existing_through(table.column(COL_STOCK_CODE)[-1].as_py())
+        merged = pa.concat_tables([existing, table])
+        self._writer.write_table(merged.sort_by([(column, "ascending") for column in PRODUCT_DATASET_ORDER]))
+
+    def close(self) -> None:
+        # Products with no new days are carried over as they are.
+        if self._pending.num_rows:
+            self._writer.write_table(self._pending)
+        for row_group in self._row_groups:
+            self._writer.write_table(self._existing_file.read_row_group(row_group))
+        self._writer.close()
+
+
+def _append_row_group(
+    writers: dict[Path, pq.ParquetWriter | _SortedAppendWriter],
+    path: Path,
+    df: pd.DataFrame,
+    existing_path: Path | None = None,
+) -> None:
+    if path not in writers and existing_path is not None and existing_path.exists():
+        writers[path] = _SortedAppendWriter(path, existing_path)
+    if path in writers:
+        writers[path].write_table(pa.Table.from_pandas(df, schema=writers[path].schema, preserve_index=False))
+        return
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    writers[path] = pq.ParquetWriter(path, table.schema)
+    writers[path].write_table(table)
+
+
+def _append_dataset_part(
+    part_numbers: dict[Path, int], run_token: str, path: Path, df: pd.DataFrame, existing_path: Path | None = None
+) -> None:
+    # Partitioned layout: each chunk becomes new part files in its products' partitions. Part names sort after those
+    # of earlier runs, so appended days read back after the existing ones, which are merged in only at the end.
+    part_number = part_numbers.get(path, 0)
+    write_dataset_part(df, path, f"part-{run_token}-{part_number:06d}")
+    part_numbers[path] = part_number + 1
+
+
+def _stream_simulation_outputs(
+    test_df: pd.DataFrame,
+    model,
+    strategy_names: Sequence[str],
+    append: bool = False,
+    checkpoint: RunCheckpoint | None = None,
+    stage_state: Callable[[dict[str, pd.DataFrame]], None] | None = None,
+) -> tuple[int, dict[str, int], dict[str, pd.DataFrame]]:
+    # Each product chunk is validated and written as its own row group, so only one chunk of outputs is held in memory.
+    # Files are written under a temporary name and only replace the outputs once every chunk has succeeded;
+    # stage_state gets the last rows just before that, so the pricing state is on disk before the outputs change.
+    final_paths = [_output_paths(strategy_names[0])[0], *[_output_paths(name)[1] for name in strategy_names]]
+    staging_paths = {path: path.with_name(f"{path.name}.partial") for path in final_paths}
+    existing_paths = {staging_path: final_path if append else None for final_path, staging_path in staging_paths.items()}
+    candidates_path = staging_paths[final_paths[0]]
+    results_paths = {name: staging_paths[_output_paths(name)[1]] for name in strategy_names}
+
+    candidate_rows = 0
+    result_rows = {strategy_name: 0 for strategy_name in strategy_names}
+    last_rows: dict[str, list[pd.DataFrame]] = {strategy_name: [] for strategy_name in strategy_names}
+    writers: dict[Path, pq.ParquetWriter | _SortedAppendWriter] = {}
+    partitioned = DATASET_LAYOUT == "partitioned"
+    if partitioned:
+        append_output = partial(_append_dataset_part, {}, f"{time.time_ns():020d}")
+    else:
+        append_output = partial(_append_row_group, writers)
+    for staging_path in staging_paths.values():
+        remove_dataset(staging_path)
+    try:
+        for candidates_df, results_by_strategy in _iter_simulation_chunks(test_df, model, strategy_names, checkpoint):
+            validate_phase7_candidates(candidates_df)
+            append_output(candidates_path, candidates_df, existing_paths[candidates_path])
+            candidate_rows += len(candidates_df)
+            for strategy_name, results_df in results_by_strategy.items():
+                validate_phase7_results(results_df)
+                results_path = results_paths[strategy_name]
+                append_output(results_path, results_df, existing_paths[results_path])
+                result_rows[strategy_name] += len(results_df)
+                last_rows[strategy_name].append(_last_rows_by_product(results_df))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    last_rows_by_strategy = {
+        strategy_name: pd.concat(frames, ignore_index=True) for strategy_name, frames in last_rows.items()
+    }
+    if stage_state is not None:
+        stage_state(last_rows_by_strategy)
+    for final_path, staging_path in staging_paths.items():
+        if partitioned and append:
+            merge_dataset_parts(staging_path, final_path)
+        else:
+            replace_dataset(staging_path, final_path)
+    return candidate_rows, result_rows, last_rows_by_strategy
+
+
+def _state_path(strategy_name: str) -> Path:
+    return CONFIGURED_ROOT_PATH / SIMULATION_STATE_PATHS[strategy_name]
+
+
+def _staged_state_path(strategy_name: str) -> Path:
+    state_path = _state_path(strategy_name)
+    return state_path.with_name(f"{state_path.name}.partial")
+
+
+def _recover_staged_state(strategy_name: str) -> None:
+    # A staged state is left behind only by a run that failed between staging it and swapping it in. It belongs to
+    # the outputs exactly when every product's last result row matches it, i.e. the outputs were already swapped.
+    staged_path = _staged_state_path(strategy_name)
+    if not staged_path.exists():
+        return
+    staged_df = pd.read_parquet(staged_path)
+    results_path = _output_paths(strategy_name)[1]
+    outputs_swapped = False
+    if dataset_exists(results_path):
+        results_df = read_dataset(results_path, columns=[COL_STOCK_CODE, "invoice_day", "chosen_price"])
+        results_df[COL_STOCK_CODE] = results_df[COL_STOCK_CODE].astype(str)
+        output_state_df = _last_rows_by_product(results_df)
+        output_state_df = output_state_df.sort_values(COL_STOCK_CODE, kind="mergesort").reset_index(drop=True)
+        outputs_swapped = len(output_state_df) == len(staged_df) and all(
+            np.array_equal(output_state_df[column].to_numpy(), staged_df[column].to_numpy())
+            for column in PHASE7_STATE_FROZEN_COLUMNS
         )
+    if outputs_swapped:
+        logger.info("Phase 7 incremental | strategy: %s | completing an interrupted state swap", strategy_name)
+        staged_path.replace(_state_path(strategy_name))
+    else:
+        staged_path.unlink()
+
+
+def _load_pricing_state(strategy_name: str) -> pd.DataFrame | None:
+    # An incremental run needs both the saved state and the outputs it extends; otherwise it starts from scratch.
+    _recover_staged_state(strategy_name)
+    state_path = _state_path(strategy_name)
+    if not state_path.exists() or not all(dataset_exists(path) for path in _output_paths(strategy_name)):
+        return None
+    state_df = pd.read_parquet(state_path)
+    validate_phase7_state(state_df)
+    return state_df
+
+
+def _rows_after_state(test_df: pd.DataFrame, state_df: pd.DataFrame) -> pd.DataFrame:
+    # Keeps each product's days after its last priced day; products new to the state keep all their rows.
+    state_by_product = state_df.set_index(state_df[COL_STOCK_CODE].astype(str))
+    stock_codes = test_df[COL_STOCK_CODE].astype(str)
+    last_invoice_day = stock_codes.map(state_by_product["last_invoice_day"])
+    is_new_row = (last_invoice_day.isna() | (test_df["invoice_day"] > last_invoice_day)).to_numpy()
+    new_rows_df = test_df.loc[is_new_row].reset_index(drop=True)
+    new_rows_df[CARRIED_PRICE_COLUMN] = stock_codes[is_new_row].map(state_by_product["last_chosen_price"]).to_numpy(
+        dtype=float
+    )
+    return new_rows_df
+
+
+def _stage_pricing_state(strategy_name: str, state_df: pd.DataFrame, previous_state_df: pd.DataFrame | None) -> None:
+    if previous_state_df is not None:
+        # Products without new rows in this run keep their saved state.
+        carried_over = ~previous_state_df[COL_STOCK_CODE].astype(str).isin(state_df[COL_STOCK_CODE].astype(str))
+        state_df = pd.concat([previous_state_df[carried_over], state_df], ignore_index=True)
+    state_df = state_df.sort_values(COL_STOCK_CODE, kind="mergesort").reset_index(drop=True)
+    validate_phase7_state(state_df)
+    state_df.to_parquet(_staged_state_path(strategy_name), index=False)
 
-    candidates_output = pd.concat(all_candidates, ignore_index=True)
-    candidates_output = candidates_output[PHASE7_CANDIDATE_FROZEN_COLUMNS]
-    results_output = pd.DataFrame(all_results, columns=PHASE7_RESULT_FROZEN_COLUMNS)
-    return candidates_output, results_output
 
+def _stage_pricing_states(last_rows: dict[str, pd.DataFrame], previous_state_df: pd.DataFrame | None) -> None:
+    for strategy_name, state_df in last_rows.items():
+        _stage_pricing_state(strategy_name, state_df, previous_state_df)
 
-def run_phase7(strategy_name: str) -> None:
-    if strategy_name not in PHASE7_STRATEGIES:
-        raise ValueError(f"Unsupported strategy for Phase 7 simulation: {strategy_name}")
 
-    logger.info("Phase 7 simulation started for strategy: %s", strategy_name)
+def load_simulation_inputs() -> tuple[pd.DataFrame, object]:
     if not TEST_INPUT_PATH.exists():
         raise FileNotFoundError(f"Phase 7 test dataset not found: {TEST_INPUT_PATH}")
     if not MODEL_INPUT_PATH.exists():
         raise FileNotFoundError(f"Phase 7 model artifact not found: {MODEL_INPUT_PATH}")
 
-    test_df = pd.read_parquet(TEST_INPUT_PATH)
-    ensure_required_columns(
-        test_df,
-        ["invoice_day", COL_STOCK_CODE, "avg_daily_price", *PHASE6_FEATURE_COLUMNS],
+    # The target column is read only for the Monte Carlo residuals.
+    test_df = read_parquet_columns(
+        TEST_INPUT_PATH,
+        ["invoice_day", COL_STOCK_CODE, "avg_daily_price", *PHASE6_FEATURE_COLUMNS, PHASE6_TARGET_COLUMN],
         "Phase 7 simulation input",
     )
     test_df = test_df.sort_values([COL_STOCK_CODE, "invoice_day"], kind="mergesort").reset_index(drop=True)
+    return test_df, load_demand_model()
 
+
+def load_demand_model():
+    if not MODEL_INPUT_PATH.exists():
+        raise FileNotFoundError(f"Phase 7 model artifact not found: {MODEL_INPUT_PATH}")
     model = joblib.load(MODEL_INPUT_PATH)
-    candidates_df, results_df = _build_simulation_outputs(test_df, model, strategy_name)
+    if PHASE7_PREDICTION_CACHE not in PHASE7_PREDICTION_CACHE_MODES:
+        raise ValueError(f"Unsupported Phase 7 prediction cache mode: {PHASE7_PREDICTION_CACHE}")
+    if PHASE7_PREDICTION_CACHE != "off":
+        # Keyed by the artifact hash, so retraining the model never reuses stale predictions.
+        model = CachedDemandModel(
+            model,
+            model_hash=file_sha256(MODEL_INPUT_PATH),
+            feature_columns=PHASE6_FEATURE_COLUMNS,
+            max_entries=PHASE7_PREDICTION_CACHE_MAX_ENTRIES,
+            disk_path=PREDICTION_CACHE_PATH if PHASE7_PREDICTION_CACHE == "disk" else None,
+        )
+    return model
 
-    validate_phase7_candidates(candidates_df)
-    validate_phase7_results(results_df)
 
-    candidates_output_path = CONFIGURED_ROOT_PATH / SIMULATION_CANDIDATE_PATHS[strategy_name]
-    results_output_path = CONFIGURED_ROOT_PATH / SIMULATION_RESULTS_PATHS[strategy_name]
-    candidates_output_path.parent.mkdir(parents=True, exist_ok=True)
-    results_output_path.parent.mkdir(parents=True, exist_ok=True)
+def _validate_phase7_settings(strategy_names: Sequence[str]) -> None:
+    if not strategy_names:
+        raise ValueError("Phase 7 simulation requires at least one strategy.")
+    for strategy_name in strategy_names:
+        if strategy_name not in PHASE7_STRATEGIES:
+            raise ValueError(f"Unsupported strategy for Phase 7 simulation: {strategy_name}")
+    if PHASE7_SELECTION_ENGINE not in PHASE7_SELECTION_ENGINES:
+        raise ValueError(f"Unsupported Phase 7 selection engine: {PHASE7_SELECTION_ENGINE}")
+    if PHASE7_VALIDATION_POLICY not in PHASE7_VALIDATION_POLICIES:
+        raise ValueError(f"Unsupported Phase 7 validation policy: {PHASE7_VALIDATION_POLICY}")
+    if PHASE7_VALIDATION_SAMPLE_EVERY < 1:
+        raise ValueError("PHASE7_VALIDATION_SAMPLE_EVERY must be a positive integer.")
+    if PHASE7_PRICE_SEARCH not in PHASE7_PRICE_SEARCH_MODES:
+        raise ValueError(f"Unsupported Phase 7 price search mode: {PHASE7_PRICE_SEARCH}")
+    if PHASE7_WORKERS < 1 or PHASE7_CHUNKS_PER_WORKER < 1:
+        raise ValueError("Phase 7 worker settings must be positive integers.")
+    if PHASE7_OUTPUT_MODE not in PHASE7_OUTPUT_MODES:
+        raise ValueError(f"Unsupported Phase 7 output mode: {PHASE7_OUTPUT_MODE}")
+    if PHASE7_STREAM_CHUNK_ROWS < 1:
+        raise ValueError("PHASE7_STREAM_CHUNK_ROWS must be a positive integer.")
+    if PHASE7_CHECKPOINT_ROWS < 1:
+        raise ValueError("PHASE7_CHECKPOINT_ROWS must be a positive integer.")
+    if PHASE7_DEMAND_FEEDBACK not in PHASE7_DEMAND_FEEDBACK_MODES:
+        raise ValueError(f"Unsupported Phase 7 demand feedback mode: {PHASE7_DEMAND_FEEDBACK}")
+    if PHASE7_DEMAND_FEEDBACK == "closed-loop" and PHASE7_SELECTION_ENGINE != "batch":
+        raise ValueError("Phase 7 closed-loop mode requires the batch selection engine.")
+    if PHASE7_RUN_MODE not in PHASE7_RUN_MODES:
+        raise ValueError(f"Unsupported Phase 7 run mode: {PHASE7_RUN_MODE}")
+    if PHASE7_RUN_MODE == "incremental" and PHASE7_DEMAND_FEEDBACK == "closed-loop":
+        raise ValueError("Phase 7 incremental mode does not persist closed-loop demand history; use open-loop.")
 
-    candidates_df.to_parquet(candidates_output_path, index=False)
-    results_df.to_parquet(results_output_path, index=False)
 
-    logger.info(
-        (
-            "Phase 7 summary | strategy: %s | test rows: %s | candidate rows: %s | "
-            "result rows: %s | candidate output: %s | result output: %s"
-        ),
-        strategy_name,
-        len(test_df),
-        len(candidates_df),
-        len(results_df),
-        candidates_output_path,
-        results_output_path,
-    )
-    logger.info("Phase 7 simulation completed successfully for strategy: %s", strategy_name)
+def run_phase7_strategies(strategy_names: Sequence[str], resume: bool = False) -> None:
+    strategy_names = list(dict.fromkeys(strategy_names))
+    _validate_phase7_settings(strategy_names)
+
+    if len(strategy_names) == 1:
+        logger.info("Phase 7 simulation started for strategy: %s", strategy_names[0])
+    else:
+        logger.info("Phase 7 simulation started for strategies: %s", ", ".join(strategy_names))
+    test_df, model = load_simulation_inputs()
+    if PHASE7_DEMAND_FEEDBACK == "closed-loop":
+        logger.info("Phase 7 demand feedback: closed-loop (lag features rebuilt from simulated demand)")
+        test_df = _attach_demand_history(test_df)
+    if PHASE7_DEMAND_FEEDBACK == "closed-loop" or PHASE7_RUN_MODE == "incremental":
+        # Each strategy has its own demand path or saved state, so strategies are simulated one at a time.
+        strategy_batches = [[strategy_name] for strategy_name in strategy_names]
+    else:
+        strategy_batches = [strategy_names]
+
+    for batch_strategy_names in strategy_batches:
+        run_df, previous_state_df = test_df, None
+        if PHASE7_RUN_MODE == "incremental":
+            previous_state_df = _load_pricing_state(batch_strategy_names[0])
+            if previous_state_df is None:
+                logger.info(
+                    "Phase 7 incremental | strategy: %s | no saved state, simulating full history",
+                    batch_strategy_names[0],
+                )
+            else:
+                run_df = _rows_after_state(test_df, previous_state_df)
+                logger.info(
+                    "Phase 7 incremental | strategy: %s | new rows: %s of %s",
+                    batch_strategy_names[0],
+                    len(run_df),
+                    len(test_df),
+                )
+                if run_df.empty:
+                    logger.info("Phase 7 simulation up to date for strategy: %s", batch_strategy_names[0])
+                    continue
+
+        # Completed product chunks are kept until the outputs and state are written, so a failed run can be resumed.
+        # --resume keeps checkpointing on, so a resumed run that fails again can still be resumed.
+        checkpointed = PHASE7_CHECKPOINTS or resume
+        checkpoint = _open_checkpoint(run_df, batch_strategy_names, resume) if checkpointed else None
+        stage_states = partial(_stage_pricing_states, previous_state_df=previous_state_df)
+        if PHASE7_OUTPUT_MODE == "stream" or previous_state_df is not None:
+            # The new state is staged before the appended outputs replace the old ones; a run failing between the two
+            # swaps is completed by the next _load_pricing_state instead of appending the same days again.
+            candidate_rows, result_rows, _ = _stream_simulation_outputs(
+                run_df,
+                model,
+                batch_strategy_names,
+                append=previous_state_df is not None,
+                checkpoint=checkpoint,
+                stage_state=stage_states,
+            )
+        else:
+            candidate_rows, result_rows, last_rows = _write_simulation_outputs(
+                run_df, model, batch_strategy_names, checkpoint
+            )
+            stage_states(last_rows)
+        for strategy_name in batch_strategy_names:
+            _staged_state_path(strategy_name).replace(_state_path(strategy_name))
+        if checkpoint is not None:
+            checkpoint.clear()
+            _remove_empty_checkpoint_root()
+
+        # Strategies simulated together share one candidate table, so it is serialized once and copied.
+        shared_candidates_path = _output_paths(batch_strategy_names[0])[0]
+        for strategy_name in batch_strategy_names:
+            candidates_output_path, results_output_path = _output_paths(strategy_name)
+            if candidates_output_path != shared_candidates_path:
+                copy_dataset(shared_candidates_path, candidates_output_path)
+
+            logger.info(
+                (
+                    "Phase 7 summary | strategy: %s | test rows: %s | candidate rows: %s | "
+                    "result rows: %s | candidate output: %s | result output: %s"
+                ),
+                strategy_name,
+                len(run_df),
+                candidate_rows,
+                result_rows[strategy_name],
+                candidates_output_path,
+                results_output_path,
+            )
+            logger.info("Phase 7 simulation completed successfully for strategy: %s", strategy_name)
+    if isinstance(model, CachedDemandModel) and PHASE7_WORKERS == 1:
+        logger.info(
+            "Phase 7 prediction cache | memory hits: %s | disk hits: %s | model predictions: %s",
+            model.hits,
+            model.disk_hits,
+            model.misses,
+        )
+
+
+def run_phase7(strategy_name: str, resume: bool = False) -> None:
+    run_phase7_strategies([strategy_name], resume)
 
 
 if __name__ == "__main__":
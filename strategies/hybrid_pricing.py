@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
 
-from config import HYBRID_SMOOTHING_ALPHA, MAX_DAILY_CHANGE
+from config import COL_STOCK_CODE, HYBRID_SMOOTHING_ALPHA, MAX_DAILY_CHANGE
 
 
 def _select_ml_optimal_price(candidate_table: pd.DataFrame, base_price: float) -> float:
@@ -40,3 +41,76 @@ def choose_price(candidate_table: pd.DataFrame, context: dict) -> float:
         kind="mergesort",
     )
     return float(ranked.iloc[0]["candidate_price"])
+
+
+def _select_ml_optimal_prices(
+    candidate_prices: np.ndarray, predicted_revenue: np.ndarray, base_prices: np.ndarray
+) -> np.ndarray:
+    distance_to_base = np.abs(candidate_prices - base_prices[:, None])
+    order = np.lexsort((candidate_prices, distance_to_base, -predicted_revenue), axis=1)
+    return np.take_along_axis(candidate_prices, order[:, :1], axis=1)[:, 0]
+
+
+def _select_smoothed_prices(
+    candidate_prices: np.ndarray,
+    ml_prices: np.ndarray,
+    base_prices: np.ndarray,
+    previous_prices: np.ndarray,
+    max_daily_change: float,
+    smoothing_alpha: float,
+) -> np.ndarray:
+    lower_bound = previous_prices * (1.0 - max_daily_change)
+    upper_bound = previous_prices * (1.0 + max_daily_change)
+    clamped_prices = np.minimum(np.maximum(ml_prices, lower_bound), upper_bound)
+
+    smoothed_prices = (smoothing_alpha * clamped_prices) + ((1.0 - smoothing_alpha) * previous_prices)
+
+    distance_to_smoothed = np.abs(candidate_prices - smoothed_prices[:, None])
+    distance_to_base = np.abs(candidate_prices - base_prices[:, None])
+    order = np.lexsort((candidate_prices, distance_to_base, distance_to_smoothed), axis=1)
+    return np.take_along_axis(candidate_prices, order[:, :1], axis=1)[:, 0]
+
+
+def choose_prices_batch(
+    candidate_prices: np.ndarray,
+    predicted_demand: np.ndarray,
+    predicted_revenue: np.ndarray,
+    context: dict,
+    max_daily_change: float = MAX_DAILY_CHANGE,
+    smoothing_alpha: float = HYBRID_SMOOTHING_ALPHA,
+) -> np.ndarray:
+    if candidate_prices.size == 0:
+        raise ValueError("Hybrid strategy received an empty candidate batch.")
+
+    base_prices = np.asarray(context["base_price"], dtype=float)
+    initial_previous_prices = np.asarray(context["previous_price"], dtype=float)
+    stock_codes = context["rows"][COL_STOCK_CODE].to_numpy()
+    row_count = len(base_prices)
+
+    ml_prices = _select_ml_optimal_prices(candidate_prices, predicted_revenue, base_prices)
+
+    # Rows must be sorted by product then day. previous_price is only read at the first row of each
+    # product; later rows carry the product's last chosen price forward. Products are independent,
+    # so step k prices the k-th row of every product at once.
+    positions = np.arange(row_count)
+    is_first_row = np.ones(row_count, dtype=bool)
+    is_first_row[1:] = stock_codes[1:] != stock_codes[:-1]
+    day_ordinal = positions - np.maximum.accumulate(np.where(is_first_row, positions, 0))
+
+    chosen_prices = np.empty(row_count, dtype=float)
+    previous_prices = initial_previous_prices.copy()
+    step_order = np.argsort(day_ordinal, kind="stable")
+    step_bounds = np.searchsorted(day_ordinal[step_order], np.arange(day_ordinal.max() + 2))
+    for step in range(len(step_bounds) - 1):
+        idx = step_order[step_bounds[step] : step_bounds[step + 1]]
+        if step > 0:
+            previous_prices[idx] = chosen_prices[idx - 1]
+        chosen_prices[idx] = _select_smoothed_prices(
+            candidate_prices[idx],
+            ml_prices[idx],
+            base_prices[idx],
+            previous_prices[idx],
+            max_daily_change,
+            smoothing_alpha,
+        )
+    return chosen_prices
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -14,3 +15,25 @@ def choose_price(candidate_table: pd.DataFrame, context: dict) -> float:
         kind="mergesort",
     )
     return float(ranked.iloc[0]["candidate_price"])
+
+
+def _select_revenue_optimal_prices(
+    candidate_prices: np.ndarray, predicted_revenue: np.ndarray, base_prices: np.ndarray
+) -> np.ndarray:
+    # np.lexsort sorts by the last key first and is stable, mirroring the mergesort tie-break in choose_price.
+    distance_to_base = np.abs(candidate_prices - base_prices[:, None])
+    order = np.lexsort((candidate_prices, distance_to_base, -predicted_revenue), axis=1)
+    return np.take_along_axis(candidate_prices, order[:, :1], axis=1)[:, 0]
+
+
+def choose_prices_batch(
+    candidate_prices: np.ndarray,
+    predicted_demand: np.ndarray,
+    predicted_revenue: np.ndarray,
+    context: dict,
+) -> np.ndarray:
+    if candidate_prices.size == 0:
+        raise ValueError("ML strategy received an empty candidate batch.")
+
+    base_prices = np.asarray(context["base_price"], dtype=float)
+    return _select_revenue_optimal_prices(candidate_prices, predicted_revenue, base_prices)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from config import RULE_PRICE_DECREASE, RULE_PRICE_INCREASE
@@ -38,3 +39,42 @@ def choose_price(candidate_table: pd.DataFrame, context: dict) -> float:
         target_price = base_price
 
     return _select_candidate_price(candidate_table, target_price, base_price)
+
+
+def _select_candidate_prices(
+    candidate_prices: np.ndarray, target_prices: np.ndarray, base_prices: np.ndarray
+) -> np.ndarray:
+    distance_to_target = np.abs(candidate_prices - target_prices[:, None])
+    distance_to_base = np.abs(candidate_prices - base_prices[:, None])
+    order = np.lexsort((candidate_prices, distance_to_base, distance_to_target), axis=1)
+    return np.take_along_axis(candidate_prices, order[:, :1], axis=1)[:, 0]
+
+
+def choose_prices_batch(
+    candidate_prices: np.ndarray,
+    predicted_demand: np.ndarray,
+    predicted_revenue: np.ndarray,
+    context: dict,
+    price_increase: float = RULE_PRICE_INCREASE,
+    price_decrease: float = RULE_PRICE_DECREASE,
+) -> np.ndarray:
+    if candidate_prices.size == 0:
+        raise ValueError("Rule-based strategy received an empty candidate batch.")
+
+    base_prices = np.asarray(context["base_price"], dtype=float)
+    rolling_mean_units = context["rows"]["rolling7_mean_units"].to_numpy(dtype=float)
+
+    exact_base = candidate_prices == base_prices[:, None]
+    base_idx = np.where(
+        exact_base.any(axis=1),
+        exact_base.argmax(axis=1),
+        np.abs(candidate_prices - base_prices[:, None]).argmin(axis=1),
+    )
+    base_predicted_demand = np.take_along_axis(predicted_demand, base_idx[:, None], axis=1)[:, 0]
+
+    target_prices = np.select(
+        [base_predicted_demand > rolling_mean_units, base_predicted_demand < rolling_mean_units],
+        [base_prices * (1.0 + price_increase), base_prices * (1.0 - price_decrease)],
+        default=base_prices,
+    )
+    return _select_candidate_prices(candidate_prices, target_prices, base_prices)
@@ -7,13 +7,19 @@ from config import (
     COL_STOCK_CODE,
     PHASE2_FROZEN_COLUMNS,
     PHASE3_FROZEN_COLUMNS,
+    PHASE3_CATALOG_MAX_PRODUCTS,
+    PHASE3_INDEX_FROZEN_COLUMNS,
+    PHASE3_SELECTION_MODE,
     PHASE4_FROZEN_COLUMNS,
     PHASE5_FROZEN_COLUMNS,
     PHASE5_FROZEN_FEATURE_COLUMNS,
     PHASE5_MONTH_COLUMNS,
     PHASE5_WEEKDAY_COLUMNS,
     PHASE7_CANDIDATE_FROZEN_COLUMNS,
+    PHASE7_MONTE_CARLO_FROZEN_COLUMNS,
     PHASE7_RESULT_FROZEN_COLUMNS,
+    PHASE7_STATE_FROZEN_COLUMNS,
+    PHASE13_FROZEN_COLUMNS,
     PRICE_OUTLIER_THRESHOLD,
     SELECTED_PRODUCT_COUNT,
     TARGET_COUNTRY,
@@ -48,21 +54,45 @@ def validate_clean_transactions(df: pd.DataFrame) -> None:
         raise ValueError("Phase 2 cleaned dataset validation failed: outlier above threshold found.")
 
 
-def validate_selected_products(df: pd.DataFrame) -> None:
+def validate_selected_products(
+    df: pd.DataFrame,
+    selection_mode: str = PHASE3_SELECTION_MODE,
+    catalog_max_products: int | None = PHASE3_CATALOG_MAX_PRODUCTS,
+) -> None:
     required = PHASE3_FROZEN_COLUMNS
     ensure_required_columns(df, required, "Phase 3 selected products dataset")
     _validate_exact_columns(df, PHASE3_FROZEN_COLUMNS, "Phase 3 selected products dataset")
 
     if df.empty:
         raise ValueError("Phase 3 selected products validation failed: dataset is empty.")
-    if len(df) != SELECTED_PRODUCT_COUNT:
+    if selection_mode == "top" and len(df) != SELECTED_PRODUCT_COUNT:
         raise ValueError(
             f"Phase 3 selected products validation failed: expected {SELECTED_PRODUCT_COUNT} rows, got {len(df)}."
         )
+    if selection_mode == "catalog" and catalog_max_products is not None:
+        if len(df) > catalog_max_products:
+            raise ValueError(
+                "Phase 3 selected products validation failed: "
+                f"expected at most {catalog_max_products} rows, got {len(df)}."
+            )
+    if df[COL_STOCK_CODE].duplicated().any():
+        raise ValueError("Phase 3 selected products validation failed: duplicate stock_code found.")
     if df[COL_STOCK_CODE].isna().any() or (df[COL_STOCK_CODE].astype("string").str.strip() == "").any():
         raise ValueError("Phase 3 selected products validation failed: missing stock code found.")
 
 
+def validate_product_day_index(df: pd.DataFrame) -> None:
+    ensure_required_columns(df, PHASE3_INDEX_FROZEN_COLUMNS, "Phase 3 product-day index")
+    _validate_exact_columns(df, PHASE3_INDEX_FROZEN_COLUMNS, "Phase 3 product-day index")
+
+    if df.empty:
+        raise ValueError("Phase 3 product-day index validation failed: dataset is empty.")
+    if df[COL_STOCK_CODE].isna().any() or df[COL_STOCK_CODE].duplicated().any():
+        raise ValueError("Phase 3 product-day index validation failed: missing or duplicate stock_code found.")
+    if (df["active_days"] < 1).any():
+        raise ValueError("Phase 3 product-day index validation failed: product without active days found.")
+
+
 def validate_daily_aggregation(df: pd.DataFrame) -> None:
     required = PHASE4_FROZEN_COLUMNS
     ensure_required_columns(df, required, "Phase 4 daily aggregation dataset")
@@ -163,3 +193,51 @@ def validate_phase7_results(df: pd.DataFrame) -> None:
         raise ValueError("Phase 7 simulation outcome validation failed: negative predicted demand found.")
     if (df["predicted_revenue"] < 0).any():
         raise ValueError("Phase 7 simulation outcome validation failed: negative predicted revenue found.")
+
+
+def validate_phase7_state(df: pd.DataFrame) -> None:
+    ensure_required_columns(df, PHASE7_STATE_FROZEN_COLUMNS, "Phase 7 pricing state")
+    _validate_exact_columns(df, PHASE7_STATE_FROZEN_COLUMNS, "Phase 7 pricing state")
+
+    if df.empty:
+        raise ValueError("Phase 7 pricing state validation failed: dataset is empty.")
+    if df.isna().any().any():
+        raise ValueError("Phase 7 pricing state validation failed: null values found.")
+    if df[COL_STOCK_CODE].duplicated().any():
+        raise ValueError("Phase 7 pricing state validation failed: duplicate stock_code found.")
+    if (df["last_chosen_price"] <= 0).any():
+        raise ValueError("Phase 7 pricing state validation failed: non-positive last chosen price found.")
+
+
+def validate_phase7_monte_carlo(df: pd.DataFrame) -> None:
+    ensure_required_columns(df, PHASE7_MONTE_CARLO_FROZEN_COLUMNS, "Phase 7 Monte Carlo revenue dataset")
+    _validate_exact_columns(df, PHASE7_MONTE_CARLO_FROZEN_COLUMNS, "Phase 7 Monte Carlo revenue dataset")
+
+    if df.empty:
+        raise ValueError("Phase 7 Monte Carlo validation failed: dataset is empty.")
+    if df.isna().any().any():
+        raise ValueError("Phase 7 Monte Carlo validation failed: null values found.")
+    if df.duplicated(subset=["strategy_name", "draw"]).any():
+        raise ValueError("Phase 7 Monte Carlo validation failed: duplicate (strategy_name, draw) rows found.")
+    if df.groupby("strategy_name")["draw"].nunique().nunique() != 1:
+        raise ValueError("Phase 7 Monte Carlo validation failed: strategies have different draw counts.")
+    if (df["total_revenue"] < 0).any():
+        raise ValueError("Phase 7 Monte Carlo validation failed: negative total revenue found.")
+
+
+def validate_phase13_robustness_results(df: pd.DataFrame) -> None:
+    ensure_required_columns(df, PHASE13_FROZEN_COLUMNS, "Phase 13 robustness sweep dataset")
+    _validate_exact_columns(df, PHASE13_FROZEN_COLUMNS, "Phase 13 robustness sweep dataset")
+
+    if df.empty:
+        raise ValueError("Phase 13 robustness sweep validation failed: dataset is empty.")
+    if df[PHASE13_FROZEN_COLUMNS].isna().any().any():
+        raise ValueError("Phase 13 robustness sweep validation failed: null values found.")
+    if df.duplicated(subset=["config_id", "strategy_name"]).any():
+        raise ValueError("Phase 13 robustness sweep validation failed: duplicate configuration/strategy rows found.")
+    if (df["result_rows"] <= 0).any():
+        raise ValueError("Phase 13 robustness sweep validation failed: configuration without simulated rows found.")
+    if (df["total_predicted_revenue"] < 0).any():
+        raise ValueError("Phase 13 robustness sweep validation failed: negative predicted revenue found.")
+    if ((df["change_frequency"] < 0) | (df["change_frequency"] > 1)).any():
+        raise ValueError("Phase 13 robustness sweep validation failed: change_frequency outside [0, 1].")
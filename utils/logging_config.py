@@ -11,6 +11,7 @@ from config import (
     PHASE5_LOG_FILE,
     PHASE6_LOG_FILE,
     PHASE7_LOG_FILE,
+    PHASE13_LOG_FILE,
     PROJECT_ROOT,
 )
 
@@ -42,13 +43,13 @@ def configure_logging(phases: list[int] | None = None) -> None:
     if 1 in selected_phases:
         phase_handler = logging.FileHandler(logs_dir / PHASE1_LOG_FILE, mode="a")
         phase_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
-        phase_handler.addFilter(LoggerPrefixFilter(("preprocessing.raw_inspection",)))
+        phase_handler.addFilter(LoggerPrefixFilter(("preprocessing.raw_inspection", "preprocessing.raw_cache")))
         root_logger.addHandler(phase_handler)
 
     if 2 in selected_phases:
         phase_handler = logging.FileHandler(logs_dir / PHASE2_LOG_FILE, mode="a")
         phase_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
-        phase_handler.addFilter(LoggerPrefixFilter(("preprocessing.clean_data",)))
+        phase_handler.addFilter(LoggerPrefixFilter(("preprocessing.clean_data", "preprocessing.raw_cache")))
         root_logger.addHandler(phase_handler)
 
     if 3 in selected_phases:
@@ -78,5 +79,20 @@ def configure_logging(phases: list[int] | None = None) -> None:
     if 7 in selected_phases:
         phase_handler = logging.FileHandler(logs_dir / PHASE7_LOG_FILE, mode="a")
         phase_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
-        phase_handler.addFilter(LoggerPrefixFilter(("simulation.simulator",)))
+        phase_handler.addFilter(
+            LoggerPrefixFilter(
+                (
+                    "simulation.simulator",
+                    "simulation.monte_carlo",
+                    "simulation.pricing_service",
+                    "simulation.checkpoint",
+                )
+            )
+        )
+        root_logger.addHandler(phase_handler)
+
+    if 13 in selected_phases:
+        phase_handler = logging.FileHandler(logs_dir / PHASE13_LOG_FILE, mode="a")
+        phase_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
+        phase_handler.addFilter(LoggerPrefixFilter(("simulation.parameter_sweep", "simulation.checkpoint")))
         root_logger.addHandler(phase_handler)
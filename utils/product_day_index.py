@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config import COL_STOCK_CODE
+
+METADATA_KEY = b"product_day_index"
+
+
+class ProductDayIndex:
+    """Product x calendar-day activity as a bit matrix.
+
+    Row i belongs to ``stock_codes[i]`` (sorted, as groupby orders them); bit d of a row, packed little-endian
+    into bytes, is set when the product sold on ``first_day + d`` days. Active-day counts are row popcounts.
+    """
+
+    def __init__(self, stock_codes: pd.Index, first_day: np.datetime64, day_count: int, bitmap: np.ndarray) -> None:
+        if bitmap.shape != (len(stock_codes), (day_count + 7) // 8):
+            raise ValueError(f"Product-day bitmap shape {bitmap.shape} does not match the products and days.")
+        self.stock_codes = stock_codes
+        self.first_day = np.datetime64(first_day, "D")
+        self.day_count = day_count
+        self.bitmap = bitmap
+
+    @classmethod
+    def from_transactions(cls, stock_codes: pd.Series, dates: pd.Series) -> "ProductDayIndex":
+        valid = (stock_codes.notna() & dates.notna()).to_numpy()
+        if not valid.any():
+            raise ValueError("Cannot build a product-day index without dated transactions.")
+        product_numbers, products = pd.factorize(stock_codes[valid], sort=True)
+        days = dates[valid].to_numpy().astype("datetime64[D]")
+        first_day = days.min()
+        day_numbers = (days - first_day).astype(np.int64)
+        day_count = int(day_numbers.max()) + 1
+
+        active = np.zeros((len(products), day_count), dtype=bool)
+        active[product_numbers, day_numbers] = True
+        bitmap = np.packbits(active, axis=1, bitorder="little")
+        return cls(pd.Index(products, name=COL_STOCK_CODE), first_day, day_count, bitmap)
+
+    def active_days(self) -> np.ndarray:
+        return np.bitwise_count(self.bitmap).sum(axis=1, dtype=np.int64)
+
+    def active_dates(self, stock_code: str) -> pd.DatetimeIndex:
+        row = self.bitmap[self.stock_codes.get_loc(stock_code)]
+        day_numbers = np.flatnonzero(np.unpackbits(row, count=self.day_count, bitorder="little"))
+        return pd.DatetimeIndex((self.first_day + day_numbers).astype("datetime64[ns]"))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                COL_STOCK_CODE: self.stock_codes.to_numpy(),
+                "active_days": self.active_days(),
+                "day_bitmap": [row.tobytes() for row in self.bitmap],
+            }
+        )
+
+    def write(self, path: Path) -> None:
+        metadata = {"first_day": str(self.first_day), "day_count": self.day_count}
+        table = pa.Table.from_pandas(self.to_frame(), preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), METADATA_KEY: json.dumps(metadata).encode("utf-8")}
+        )
+        pq.write_table(table, path)
+
+    @classmethod
+    def read(cls, path: Path) -> "ProductDayIndex":
+        table = pq.read_table(path)
+        metadata = json.loads((table.schema.metadata or {})[METADATA_KEY])
+        frame = table.to_pandas()
+        row_bytes = (metadata["day_count"] + 7) // 8
+        bitmap = np.frombuffer(b"".join(frame["day_bitmap"]), dtype=np.uint8).reshape(len(frame), row_bytes)
+        return cls(
+            pd.Index(frame[COL_STOCK_CODE], name=COL_STOCK_CODE),
+            np.datetime64(metadata["first_day"], "D"),
+            metadata["day_count"],
+            bitmap,
+        )
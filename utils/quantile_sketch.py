@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch built from a stack of deterministic compactors (the MRL/KLL scheme).
+
+    Level h holds items of weight 2**h. Once a level reaches k items it is sorted and every other item is
+    promoted to the next level, which moves any rank by at most 2**h. ``rank_error`` adds up those shifts, so
+    a reported quantile is at most ``rank_error`` rows from the true one (at most levels * count / k overall).
+    Until the first compaction the sketch keeps every value and quantiles are exact.
+    """
+
+    def __init__(self, k: int) -> None:
+        if k < 2:
+            raise ValueError("Quantile sketch k must be at least 2.")
+        self.k = k
+        self.count = 0
+        self.rank_error = 0
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self._offsets: list[int] = [0]
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge quantile sketches with different k: {self.k} and {other.k}")
+        self.count += other.count
+        self.rank_error += other.rank_error
+        for level, items in enumerate(other.levels):
+            self._ensure_level(level)
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compact()
+
+    def _ensure_level(self, level: int) -> None:
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+            self._offsets.append(0)
+
+    def _compact(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self.k:
+                items = np.sort(items)
+                # An odd item out stays behind; alternating the kept offset keeps the error from drifting one way.
+                paired = len(items) - len(items) % 2
+                offset = self._offsets[level]
+                self._offsets[level] ^= 1
+                self._ensure_level(level + 1)
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset:paired:2]])
+                self.levels[level] = items[paired:]
+                self.rank_error += 2**level
+            level += 1
+
+    def quantiles(self, probabilities: list[float]) -> np.ndarray:
+        if self.count == 0:
+            return np.full(len(probabilities), np.nan)
+        if self.rank_error == 0:
+            # Nothing was compacted: same linear interpolation as pandas describe/quantile.
+            return np.quantile(self.levels[0], probabilities)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2**level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="mergesort")
+        cumulative = np.cumsum(weights[order])
+        ranks = np.asarray(probabilities, dtype=float) * (self.count - 1)
+        positions = np.searchsorted(cumulative, ranks, side="right")
+        return values[order][np.minimum(positions, len(values) - 1)]